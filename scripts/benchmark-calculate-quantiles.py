@@ -0,0 +1,92 @@
+"""
+Benchmark :func:`openscm_runner.utils.calculate_quantiles`
+
+Compares the single-pass implementation with the previous implementation,
+which called ``process_over`` once per quantile, and checks that both give the
+same output.
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+import scmdata
+
+from openscm_runner.utils import calculate_quantiles
+
+N_MEMBERS = 600
+N_SCENARIOS = 20
+VARIABLES = (
+    "Surface Air Temperature Change",
+    "Effective Radiative Forcing",
+    "Atmospheric Concentrations|CO2",
+)
+YEARS = np.arange(1750, 2101)
+QUANTILES = (0.05, 0.1, 0.17, 0.25, 0.33, 0.5, 0.67, 0.75, 0.83, 0.9, 0.95)
+N_REPEATS = 3
+
+
+def calculate_quantiles_process_over(
+    scmdf,
+    quantiles,
+    process_over_columns=("run_id", "ensemble_member", "climate_model"),
+):
+    """
+    Previous implementation of :func:`calculate_quantiles`
+    """
+    out = []
+    for quant in quantiles:
+        quantile_df = scmdf.process_over(process_over_columns, "quantile", q=quant)
+        quantile_df["quantile"] = quant
+
+        out.append(quantile_df)
+
+    return scmdata.run_append([scmdata.ScmRun(o) for o in out])
+
+
+def get_ensemble():
+    """
+    Get a random ensemble to benchmark with
+    """
+    rng = np.random.default_rng(0)
+    n_ts = N_MEMBERS * N_SCENARIOS * len(VARIABLES)
+
+    return scmdata.ScmRun(
+        rng.normal(size=(YEARS.size, n_ts)),
+        index=YEARS,
+        columns={
+            "climate_model": "model",
+            "model": "iam",
+            "scenario": np.repeat(
+                [f"scenario_{i}" for i in range(N_SCENARIOS)],
+                N_MEMBERS * len(VARIABLES),
+            ).tolist(),
+            "region": "World",
+            "variable": np.tile(np.repeat(VARIABLES, N_MEMBERS), N_SCENARIOS).tolist(),
+            "unit": "K",
+            "run_id": np.tile(np.arange(N_MEMBERS), N_SCENARIOS * len(VARIABLES)),
+        },
+    )
+
+
+ensemble = get_ensemble()
+print(
+    f"{ensemble.shape[0]} timeseries, {len(YEARS)} years, "
+    f"{len(QUANTILES)} quantiles"
+)
+
+new = calculate_quantiles(ensemble, QUANTILES)
+old = calculate_quantiles_process_over(ensemble, QUANTILES)
+pd.testing.assert_frame_equal(
+    new.timeseries().sort_index(), old.timeseries().sort_index()
+)
+
+for name, func in (
+    ("process_over per quantile", calculate_quantiles_process_over),
+    ("single pass", calculate_quantiles),
+):
+    best = min(
+        timeit.repeat(
+            lambda func=func: func(ensemble, QUANTILES), number=1, repeat=N_REPEATS
+        )
+    )
+    print(f"{name}: {best:.3f}s")
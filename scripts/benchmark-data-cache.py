@@ -0,0 +1,95 @@
+"""
+Benchmark the start-up of a worker with and without the compiled data cache
+
+Each measurement runs in a fresh Python process, as a new worker would. It
+loads the packaged input data used by FaIR and CICERO-SCM-PY, either by
+parsing the text files (the previous behaviour) or from the compiled cache
+(see :mod:`openscm_runner.adapters.utils._data_cache`), and reports the time
+taken and the increase in peak resident memory.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+N_REPEATS = 5
+
+SETUP = """
+import json
+import os
+import resource
+import time
+
+import pandas as pd
+
+from openscm_runner.adapters.ciceroscm_py_adapter import cscmpy_wrapper
+from openscm_runner.adapters.ciceroscm_py_adapter._compat import cscmpy
+from openscm_runner.adapters.ciceroscm_py_adapter import make_scenario_data
+from openscm_runner.adapters.fair_adapter import _scmdf_to_emissions, fair_adapter
+
+SSP245_EM_FILE = os.path.join(
+    os.path.dirname(cscmpy_wrapper.__file__),
+    "..",
+    "ciceroscm_adapter",
+    "utils_templates",
+    "ssp245_em_RCMIP.txt",
+)
+NATURAL_FILE = os.path.join(
+    os.path.dirname(fair_adapter.__file__), "natural-emissions-and-forcing.csv"
+)
+
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+"""
+
+TEXT = """
+_scmdf_to_emissions.historical_world_emms_holder.values_fair_units
+pd.read_csv(NATURAL_FILE)
+make_scenario_data._read_ssp245_em(SSP245_EM_FILE)
+cscmpy.input_handler.read_components(cscmpy_wrapper._GASPAM_FILE)
+"""
+
+COMPILED = """
+_scmdf_to_emissions._get_background_emissions()
+fair_adapter._get_natural_emissions_and_forcing(1750, 351)
+make_scenario_data._load_ssp245_em(SSP245_EM_FILE)
+cscmpy_wrapper._load_gaspam()
+"""
+
+REPORT = """
+print(json.dumps({
+    "time": time.perf_counter() - start,
+    "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before,
+}))
+"""
+
+
+def measure(code, env):
+    """
+    Run ``code`` in a new process and return the time and memory it used
+    """
+    res = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", SETUP + code + REPORT],  # noqa: S603
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    return json.loads(res.stdout.splitlines()[-1])
+
+
+with tempfile.TemporaryDirectory() as cache_dir:
+    env = {**os.environ, "OPENSCM_RUNNER_CACHE_DIR": cache_dir}
+
+    first = measure(COMPILED, env)
+    print(f"compiling the cache (first use): {first['time']:.3f}s")
+
+    for name, code in (("parse text files", TEXT), ("load compiled cache", COMPILED)):
+        results = [measure(code, env) for _ in range(N_REPEATS)]
+        print(
+            f"{name}: {statistics.median(r['time'] for r in results):.3f}s, "
+            f"peak RSS +{statistics.median(r['rss'] for r in results) / 1024:.1f}MB"
+        )
@@ -0,0 +1,95 @@
+"""
+Benchmark the FaIR engines
+
+Runs the same scenarios and configs with ``FAIR_ENGINE=fair_scm`` (one call to
+:func:`fair.forward.fair_scm` per run), ``FAIR_ENGINE=batched`` (runs
+integrated together with
+:func:`openscm_runner.adapters.fair_adapter._batched.fair_scm_batched`) and,
+if numba is installed, ``FAIR_ENGINE=numba`` (the same, with a compiled time
+loop) and checks that they all give the same output. The numba engine is run
+once before timing so that compilation isn't included.
+"""
+import os
+import time
+
+import numpy as np
+import scmdata
+
+import openscm_runner.run
+from openscm_runner.adapters.fair_adapter._compat import HAS_NUMBA
+
+N_CONFIGS = 100
+N_WORKERS = 1
+SCENARIOS = ("ssp126", "ssp245", "ssp585")
+OUTPUT_VARIABLES = (
+    "Surface Air Temperature Change",
+    "Effective Radiative Forcing",
+    "Atmospheric Concentrations|CO2",
+)
+
+
+def get_configs():
+    """
+    Get configs to benchmark with
+    """
+    rng = np.random.default_rng(0)
+
+    return [
+        {
+            "r0": rng.uniform(28, 38),
+            "rc": rng.uniform(0.005, 0.025),
+            "rt": rng.uniform(2.5, 6),
+            "F2x": rng.uniform(3.4, 4.2),
+            "ocean_heat_capacity": rng.uniform([6, 80], [10, 150]),
+            "ocean_heat_exchange": rng.uniform(0.5, 0.9),
+            "lambda_global": rng.uniform(0.8, 1.6),
+        }
+        for _ in range(N_CONFIGS)
+    ]
+
+
+def run(engine, scenarios, cfgs):
+    """
+    Run FaIR with ``engine`` and return the output and how long it took
+    """
+    os.environ["FAIR_ENGINE"] = engine
+    start = time.perf_counter()
+    res = openscm_runner.run.run(
+        climate_models_cfgs={"FaIR": cfgs},
+        scenarios=scenarios,
+        output_variables=OUTPUT_VARIABLES,
+    )
+
+    return res, time.perf_counter() - start
+
+
+os.environ["FAIR_WORKER_NUMBER"] = str(N_WORKERS)
+scenarios = scmdata.ScmRun(
+    os.path.join(
+        os.path.dirname(__file__),
+        "..",
+        "tests",
+        "test-data",
+        "rcmip_scen_ssp_world_emissions.csv",
+    ),
+    lowercase_cols=True,
+).filter(scenario=SCENARIOS)
+cfgs = get_configs()
+n_runs = len(SCENARIOS) * N_CONFIGS
+
+engines = ["fair_scm", "batched"]
+if HAS_NUMBA:
+    engines.append("numba")
+    run("numba", scenarios, cfgs[:1])
+
+results = {}
+for engine in engines:
+    res, elapsed = run(engine, scenarios, cfgs)
+    results[engine] = res.timeseries().sort_index()
+    print(f"{engine}: {elapsed:.2f}s ({n_runs / elapsed:.1f} runs/s)")
+
+for engine in engines[1:]:
+    np.testing.assert_allclose(
+        results[engine].to_numpy(), results["fair_scm"].to_numpy(), rtol=1e-7
+    )
+print("Outputs match")
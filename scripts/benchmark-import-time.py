@@ -0,0 +1,72 @@
+"""
+Benchmark how long it takes to import OpenSCM-Runner and get an adapter
+
+Each measurement runs in a fresh Python process. Adapters are imported
+lazily, so importing :mod:`openscm_runner.run` and getting the FaIR adapter
+should not import the dependencies of the other climate models (e.g. pymagicc
+and, through it, pyam).
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+N_REPEATS = 5
+HEAVY_MODULES = ("fair", "pymagicc", "pyam", "ciceroscm", "f90nml")
+
+CASES = {
+    "import openscm_runner.run": "import openscm_runner.run",
+    "import openscm_runner.run + get_adapter('FaIR')": (
+        "import openscm_runner.run\n"
+        "from openscm_runner.adapters import get_adapter\n"
+        "get_adapter('FaIR')"
+    ),
+    "import all adapters": (
+        "from openscm_runner.adapters import get_adapters_classes\n"
+        "get_adapters_classes()"
+    ),
+}
+
+TEMPLATE = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+{code}
+print(json.dumps({{
+    "time": time.perf_counter() - start,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure(code):
+    """
+    Run ``code`` in a new process and return how long it took
+    """
+    res = subprocess.run(
+        [  # noqa: S603
+            sys.executable,
+            "-W",
+            "ignore",
+            "-c",
+            TEMPLATE.format(code=code, heavy=HEAVY_MODULES),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    return json.loads(res.stdout.splitlines()[-1])
+
+
+# warm up the file system cache
+measure(CASES["import all adapters"])
+
+for name, code in CASES.items():
+    results = [measure(code) for _ in range(N_REPEATS)]
+    print(
+        f"{name}: {statistics.median(r['time'] for r in results):.3f}s "
+        f"(imports {', '.join(results[0]['heavy']) or 'no model dependencies'})"
+    )
@@ -0,0 +1,229 @@
+"""
+Detection of duplicate scenarios and configs
+
+Scenario databases often contain identical emissions pathways under different
+(model, scenario) names and ensembles sometimes repeat configs. Each unique
+combination only needs to be run once, after which its output can be copied
+to every (model, scenario, run_id) which requested it.
+"""
+import hashlib
+import logging
+import pickle  # nosec
+
+import numpy as np
+import pandas as pd
+import scmdata
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _normalise(value):
+    """
+    Convert a value into something whose pickle only depends on its content
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalise(v)) for k, v in value.items()))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalise(v) for v in value)
+
+    if isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape, value.tobytes())
+
+    return value
+
+
+def _config_key(cfg):
+    try:
+        return hashlib.sha1(
+            pickle.dumps(_normalise(cfg), protocol=4), usedforsecurity=False
+        ).hexdigest()
+    except (pickle.PicklingError, TypeError, AttributeError):
+        # can't tell whether it is a duplicate so treat it as unique
+        return object()
+
+
+def get_config_codes(cfgs):
+    """
+    Label configs so that identical configs have the same label
+
+    Parameters
+    ----------
+    cfgs : list[dict] or :obj:`ConfigTable`
+        Configs
+
+    Returns
+    -------
+    :obj:`np.ndarray`
+        Label of each config. Labels are numbered in order of first
+        appearance.
+    """
+    codes, _ = pd.factorize(pd.Series([_config_key(cfg) for cfg in cfgs], dtype=object))
+
+    return codes
+
+
+def get_scenario_codes(bundle):
+    """
+    Label scenarios so that scenarios with identical data have the same label
+
+    The model and scenario names are ignored when comparing scenarios.
+
+    Parameters
+    ----------
+    bundle : :obj:`ScenarioBundle`
+        Scenarios
+
+    Returns
+    -------
+    :obj:`np.ndarray`
+        Label of each (scenario, model) group in the bundle. Labels are
+        numbered in order of first appearance.
+    """
+    keys = []
+    for _, timeseries in bundle.groups:
+        content = timeseries.reset_index(["model", "scenario"], drop=True).sort_index()
+        row_hashes = pd.util.hash_pandas_object(content.reset_index(), index=False)
+
+        key = hashlib.sha1(row_hashes.to_numpy().tobytes(), usedforsecurity=False)
+        key.update(np.asarray(content.columns, dtype=int).tobytes())
+        keys.append(key.hexdigest())
+
+    codes, _ = pd.factorize(pd.Series(keys, dtype=object))
+
+    return codes
+
+
+def _first_positions(codes):
+    _, first = np.unique(codes, return_index=True)
+
+    return first
+
+
+class DeduplicationPlan:
+    """
+    Plan for running only the unique combinations of scenarios and configs
+
+    Assumes that the adapter numbers its runs by scenario and then by config
+    (see :attr:`~openscm_runner.adapters.base._Adapter.positional_run_ids`).
+    This is checked in :meth:`fan_out`.
+    """
+
+    def __init__(self, bundle, scenario_codes, cfgs, cfg_codes):
+        """
+        Initialise
+
+        Parameters
+        ----------
+        bundle : :obj:`ScenarioBundle`
+            Scenarios to run
+
+        scenario_codes : :obj:`np.ndarray`
+            Output of :func:`get_scenario_codes` for ``bundle``
+
+        cfgs : list[dict] or :obj:`ConfigTable`
+            Configs to run
+
+        cfg_codes : :obj:`np.ndarray`
+            Output of :func:`get_config_codes` for ``cfgs``
+        """
+        # re-number so that codes are 0, 1, 2... in order of first appearance
+        self.scenario_map = pd.factorize(scenario_codes)[0]
+        self.cfg_map = pd.factorize(cfg_codes)[0]
+        self.bundle = bundle
+        self.all_cfgs = cfgs
+        self.labels = [key for key, _ in bundle.groups]
+        self.n_cfgs = len(cfgs)
+
+        scenario_first = _first_positions(self.scenario_map)
+        cfg_first = _first_positions(self.cfg_map)
+        self.n_unique_cfgs = cfg_first.size
+
+        if self.is_trivial:
+            self.scenarios = bundle
+            self.cfgs = cfgs
+        else:
+            self.scenarios = type(bundle)([bundle.groups[i] for i in scenario_first])
+            self.cfgs = [cfgs[i] for i in cfg_first]
+
+        self._unique_labels = [self.labels[i] for i in scenario_first]
+
+    @property
+    def is_trivial(self):
+        """
+        bool: Are all the scenarios and configs unique?
+        """
+        return self.scenario_map.max(initial=-1) + 1 == len(
+            self.scenario_map
+        ) and self.n_unique_cfgs == len(self.cfg_map)
+
+    def _is_positional(self, run_id, scenarios):
+        n_unique_runs = len(self._unique_labels) * self.n_unique_cfgs
+        if (run_id < 0).any() or (run_id >= n_unique_runs).any():
+            return False
+
+        exp_scenarios = np.array([label[0] for label in self._unique_labels])[
+            run_id // self.n_unique_cfgs
+        ]
+
+        return np.array_equal(exp_scenarios, scenarios)
+
+    def fan_out(self, model_res):
+        """
+        Copy the output of each unique run to every run which requested it
+
+        Parameters
+        ----------
+        model_res : :obj:`scmdata.ScmRun`
+            Output of running the unique :attr:`scenarios` with the unique
+            :attr:`cfgs`
+
+        Returns
+        -------
+        :obj:`scmdata.ScmRun` or None
+            Output for every original (model, scenario) and config, with the
+            run IDs the adapter would have produced without deduplication.
+            ``None`` if the adapter doesn't number its runs by scenario and
+            then by config, in which case the output can't be fanned out.
+        """
+        if self.is_trivial:
+            return model_res
+
+        timeseries = model_res.timeseries()
+        run_id = timeseries.index.get_level_values("run_id").to_numpy().astype(int)
+        if not self._is_positional(
+            run_id, timeseries.index.get_level_values("scenario").to_numpy()
+        ):
+            return None
+
+        order = np.argsort(run_id, kind="stable")
+        sorted_run_id = run_id[order]
+        n_unique_runs = len(self._unique_labels) * self.n_unique_cfgs
+        starts = np.searchsorted(sorted_run_id, np.arange(n_unique_runs))
+        ends = np.searchsorted(sorted_run_id, np.arange(n_unique_runs), side="right")
+
+        # source unique run for every original run, in original run order
+        source = (
+            self.scenario_map[:, np.newaxis] * self.n_unique_cfgs
+            + self.cfg_map[np.newaxis, :]
+        ).ravel()
+        counts = ends[source] - starts[source]
+        offsets = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        rows = order[np.repeat(starts[source], counts) + offsets]
+
+        out = timeseries.iloc[rows]
+        meta = out.index.to_frame(index=False)
+        original_run_id = np.repeat(np.arange(source.size), counts)
+        original_scenario_idx = original_run_id // self.n_cfgs
+        meta["run_id"] = original_run_id
+        for i, column in enumerate(("scenario", "model")):
+            meta[column] = np.array([label[i] for label in self.labels], dtype=object)[
+                original_scenario_idx
+            ]
+        out.index = pd.MultiIndex.from_frame(meta)
+
+        LOGGER.debug("Fanned out %d unique runs to %d runs", n_unique_runs, source.size)
+
+        return scmdata.ScmRun(out)
@@ -1,19 +1,40 @@
 """
 Adapters for different climate models
+
+The built-in adapters are only imported when they are first used (e.g. by
+:func:`get_adapter` or ``from openscm_runner.adapters import FAIR``), so that
+importing OpenSCM-Runner doesn't import the dependencies of every climate model.
 """
+import importlib
 
 from .base import _Adapter
-from .ciceroscm_adapter import CICEROSCM
-from .ciceroscm_py_adapter import CICEROSCMPY
-from .fair_adapter import FAIR
-from .magicc7 import MAGICC7
 
-_registered_adapters: list[type[_Adapter]] = [
-    CICEROSCM,
-    CICEROSCMPY,
-    FAIR,
-    MAGICC7,
-]
+_BUILTIN_ADAPTERS = {
+    # class name: (model name, module)
+    "CICEROSCM": ("CiceroSCM", ".ciceroscm_adapter"),
+    "CICEROSCMPY": ("CiceroSCMPY", ".ciceroscm_py_adapter"),
+    "EMULATOR": ("Emulator", ".emulator_adapter"),
+    "FAIR": ("FaIR", ".fair_adapter"),
+    "MAGICC7": ("MAGICC7", ".magicc7"),
+}
+
+_registered_adapters: list[type[_Adapter]] = []
+
+
+def _load_builtin_adapter(class_name):
+    _, module = _BUILTIN_ADAPTERS[class_name]
+    adapter_cls = getattr(importlib.import_module(module, __name__), class_name)
+    if adapter_cls not in _registered_adapters:
+        _registered_adapters.append(adapter_cls)
+
+    return adapter_cls
+
+
+def __getattr__(name):
+    if name in _BUILTIN_ADAPTERS:
+        return _load_builtin_adapter(name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_adapter(climate_model):
@@ -37,12 +58,14 @@ def get_adapter(climate_model):
     openscm_runner.adapters.base._Adapter
         The adapter for a given climate model
     """
-    adapters_classes = get_adapters_classes()
-
-    for Adapter in adapters_classes:
+    for Adapter in _registered_adapters:
         if Adapter.model_name.upper() == climate_model.upper():
             return Adapter()
 
+    for class_name, (model_name, _) in _BUILTIN_ADAPTERS.items():
+        if model_name.upper() == climate_model.upper():
+            return _load_builtin_adapter(class_name)()
+
     raise NotImplementedError(f"No adapter available for {climate_model}")
 
 
@@ -50,10 +73,15 @@ def get_adapters_classes():
     """
     Get a list of registered adapter classes
 
+    This imports all the built-in adapters.
+
     Returns
     -------
     list of Type[:class:`openscm_runner.adapters.base._Adapter`]
     """
+    for class_name in _BUILTIN_ADAPTERS:
+        _load_builtin_adapter(class_name)
+
     return _registered_adapters
 
 
@@ -75,7 +103,9 @@ def register_adapter_class(adapter_cls: type[_Adapter]):
 
         Invalid or non unique `model_name`
     """
-    existing_names = [a.model_name.upper() for a in _registered_adapters]
+    existing_names = [a.model_name.upper() for a in _registered_adapters] + [
+        model_name.upper() for model_name, _ in _BUILTIN_ADAPTERS.values()
+    ]
 
     if not issubclass(adapter_cls, _Adapter):
         raise ValueError(
@@ -1,10 +1,15 @@
 """
 Base class for adapters
 """
+import os
 from abc import ABC, abstractmethod
 from collections.abc import Iterable
 from typing import Any
 
+from ..settings import config
+from .utils._config_table import as_config_sequence
+from .utils._scenario_bundle import ScenarioBundle
+
 
 class _Adapter(ABC):  # pylint: disable=too-few-public-methods
     """
@@ -14,6 +19,52 @@ class _Adapter(ABC):  # pylint: disable=too-few-public-methods
     # Case-insensitive name of the simple climate model
     model_name = None
 
+    # If ``True``, :meth:`_run` receives the scenarios as a
+    # :obj:`ScenarioBundle`, otherwise it receives an :obj:`scmdata.ScmRun` (or
+    # whatever was passed to :meth:`run`)
+    accepts_scenario_bundle = False
+
+    # Capabilities, used by :func:`openscm_runner.run.run` to decide how to
+    # split up and schedule the work. The defaults describe an adapter which
+    # runs everything it is given in a single call of :meth:`_run`.
+
+    # If ``True``, :meth:`_run` handles many scenarios and configs efficiently
+    # in a single call (e.g. by parallelising over them). Otherwise, scenarios
+    # are passed to the adapter one at a time by default.
+    vectorised = True
+
+    # If ``True``, :meth:`_run` can be called from several threads at once. If
+    # the adapter is given more than one batch of scenarios, the batches are
+    # then run concurrently.
+    thread_safe = False
+
+    # If ``True``, each call of :meth:`_run` sets up expensive per-worker
+    # state (e.g. copies of run directories), so scenarios are passed to the
+    # adapter in as few calls as possible by default.
+    worker_state = False
+
+    # Number of (model, scenario) pairs to pass to the adapter at once by
+    # default (``None`` to use the defaults described above)
+    preferred_scenario_batch_size = None
+
+    # If ``True``, the adapter numbers its runs by scenario and then by config,
+    # counting from zero (i.e. ``run_id = scenario_index * n_cfgs +
+    # cfg_index``), so the runs of a subset of the scenarios or configs can be
+    # given the run IDs they would have in a full run and the output of
+    # deduplicated runs can be copied to the runs which requested it.
+    # Otherwise, run IDs are kept as the adapter reports them (e.g. CICERO-SCM
+    # uses the ``Index`` of each config) and runs aren't deduplicated.
+    positional_run_ids = False
+
+    # Scratch disk space used by each worker (bytes)
+    scratch_disk_per_worker = 0
+
+    # Settings (see :mod:`openscm_runner.settings`) which control the number
+    # of workers and the directory in which workers keep their scratch files
+    # (``None`` if the adapter has no such setting)
+    worker_number_setting = None
+    scratch_dir_setting = None
+
     def __init__(self, *args, **kwargs):
         """
         Initialise the adapter
@@ -52,11 +103,14 @@ class _Adapter(ABC):  # pylint: disable=too-few-public-methods
         """
         Parameters
         ----------
-        scenarios : :obj:`pyam.IamDataFrame`
+        scenarios : :obj:`pyam.IamDataFrame`, :obj:`scmdata.ScmRun` or :obj:`ScenarioBundle`
             Scenarios to run
 
-        cfgs : list[dict]
-            The config with which to run the model
+        cfgs : list[dict], :obj:`pd.DataFrame` or iterable of dict
+            The configs with which to run the model. A :obj:`pd.DataFrame`
+            has one row per config and one column per parameter and is passed
+            to the adapter as a :obj:`ConfigTable`. Other iterables which
+            are not sequences are consumed into a :obj:`list`.
 
         output_variables : list of str or tuple of str
             Variables to include in the output
@@ -68,9 +122,32 @@ class _Adapter(ABC):  # pylint: disable=too-few-public-methods
         -------
         :obj:`ScmRun`
             Model output
-        """
+        """  # noqa: E501
+        if self.accepts_scenario_bundle:
+            scenarios = ScenarioBundle.from_scenarios(scenarios)
+        elif isinstance(scenarios, ScenarioBundle):
+            scenarios = scenarios.to_scmrun()
+
+        cfgs = as_config_sequence(cfgs)
+
         return self._run(scenarios, cfgs, output_variables, output_config)
 
+    @classmethod
+    def get_worker_number(cls):
+        """
+        Get the number of workers the adapter uses
+
+        Returns
+        -------
+        int
+            Value of the adapter's :attr:`worker_number_setting`, defaulting
+            to the number of CPUs
+        """
+        if cls.worker_number_setting is None:
+            return os.cpu_count()
+
+        return int(config.get(cls.worker_number_setting, os.cpu_count()))
+
     @abstractmethod
     def _run(self, scenarios, cfgs, output_variables, output_config):
         """
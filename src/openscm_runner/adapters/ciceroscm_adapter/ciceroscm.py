@@ -1,6 +1,7 @@
 """
 CICEROSCM adapter
 """
+import functools
 import logging
 import os.path
 from subprocess import check_output  # nosec
@@ -22,12 +23,31 @@ def _execute_run(cfgs, output_variables, scenariodata):
     return out
 
 
+@functools.cache
+def _check_executable(executable):
+    """
+    Check that the CICERO-SCM binary can be run (once per process)
+    """
+    try:
+        check_output(executable)  # nosec
+    except OSError as orig_exc:
+        raise OSError(
+            "CICERO-SCM is not available on your operating system"
+        ) from orig_exc
+
+
 class CICEROSCM(_Adapter):  # pylint: disable=too-few-public-methods
     """
     Adapter for CICEROSCM
     """
 
     model_name = "CiceroSCM"
+    accepts_scenario_bundle = True
+    worker_state = True
+    # each worker has its own copy of the CICERO-SCM run directory and output
+    scratch_disk_per_worker = 10 * 1024**2
+    worker_number_setting = "CICEROSCM_WORKER_NUMBER"
+    scratch_dir_setting = "CICEROSCM_WORKER_ROOT_DIR"
 
     def __init__(self):  # pylint: disable=useless-super-delegation
         """
@@ -71,11 +91,6 @@ class CICEROSCM(_Adapter):  # pylint: disable=too-few-public-methods
         executable = _get_executable(
             os.path.join(os.path.dirname(__file__), "utils_templates", "run_dir")
         )
-        try:
-            check_output(executable)  # nosec
-        except OSError as orig_exc:
-            raise OSError(
-                "CICERO-SCM is not available on your operating system"
-            ) from orig_exc
+        _check_executable(executable)
 
         return "v2019vCH4"
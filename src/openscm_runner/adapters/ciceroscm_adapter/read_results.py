@@ -4,8 +4,10 @@ and returns data to append to SCMRun
 """
 import os
 
+import numpy as np
 import pandas as pd
 
+from ..utils._data_cache import load_compiled
 from ..utils.cicero_utils.cicero_forcing_postprocessing_common import (
     get_data_from_forc_common,
     openscm_to_cscm_dict,
@@ -100,9 +102,16 @@ class CSCMREADER:
         Read volcanic forcing timeseries from input
         """
         vfile = os.path.join(self.odir, "input_RF", "RFVOLC", "meanVOLCmnd_ipcc_NH.txt")
-        volc_series = pd.read_csv(
-            vfile, sep="\t", usecols=[0], index_col=False, header=None
+        volc = load_compiled(
+            "cicero-volcanic-forcing",
+            [vfile],
+            lambda: {
+                "values": pd.read_csv(
+                    vfile, sep="\t", usecols=[0], index_col=False, header=None
+                ).to_numpy()
+            },
         )
+        volc_series = pd.DataFrame(np.array(volc["values"]))
         volc_series.index = range(1750, 2501)
         return volc_series
 
@@ -111,7 +120,16 @@ class CSCMREADER:
         Read solar forcing timeseries from input
         """
         sfile = os.path.join(self.odir, "input_RF", "RFSUN", "solar_IPCC.txt")
-        sun_series = pd.read_csv(sfile, sep="\t", index_col=False, header=None)
+        sun = load_compiled(
+            "cicero-solar-forcing",
+            [sfile],
+            lambda: {
+                "values": pd.read_csv(
+                    sfile, sep="\t", index_col=False, header=None
+                ).to_numpy()
+            },
+        )
+        sun_series = pd.DataFrame(np.array(sun["values"]))
         sun_series.index = range(1750, 2501)
         return sun_series
 
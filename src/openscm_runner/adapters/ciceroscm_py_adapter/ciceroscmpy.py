@@ -26,6 +26,9 @@ class CICEROSCMPY(_Adapter):  # pylint: disable=too-few-public-methods
     """
 
     model_name = "CiceroSCMPY"
+    accepts_scenario_bundle = True
+    worker_state = True
+    worker_number_setting = "CICEROSCM_WORKER_NUMBER"
 
     def __init__(self):  # pylint: disable=useless-super-delegation
         """
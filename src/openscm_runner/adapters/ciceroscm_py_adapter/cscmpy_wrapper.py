@@ -7,6 +7,7 @@ import os
 import pandas as pd
 from scmdata import ScmRun, run_append
 
+from ..utils._data_cache import arrays_to_frame, frame_to_arrays, load_compiled
 from ..utils.cicero_utils._utils import _get_unique_index_values
 from ._compat import cscmpy
 from .make_scenario_data import SCENARIODATAGETTER
@@ -14,6 +15,21 @@ from .read_results import CSCMREADER
 
 LOGGER = logging.getLogger(__name__)
 
+_GASPAM_FILE = os.path.join(os.path.dirname(__file__), "gases_vupdate_2022_AR6.txt")
+
+
+def _load_gaspam():
+    """
+    Get the gas parameters, compiled once and then cached
+    """
+    return arrays_to_frame(
+        load_compiled(
+            "cicero-gaspam",
+            [_GASPAM_FILE],
+            lambda: frame_to_arrays(cscmpy.input_handler.read_components(_GASPAM_FILE)),
+        )
+    )
+
 
 def get_start_end_years(scenariodata):
     """
@@ -53,9 +69,7 @@ class CSCMPYWrapper:  # pylint: disable=too-few-public-methods
         self.resultsreader = CSCMREADER(nystart, nyend)
         self.cscm = cscmpy.CICEROSCM(
             {
-                "gaspam_file": os.path.join(
-                    os.path.dirname(__file__), "gases_vupdate_2022_AR6.txt"
-                ),  # TODO set from cfgs
+                "gaspam_data": _load_gaspam(),  # TODO set from cfgs
                 "nyend": nyend,
                 "nystart": nystart,
                 "emstart": emstart,
@@ -9,6 +9,7 @@ import os
 
 import pandas as pd
 
+from ..utils._data_cache import arrays_to_frame, frame_to_arrays, load_compiled
 from ..utils.cicero_utils.make_scenario_common import COMMONSFILEWRITER
 
 LOGGER = logging.getLogger(__name__)
@@ -29,6 +30,19 @@ def _read_ssp245_em(ssp245_em_file):
     return ssp245df
 
 
+def _load_ssp245_em(ssp245_em_file):
+    """
+    Get default data from ssp245_RCMIP, compiled once and then cached
+    """
+    return arrays_to_frame(
+        load_compiled(
+            "cicero-ssp245-emissions",
+            [ssp245_em_file],
+            lambda: frame_to_arrays(_read_ssp245_em(ssp245_em_file)),
+        )
+    )
+
+
 class SCENARIODATAGETTER(COMMONSFILEWRITER):
     """
     Class to write scenariofiles:
@@ -39,7 +53,7 @@ class SCENARIODATAGETTER(COMMONSFILEWRITER):
         Intialise scenario data getter
         """
         super().__init__(udir, syear, eyear)
-        self.ssp245data = _read_ssp245_em(os.path.join(udir, "ssp245_em_RCMIP.txt"))
+        self.ssp245data = _load_ssp245_em(os.path.join(udir, "ssp245_em_RCMIP.txt"))
 
     def get_scenario_data(self, scenarioframe, nystart):
         """
@@ -0,0 +1,5 @@
+"""
+Module supporting the screening emulator adapter
+"""
+from .calibration import accuracy_report, calibrate  # noqa: F401
+from .emulator import EMULATOR  # noqa: F401
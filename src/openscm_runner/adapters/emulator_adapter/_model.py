@@ -0,0 +1,271 @@
+"""
+Linear impulse-response emulator of a simple climate model
+
+The emulator has two parts, both linear in the scenario's emissions (apart
+from the logarithm of the CO2 concentration):
+
+- effective radiative forcing is a weighted sum of forcing *features*
+  (:data:`FEATURES`): the logarithm of the CO2 concentration given by an
+  impulse response to CO2 emissions, the emissions of CH4, N2O and the other
+  greenhouse gases filtered through their atmospheric lifetimes, the aerosol
+  emissions and the volcanic and solar forcing used by FaIR
+- temperature is the response of a two-layer energy balance model to the
+  forcing, written as the sum of two exponential impulse responses with
+  amplitudes ``q`` (K / (W / m^2)) and timescales ``d`` (years), as in AR5
+  (Myhre et al., 2013, Table 8.SM.9)
+
+The forcing weights, ``q`` and ``d`` of each configuration are fitted to the
+output of another climate model (see
+:func:`openscm_runner.adapters.emulator_adapter.calibration.calibrate`).
+
+Both parts are evaluated with array operations over all the scenarios and
+configurations at once, so a run takes milliseconds.
+"""
+import numpy as np
+
+from ..fair_adapter._scmdf_to_emissions import timeseries_to_emissions
+from ..fair_adapter.fair_adapter import _get_natural_emissions_and_forcing
+
+STARTYEAR = 1750
+"""int: First year of the emulator's output"""
+
+PPM_GTC = 2.124
+"""float: Mass of carbon in the atmosphere per ppm of CO2 (GtC / ppm)"""
+
+CO2_PI = 278.0
+"""float: Pre-industrial CO2 concentration (ppm)"""
+
+CO2_IMPULSE_RESPONSE = (
+    np.array([0.2173, 0.2240, 0.2824, 0.2763]),
+    np.array([np.inf, 394.4, 36.54, 4.304]),
+)
+"""
+tuple[:obj:`np.ndarray`]: Fractions and timescales (years) of the CO2
+impulse response function (Joos et al., 2013)
+"""
+
+FEATURES = {
+    # name: (columns of FaIR's emissions, lifetime in years or None if the
+    # forcing responds instantly, output variable the forcing is part of).
+    # CO2 and natural forcing are calculated differently (see get_features).
+    "CO2": ((1, 2), None, "CO2"),
+    "CH4": ((3,), 9.3, "CH4"),
+    "N2O": ((4,), 121.0, "N2O"),
+    "Other Greenhouse Gases": (tuple(range(12, 40)), 50.0, None),
+    "Sulfur": ((5,), None, "Aerosols"),
+    "BC and OC": ((9, 10), None, "Aerosols"),
+    "Natural": ((), None, None),
+}
+"""dict[str: tuple]: Features from which the emulator's forcing is built"""
+
+OUTPUT_UNITS = {
+    "Surface Air Temperature Change": "K",
+    "Effective Radiative Forcing": "W/m**2",
+    "Effective Radiative Forcing|CO2": "W/m**2",
+    "Effective Radiative Forcing|CH4": "W/m**2",
+    "Effective Radiative Forcing|N2O": "W/m**2",
+    "Effective Radiative Forcing|Aerosols": "W/m**2",
+}
+"""dict[str: str]: Variables the emulator outputs and their units"""
+
+
+def exponential_filter(values, timescale):
+    """
+    Convolve timeseries with an exponentially decaying impulse response
+
+    Uses the recurrence ``out[t] = exp(-1 / timescale) * out[t - 1] +
+    values[t]``, evaluated for all the timeseries at once.
+
+    Parameters
+    ----------
+    values : :obj:`np.ndarray`
+        Timeseries, with time as the last axis
+
+    timescale : float or :obj:`np.ndarray`
+        Timescale of the decay (years), broadcastable against
+        ``values[..., 0]``. ``np.inf`` gives the cumulative sum.
+
+    Returns
+    -------
+    :obj:`np.ndarray`
+        Filtered timeseries, with the same shape as ``values``
+    """
+    decay = np.exp(-1 / np.asarray(timescale, dtype=float))
+    out = np.empty(np.broadcast_shapes(values.shape, (*np.shape(decay), 1)))
+    out[..., 0] = values[..., 0]
+    for t in range(1, values.shape[-1]):
+        out[..., t] = decay * out[..., t - 1] + values[..., t]
+
+    return out
+
+
+def get_co2_concentrations(co2_emissions):
+    """
+    Get CO2 concentrations from the impulse response to CO2 emissions
+
+    Parameters
+    ----------
+    co2_emissions : :obj:`np.ndarray`
+        CO2 emissions (GtC / yr), with time as the last axis
+
+    Returns
+    -------
+    :obj:`np.ndarray`
+        CO2 concentrations (ppm)
+    """
+    fractions, timescales = CO2_IMPULSE_RESPONSE
+    airborne = sum(
+        fraction * exponential_filter(co2_emissions, timescale)
+        for fraction, timescale in zip(fractions, timescales)
+    )
+
+    return CO2_PI + airborne / PPM_GTC
+
+
+def get_features(timeseries):
+    """
+    Calculate the forcing features of scenarios
+
+    Parameters
+    ----------
+    timeseries : :obj:`pd.DataFrame`
+        Emissions timeseries with ``scenario``, ``model``, ``variable`` and
+        ``unit`` index levels and integer years as columns (e.g.
+        :attr:`openscm_runner.adapters.utils._scenario_bundle.ScenarioBundle.timeseries`).
+        History is filled in as for FaIR.
+
+    Returns
+    -------
+    list[tuple[str, str]], :obj:`np.ndarray`
+        (scenario, model) pairs (sorted) and features of shape ``(feature,
+        scenario, time)`` (in the order of :data:`FEATURES`, relative to
+        :data:`STARTYEAR`)
+    """
+    scenario_keys, emissions = timeseries_to_emissions(timeseries, startyear=STARTYEAR)
+    # (column, scenario, time)
+    emissions = np.moveaxis(emissions, 2, 0)
+
+    co2_concentrations = get_co2_concentrations(emissions[1] + emissions[2])
+    natural = _get_natural_emissions_and_forcing(STARTYEAR, emissions.shape[2])
+    features = np.empty((len(FEATURES),) + emissions.shape[1:])
+    for i, (name, (columns, lifetime, _)) in enumerate(FEATURES.items()):
+        if name == "CO2":
+            values = np.log(co2_concentrations / CO2_PI)
+        elif name == "Natural":
+            values = np.broadcast_to(
+                natural["volcanic_forcing"] + natural["solar_forcing"],
+                emissions.shape[1:],
+            )
+        else:
+            values = emissions[list(columns)].sum(axis=0)
+            if lifetime is not None:
+                values = exponential_filter(values, lifetime)
+
+        features[i] = values - values[:, :1]
+
+    return scenario_keys, features
+
+
+def get_temperature(forcing, q, d):
+    """
+    Get the two-layer model's temperature response to forcing
+
+    Parameters
+    ----------
+    forcing : :obj:`np.ndarray`
+        Forcing (W / m^2), with time as the last axis
+
+    q : :obj:`np.ndarray`
+        Amplitudes of the two impulse responses (K / (W / m^2)),
+        broadcastable against ``forcing[..., 0]`` with an extra last axis of
+        length 2
+
+    d : :obj:`np.ndarray`
+        Timescales of the two impulse responses (years), same shape as ``q``
+
+    Returns
+    -------
+    :obj:`np.ndarray`
+        Temperature change (K), with the same shape as ``forcing``
+    """
+    q = np.asarray(q, dtype=float)
+    d = np.asarray(d, dtype=float)
+
+    return sum(
+        (q[..., i] / d[..., i])[..., np.newaxis]
+        * exponential_filter(forcing, d[..., i])
+        for i in range(2)
+    )
+
+
+def get_parameters(cfgs):
+    """
+    Stack the parameters of configurations into arrays
+
+    Parameters
+    ----------
+    cfgs : sequence of dict
+        Configurations, each with ``forcing_coefficients`` (a dict with a
+        coefficient for each of :data:`FEATURES`), ``q`` and ``d``
+
+    Returns
+    -------
+    :obj:`np.ndarray`, :obj:`np.ndarray`, :obj:`np.ndarray`
+        Forcing coefficients ``(cfg, feature)``, ``q`` and ``d`` ``(cfg, 2)``
+
+    Raises
+    ------
+    KeyError
+        A configuration is missing a parameter
+    """
+    coefficients = np.array(
+        [[cfg["forcing_coefficients"][name] for name in FEATURES] for cfg in cfgs],
+        dtype=float,
+    ).reshape(len(cfgs), len(FEATURES))
+    q = np.array([cfg["q"] for cfg in cfgs], dtype=float).reshape(len(cfgs), 2)
+    d = np.array([cfg["d"] for cfg in cfgs], dtype=float).reshape(len(cfgs), 2)
+
+    return coefficients, q, d
+
+
+def run_emulator(features, coefficients, q, d):
+    """
+    Run the emulator for every combination of scenario and configuration
+
+    Parameters
+    ----------
+    features : :obj:`np.ndarray`
+        Forcing features ``(feature, scenario, time)``, as returned by
+        :func:`get_features`
+
+    coefficients, q, d : :obj:`np.ndarray`
+        Parameters of the configurations, as returned by
+        :func:`get_parameters`
+
+    Returns
+    -------
+    dict[str: :obj:`np.ndarray`]
+        Each of the variables in :data:`OUTPUT_UNITS`, with shape
+        ``(scenario, cfg, time)``
+    """
+    # (feature, scenario, cfg, time)
+    feature_forcing = (
+        features[:, :, np.newaxis, :] * coefficients.T[:, np.newaxis, :, np.newaxis]
+    )
+    forcing = feature_forcing.sum(axis=0)
+
+    out = {
+        "Surface Air Temperature Change": get_temperature(forcing, q, d),
+        "Effective Radiative Forcing": forcing,
+    }
+    for group in ("CO2", "CH4", "N2O", "Aerosols"):
+        members = [
+            i
+            for i, (*_, out_group) in enumerate(FEATURES.values())
+            if out_group == group
+        ]
+        out[f"Effective Radiative Forcing|{group}"] = feature_forcing[members].sum(
+            axis=0
+        )
+
+    return out
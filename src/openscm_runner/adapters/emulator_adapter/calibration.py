@@ -0,0 +1,366 @@
+"""
+Calibration of the screening emulator against another climate model
+
+The emulator's configurations are fitted to output which has already been
+produced with :func:`openscm_runner.run.run` (e.g. with FaIR or
+CICERO-SCM-PY), one emulator configuration per configuration of the climate
+model:
+
+.. code:: python
+
+    >>> res = run(
+    ...     {"FaIR": fair_cfgs},
+    ...     scenarios,
+    ...     output_variables=(
+    ...         "Effective Radiative Forcing",
+    ...         "Surface Air Temperature Change",
+    ...     ),
+    ... )  # doctest: +SKIP
+    >>> emulator_cfgs = calibrate(
+    ...     scenarios, res, n_configs=len(fair_cfgs)
+    ... )  # doctest: +SKIP
+    >>> accuracy_report(emulator_cfgs, scenarios, res)  # doctest: +SKIP
+
+The forcing coefficients are fitted to the climate model's effective
+radiative forcing by linear least squares. The impulse response of the
+temperature is then fitted to the climate model's temperature, given the
+emulated forcing, by trying each pair of timescales on a grid and solving
+for the amplitudes by least squares. The fit is done for all configurations
+at once.
+"""
+import numpy as np
+import pandas as pd
+
+from ..utils._scenario_bundle import ScenarioBundle
+from ._model import (
+    FEATURES,
+    OUTPUT_UNITS,
+    STARTYEAR,
+    exponential_filter,
+    get_features,
+)
+from .emulator import EMULATOR
+
+FAST_TIMESCALES = np.geomspace(1, 20, 10)
+"""
+:obj:`np.ndarray`: Timescales (years) tried for the fast impulse response
+(mixed layer)
+"""
+
+SLOW_TIMESCALES = np.geomspace(20, 1000, 15)
+"""
+:obj:`np.ndarray`: Timescales (years) tried for the slow impulse response
+(deep ocean)
+"""
+
+
+def _get_target(  # noqa: PLR0913
+    model_output, variable, scenario_keys, n_configs, years, run_ids=None
+):  # pylint:disable=too-many-arguments
+    """
+    Arrange the climate model's output of a variable like the emulator's
+
+    Runs are matched to configs by their position in ``run_ids`` or, if
+    ``run_ids`` is ``None``, by the order of their run IDs within each
+    scenario (run IDs aren't decoded as adapters number their runs
+    differently, e.g. CICERO-SCM uses the ``Index`` of each config).
+
+    Returns
+    -------
+    :obj:`np.ndarray`
+        Output ``(config, scenario, time)``, ``nan`` where there is none
+
+    Raises
+    ------
+    ValueError
+        ``variable`` is not in ``model_output`` or a scenario has more runs
+        than there are configs
+    """
+    output = model_output.filter(variable=variable, log_if_empty=False)
+    if output.empty:
+        raise ValueError(f"{variable} is not in the climate model's output")
+
+    output = output.convert_unit(OUTPUT_UNITS[variable])
+    timeseries = output.timeseries(
+        meta=["scenario", "model", "run_id"], time_axis="year"
+    ).reindex(columns=years)
+
+    scenario_idx = pd.MultiIndex.from_tuples(scenario_keys).get_indexer(
+        timeseries.index.droplevel("run_id")
+    )
+    keep = scenario_idx >= 0
+    run_id = timeseries.index.get_level_values("run_id").to_numpy().astype(int)
+    if run_ids is None:
+        cfg_idx = (
+            pd.Series(run_id).groupby(scenario_idx).rank(method="dense").to_numpy() - 1
+        ).astype(int)
+        if cfg_idx[keep].max(initial=-1) >= n_configs:
+            raise ValueError(
+                f"{variable} has more than {n_configs} runs for a scenario, pass "
+                "the run ID of each config with `run_ids`"
+            )
+    else:
+        cfg_idx = pd.Index(run_ids).get_indexer(run_id)
+        keep &= cfg_idx >= 0
+
+    out = np.full((n_configs, len(scenario_keys), years.size), np.nan)
+    out[cfg_idx[keep], scenario_idx[keep]] = timeseries.to_numpy()[keep]
+
+    return out
+
+
+def _least_squares(design, target):
+    """
+    Solve many masked linear least squares problems at once
+
+    Parameters
+    ----------
+    design : :obj:`np.ndarray`
+        Regressors ``(problem, regressor, point)``
+
+    target : :obj:`np.ndarray`
+        Values to fit ``(problem, point)``, ``nan`` where missing
+
+    Returns
+    -------
+    :obj:`np.ndarray`, :obj:`np.ndarray`
+        Coefficients ``(problem, regressor)`` and sum of squared residuals
+        ``(problem,)``
+    """
+    available = ~np.isnan(target)
+    design = design * available[:, np.newaxis, :]
+    target = np.where(available, target, 0)
+
+    # scale the regressors so that the normal equations are well conditioned
+    scale = np.sqrt(np.mean(design**2, axis=2, keepdims=True))
+    scale[scale == 0] = 1
+    design = design / scale
+
+    gram = np.einsum("nip,njp->nij", design, design)
+    coefficients = np.einsum(
+        "nij,nj->ni",
+        np.linalg.pinv(gram),
+        np.einsum("nip,np->ni", design, target),
+    )
+    residuals = target - np.einsum("ni,nip->np", coefficients, design)
+
+    return coefficients / scale[..., 0], np.sum(residuals**2, axis=1)
+
+
+def calibrate(  # noqa: PLR0913
+    scenarios,
+    model_output,
+    n_configs,
+    forcing_variable="Effective Radiative Forcing",
+    temperature_variable="Surface Air Temperature Change",
+    fast_timescales=FAST_TIMESCALES,
+    slow_timescales=SLOW_TIMESCALES,
+    run_ids=None,
+):  # pylint:disable=too-many-arguments,too-many-locals
+    """
+    Fit emulator configurations to the output of a climate model
+
+    Parameters
+    ----------
+    scenarios : :obj:`pyam.IamDataFrame`, :obj:`scmdata.ScmRun` or :obj:`ScenarioBundle`
+        Scenarios which were run to produce ``model_output``. The more
+        varied they are, the better the emulator can separate the effect of
+        each forcing agent.
+
+    model_output : :obj:`scmdata.ScmRun`
+        Output of the climate model, as returned by
+        :func:`openscm_runner.run.run`. It must include the forcing and
+        temperature variables.
+
+    n_configs : int
+        Number of configurations with which the climate model was run
+
+    forcing_variable : str
+        Variable to which the emulator's forcing is fitted
+
+    temperature_variable : str
+        Variable to which the emulator's temperature is fitted
+
+    fast_timescales, slow_timescales : array_like
+        Timescales (years) tried for the two impulse responses of the
+        temperature
+
+    run_ids : list[int]
+        Run ID of each of the climate model's configurations, in order (e.g.
+        the ``Index`` of each CICERO-SCM config). If ``None``, the runs of
+        each scenario are taken to be in the order of the configurations when
+        sorted by run ID, which holds if the climate model was run with
+        every configuration for every scenario and numbers its runs in the
+        order of the configurations (as FaIR, MAGICC7 and the emulator do).
+
+    Returns
+    -------
+    list[dict]
+        Emulator configuration for each of the climate model's
+        configurations, in order
+
+    Raises
+    ------
+    ValueError
+        ``model_output`` doesn't include a variable, has output from more
+        than one climate model or has no output for a configuration, or
+        ``run_ids`` doesn't have ``n_configs`` elements
+    """
+    if run_ids is not None and len(run_ids) != n_configs:
+        raise ValueError(
+            f"run_ids must have {n_configs} elements, received {len(run_ids)}"
+        )
+
+    climate_models = (
+        model_output.get_unique_meta("climate_model")
+        if "climate_model" in model_output.meta_attributes
+        else []
+    )
+    if len(climate_models) > 1:
+        raise ValueError(
+            "model_output must be the output of a single climate model, "
+            f"received output from {climate_models}"
+        )
+
+    bundle = ScenarioBundle.from_scenarios(scenarios)
+    scenario_keys, features = get_features(bundle.timeseries)
+    n_features, n_scenarios, nt = features.shape
+    years = np.arange(STARTYEAR, STARTYEAR + nt)
+
+    target_forcing = _get_target(
+        model_output, forcing_variable, scenario_keys, n_configs, years, run_ids
+    ).reshape(n_configs, -1)
+    target_temperature = _get_target(
+        model_output, temperature_variable, scenario_keys, n_configs, years, run_ids
+    ).reshape(n_configs, -1)
+
+    missing = np.flatnonzero(
+        np.isnan(target_forcing).all(axis=1) | np.isnan(target_temperature).all(axis=1)
+    )
+    if missing.size:
+        raise ValueError(f"No output for configs {missing.tolist()}")
+
+    design = np.broadcast_to(
+        features.reshape(1, n_features, -1), (n_configs, n_features, n_scenarios * nt)
+    )
+    coefficients, _ = _least_squares(design, target_forcing)
+    forcing = np.einsum("cf,fst->cst", coefficients, features)
+
+    responses = {
+        timescale: exponential_filter(forcing, timescale).reshape(n_configs, -1)
+        / timescale
+        for timescale in np.union1d(fast_timescales, slow_timescales)
+    }
+
+    amplitudes, sse, timescales = [], [], []
+    for fast in fast_timescales:
+        for slow in slow_timescales:
+            if slow <= fast:
+                continue
+
+            fit_amplitudes, fit_sse = _least_squares(
+                np.stack([responses[fast], responses[slow]], axis=1),
+                target_temperature,
+            )
+            amplitudes.append(fit_amplitudes)
+            sse.append(fit_sse)
+            timescales.append((fast, slow))
+
+    # (fit, config)
+    amplitudes, sse, timescales = (
+        np.array(amplitudes),
+        np.array(sse),
+        np.array(timescales),
+    )
+
+    # the best fit with physical (positive) amplitudes is used if there is one
+    physical = (amplitudes >= 0).all(axis=2)
+    chosen = np.where(
+        physical.any(axis=0),
+        np.where(physical, sse, np.inf).argmin(axis=0),
+        sse.argmin(axis=0),
+    )
+    q = amplitudes[chosen, np.arange(n_configs)]
+    d = timescales[chosen]
+
+    return [
+        {
+            "forcing_coefficients": dict(zip(FEATURES, coefficients[i].tolist())),
+            "q": q[i].tolist(),
+            "d": d[i].tolist(),
+        }
+        for i in range(n_configs)
+    ]
+
+
+def accuracy_report(
+    cfgs,
+    scenarios,
+    model_output,
+    variables=("Effective Radiative Forcing", "Surface Air Temperature Change"),
+    run_ids=None,
+):
+    """
+    Compare the emulator with the climate model it was calibrated against
+
+    Parameters
+    ----------
+    cfgs : list[dict]
+        Emulator configurations, as returned by :func:`calibrate`
+
+    scenarios : :obj:`pyam.IamDataFrame`, :obj:`scmdata.ScmRun` or :obj:`ScenarioBundle`
+        Scenarios to compare (which may be different from the ones used for
+        calibration, to test how well the emulator generalises)
+
+    model_output : :obj:`scmdata.ScmRun`
+        Output of the climate model for ``scenarios``, with the climate
+        model's configurations in the same order as ``cfgs``
+
+    variables : tuple[str]
+        Variables to compare
+
+    run_ids : list[int]
+        Run ID of each of the climate model's configurations, see
+        :func:`calibrate`
+
+    Returns
+    -------
+    :obj:`pd.DataFrame`
+        For each variable and scenario (index levels ``variable`` and
+        ``scenario``, with the scenario ``All`` for all the scenarios
+        together), the root mean square error (``rmse``), the largest
+        absolute error (``max_abs_error``) and the mean error (``bias``,
+        emulator minus climate model) over all configurations and the years
+        for which the climate model has output
+    """
+    bundle = ScenarioBundle.from_scenarios(scenarios)
+    emulated = EMULATOR().run(bundle, cfgs, list(variables), None)
+    years = np.unique(emulated["year"])
+    scenario_keys = [key for key, _ in bundle.groups]
+    scenario_names = np.array([scenario for scenario, _ in scenario_keys])
+
+    rows = []
+    for variable in variables:
+        target = _get_target(
+            model_output, variable, scenario_keys, len(cfgs), years, run_ids
+        )
+        emulator = _get_target(emulated, variable, scenario_keys, len(cfgs), years)
+        # (scenario, config and time)
+        error = np.moveaxis(emulator - target, 1, 0).reshape(len(scenario_keys), -1)
+
+        for scenario in [*dict.fromkeys(scenario_names), "All"]:
+            scenario_error = (
+                error if scenario == "All" else error[scenario_names == scenario]
+            )
+            scenario_error = scenario_error[~np.isnan(scenario_error)]
+            rows.append(
+                {
+                    "variable": variable,
+                    "scenario": scenario,
+                    "rmse": np.sqrt(np.mean(scenario_error**2)),
+                    "max_abs_error": np.max(np.abs(scenario_error)),
+                    "bias": np.mean(scenario_error),
+                }
+            )
+
+    return pd.DataFrame(rows).set_index(["variable", "scenario"])
@@ -0,0 +1,94 @@
+"""
+Screening emulator adapter
+"""
+import logging
+
+import numpy as np
+from scmdata import ScmRun
+
+from ... import __version__
+from ..base import _Adapter
+from ._model import (
+    OUTPUT_UNITS,
+    STARTYEAR,
+    get_features,
+    get_parameters,
+    run_emulator,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+class EMULATOR(_Adapter):
+    """
+    Adapter for running the screening emulator
+
+    The emulator is a linear impulse-response model (see
+    :mod:`openscm_runner.adapters.emulator_adapter._model`) whose
+    configurations are fitted to the output of another climate model with
+    :func:`openscm_runner.adapters.emulator_adapter.calibration.calibrate`.
+    All scenarios and configurations are run at once in the calling process,
+    so a run takes a fraction of a second and there are no workers to start.
+    """
+
+    model_name = "Emulator"
+    accepts_scenario_bundle = True
+    thread_safe = True
+    positional_run_ids = True
+
+    def _init_model(self, *args, **kwargs):
+        pass
+
+    def _run(self, scenarios, cfgs, output_variables, output_config):
+        if output_config is not None:
+            raise NotImplementedError("`output_config` not implemented for Emulator")
+
+        output_variables = list(dict.fromkeys(output_variables))
+        for variable in output_variables:
+            if variable not in OUTPUT_UNITS:
+                LOGGER.warning("%s not available from the Emulator", variable)
+
+        output_variables = [v for v in output_variables if v in OUTPUT_UNITS]
+
+        scenario_keys, features = get_features(scenarios.timeseries)
+        output = run_emulator(features, *get_parameters(cfgs))
+
+        n_scenarios, n_cfgs = len(scenario_keys), len(cfgs)
+        n_vars = len(output_variables)
+        # (scenario, cfg, variable, time)
+        data = np.stack([output[variable] for variable in output_variables], axis=2)
+
+        run_id = np.repeat(np.arange(n_scenarios * n_cfgs), n_vars)
+        scenario_idx = run_id // n_cfgs
+
+        res = ScmRun(
+            data.reshape(-1, data.shape[-1]).T,
+            index=np.arange(STARTYEAR, STARTYEAR + data.shape[-1]),
+            columns={
+                "climate_model": self.model_name,
+                "scenario": [scenario_keys[i][0] for i in scenario_idx],
+                "model": [scenario_keys[i][1] for i in scenario_idx],
+                "region": "World",
+                "variable": output_variables * n_scenarios * n_cfgs,
+                "unit": [OUTPUT_UNITS[v] for v in output_variables]
+                * n_scenarios
+                * n_cfgs,
+                "run_id": run_id,
+            },
+        )
+
+        return res
+
+    @staticmethod
+    def get_version():
+        """
+        Get the version of the emulator being used by this adapter
+
+        The emulator is part of OpenSCM-Runner so shares its version.
+
+        Returns
+        -------
+        str
+            The emulator version id
+        """
+        return __version__
@@ -0,0 +1,906 @@
+"""
+Batched FaIR 1.6 engine
+
+:func:`fair.forward.fair_scm` integrates a single run with a Python loop over
+time. This module integrates many runs at once: every array has a leading
+ensemble axis and each timestep is a single vectorised update across all the
+runs in the batch. The runs in a batch can have different scenarios and
+parameters but must use the same model options (see :func:`get_batch_key`).
+
+Only the options used by the FaIR adapter (and the AR6 calibrated configs)
+are implemented: emissions-driven, multi-gas runs with AR6 diagnostics, the
+GIR carbon cycle and the Geoffroy two-layer temperature model. Runs with any
+other options return ``None`` from :func:`get_batch_key` and should be run
+with :func:`fair.forward.fair_scm` instead.
+
+The equations are those of :func:`fair.forward.fair_scm` (FaIR v1.6.4), in
+the same order, so results agree to within floating point rounding.
+"""
+import functools
+import inspect
+
+import numpy as np
+
+from ._compat import fair_scm
+from ._kernel import GHG_METHODS, integrate
+
+_N_FORCING = 45
+
+# indices of the forcing agents in the AR6 diagnostics
+_IF_TRO3 = 31
+_IF_STO3 = 32
+_IF_CH4H = 33
+_IF_CONT = 34
+_IF_ADSO = 35
+_IF_ADVO = 36
+_IF_ADNI = 37
+_IF_ADBC = 38
+_IF_ADOC = 39
+_IF_AERI = 40
+_IF_BCSN = 41
+_IF_LUCH = 42
+_IF_VOLC = 43
+_IF_SOLR = 44
+
+# options which must have these values for a run to be batched
+_REQUIRED_OPTIONS = {
+    "emissions_driven": True,
+    "useMultigas": True,
+    "diagnostics": "AR6",
+    "gir_carbon_cycle": True,
+    "temperature_function": "Geoffroy",
+    "restart_in": False,
+    "restart_out": False,
+    "ariaci_out": False,
+    "scaleHistoricalAR5": False,
+}
+
+# options which select a forcing relationship, with the supported choices
+# (fair_scm only looks at the first letter of most of them)
+_FORCING_OPTIONS = {
+    "ghg_forcing": (lambda value: value.lower(), ("etminan", "meinshausen")),
+    "tropO3_forcing": (lambda value: value[0].lower(), ("c", "t", "r", "e")),
+    "contrail_forcing": (lambda value: value[0].lower(), ("n", "e")),
+    "landuse_forcing": (lambda value: value[0].lower(), ("c", "e")),
+    "bcsnow_forcing": (
+        lambda value: "e" if value[0].lower() == "e" else "external",
+        ("e", "external"),
+    ),
+    "aerosol_forcing": (
+        lambda value: value.lower(),
+        ("aerocom+ghan2",),
+    ),
+}
+
+# shape of each numeric parameter, ``"nt"`` is the number of timesteps. Other
+# parameters are scalars.
+_PARAMETER_SHAPES = {
+    "emissions": ("nt", 40),
+    "natural": ("nt", 2),
+    "scale": ("nt", _N_FORCING),
+    "F_volcanic": ("nt",),
+    "F_solar": ("nt",),
+    "F_contrails": ("nt",),
+    "F_bcsnow": ("nt",),
+    "F_landuse": ("nt",),
+    "F_tropO3": ("nt",),
+    "fossilCH4_frac": ("nt",),
+    "aviNOx_frac": ("nt",),
+    "a": (None,),
+    "tau": (None,),
+    "C_pi": (31,),
+    "E_pi": (40,),
+    "lifetimes": (31,),
+    "b_aero": (7,),
+    "b_tro3": (None,),
+    "ghan_params": (3,),
+    "ocean_heat_capacity": (2,),
+}
+_SCALAR_PARAMETERS = (
+    "F2x",
+    "r0",
+    "rc",
+    "rt",
+    "iirf_h",
+    "F_ref_aviNOx",
+    "E_ref_aviNOx",
+    "F_ref_BC",
+    "E_ref_BC",
+    "oxCH4_frac",
+    "stwv_from_ch4",
+    "ozone_feedback",
+    "aCO2land",
+    "lambda_global",
+    "ocean_heat_exchange",
+    "deep_ocean_efficacy",
+)
+
+
+@functools.cache
+def _get_defaults():
+    return {
+        name: parameter.default
+        for name, parameter in inspect.signature(fair_scm).parameters.items()
+    }
+
+
+@functools.cache
+def _get_constants():
+    # pylint:disable=import-outside-toplevel
+    from fair.constants import br_atoms, cl_atoms, fracrel, lifetime, molwt, radeff
+    from fair.constants.general import (
+        EARTH_RADIUS,
+        M_ATMOS,
+        SECONDS_PER_YEAR,
+        ppm_gtc,
+    )
+
+    emis2conc = M_ATMOS / 1e18 * np.asarray(molwt.aslist) / molwt.AIR
+    emis2conc[2] = emis2conc[2] / (molwt.N2O / molwt.N2)
+
+    return {
+        "emis2conc": emis2conc,
+        "ppm_gtc": ppm_gtc,
+        "ntoa_joule": 4 * np.pi * EARTH_RADIUS**2 * SECONDS_PER_YEAR,
+        "lifetimes": np.asarray(lifetime.aslist, dtype=float),
+        "radeff": np.asarray(radeff.aslist[3:]),
+        "cl": np.asarray(cl_atoms.aslist),
+        "br": np.asarray(br_atoms.aslist),
+        "fracrel": np.asarray(fracrel.aslist),
+        "ch4_to_c": molwt.C / molwt.CH4 * 0.001,
+        "no2_to_n": molwt.NO2 / molwt.N,
+    }
+
+
+def get_batch_key(fair_kwargs):
+    """
+    Get the key which determines which runs can be batched together
+
+    Parameters
+    ----------
+    fair_kwargs : dict
+        Keyword arguments for :func:`fair.forward.fair_scm`
+
+    Returns
+    -------
+    tuple or None
+        Runs with the same key can be run in the same batch. ``None`` if the
+        run uses options which the batched engine doesn't support.
+    """
+    defaults = _get_defaults()
+    if any(key not in defaults for key in fair_kwargs):
+        return None
+
+    for option, required in _REQUIRED_OPTIONS.items():
+        value = fair_kwargs.get(option, defaults[option])
+        if isinstance(value, np.ndarray) or value != required:
+            return None
+
+    emissions = fair_kwargs.get("emissions")
+    if not isinstance(emissions, np.ndarray) or emissions.shape[1:] != (40,):
+        return None
+
+    key = [emissions.shape[0], bool(fair_kwargs.get("scale_F2x", True))]
+    for option, (normalise, supported) in _FORCING_OPTIONS.items():
+        value = normalise(fair_kwargs.get(option, defaults[option]))
+        if value not in supported:
+            return None
+
+        key.append(value)
+
+    return tuple(key)
+
+
+def _stack(values, shape):
+    """
+    Stack the values of a parameter across the runs of a batch
+
+    If every run uses the same object (e.g. a default), it is only broadcast,
+    with a leading axis of length one.
+    """
+    first = values[0]
+    if all(value is first for value in values[1:]):
+        return np.broadcast_to(np.asarray(first, dtype=float), shape)[np.newaxis]
+
+    return np.stack(
+        [np.broadcast_to(np.asarray(v, dtype=float), shape) for v in values]
+    )
+
+
+def _get_parameters(fair_kwargs_list, nt):
+    defaults = _get_defaults()
+    constants = _get_constants()
+
+    def _values(name):
+        return [kwargs.get(name, defaults[name]) for kwargs in fair_kwargs_list]
+
+    params = {}
+    for name, shape in _PARAMETER_SHAPES.items():
+        values = _values(name)
+        if name == "scale":
+            values = [1.0 if value is None else value for value in values]
+        elif name == "lifetimes":
+            values = [
+                value if isinstance(value, np.ndarray) else constants["lifetimes"]
+                for value in values
+            ]
+
+        shape = tuple(  # noqa: PLW2901
+            nt if dim == "nt" else np.shape(values[0])[i] if dim is None else dim
+            for i, dim in enumerate(shape)
+        )
+        params[name] = _stack(values, shape)
+
+    for name in _SCALAR_PARAMETERS:
+        values = _values(name)
+        if name == "stwv_from_ch4":
+            # the default for both Etminan and Meinshausen GHG forcing
+            values = [0.12 if value is None else value for value in values]
+
+        params[name] = _stack(values, ())
+
+    return params
+
+
+def _ghg_forcing(method, conc, conc_pi, f2x, scale_f2x):
+    """
+    CO2, CH4 and N2O forcing (:mod:`fair.forcing.ghg`), vectorised
+    """
+    scale_co2 = 1
+    if scale_f2x:
+        f2x_etminan = (
+            -2.4e-7 * conc_pi[..., 0] ** 2
+            + 7.2e-4 * conc_pi[..., 0]
+            - 2.1e-4 * conc_pi[..., 2]
+            + 5.36
+        ) * np.log(2)
+        scale_co2 = f2x / f2x_etminan
+
+    c_co2, c_ch4, c_n2o = conc[..., 0], conc[..., 1], conc[..., 2]
+    pi_co2, pi_ch4, pi_n2o = conc_pi[..., 0], conc_pi[..., 1], conc_pi[..., 2]
+
+    if method == "etminan":
+        cbar = 0.5 * (c_co2 + pi_co2)
+        mbar = 0.5 * (c_ch4 + pi_ch4)
+        nbar = 0.5 * (c_n2o + pi_n2o)
+
+        f_co2 = (
+            (
+                -2.4e-7 * (c_co2 - pi_co2) ** 2
+                + 7.2e-4 * np.fabs(c_co2 - pi_co2)
+                - 2.1e-4 * nbar
+                + 5.36
+            )
+            * np.log(c_co2 / pi_co2)
+            * scale_co2
+        )
+        f_ch4 = (-1.3e-6 * mbar - 8.2e-6 * nbar + 0.043) * (
+            np.sqrt(c_ch4) - np.sqrt(pi_ch4)
+        )
+        f_n2o = (-8.0e-6 * cbar + 4.2e-6 * nbar - 4.9e-6 * mbar + 0.117) * (
+            np.sqrt(c_n2o) - np.sqrt(pi_n2o)
+        )
+
+        return f_co2, f_ch4, f_n2o
+
+    # meinshausen, with the coefficients of fair.forcing.ghg.meinshausen
+    a1, b1, c1, d1 = -2.4785e-07, 0.00075906, -0.0021492, 5.2488
+    a2, b2, c2, d2 = -0.00034197, 0.00025455, -0.00024357, 0.12173
+    a3, b3, d3 = -8.9603e-05, -0.00012462, 0.045194
+
+    camax = pi_co2 - b1 / (2 * a1)
+    alphap = np.where(
+        c_co2 <= pi_co2,
+        d1,
+        np.where(
+            c_co2 <= camax,
+            d1 + a1 * (c_co2 - pi_co2) ** 2 + b1 * (c_co2 - pi_co2),
+            d1 - b1**2 / (4 * a1),
+        ),
+    )
+    f_co2 = (alphap + c1 * np.sqrt(c_n2o)) * np.log(c_co2 / pi_co2) * scale_co2
+    f_ch4 = (a3 * np.sqrt(c_ch4) + b3 * np.sqrt(c_n2o) + d3) * (
+        np.sqrt(c_ch4) - np.sqrt(pi_ch4)
+    )
+    f_n2o = (a2 * np.sqrt(c_co2) + b2 * np.sqrt(c_n2o) + c2 * np.sqrt(c_ch4) + d2) * (
+        np.sqrt(c_n2o) - np.sqrt(pi_n2o)
+    )
+
+    return f_co2, f_ch4, f_n2o
+
+
+def _eesc(c_ods, c_ods_pi, constants):
+    fc_rel = constants["fracrel"] / constants["fracrel"][0]
+    delta = c_ods - c_ods_pi
+
+    return (
+        np.sum(constants["cl"] * delta * fc_rel, axis=-1)
+        + 45 * np.sum(constants["br"] * delta * fc_rel, axis=-1)
+    ) * constants["fracrel"][0]
+
+
+def _gas_concentrations(params, nt, constants):
+    """
+    Concentrations of every gas except CO2
+
+    These don't depend on the climate so are integrated before the main loop.
+    """
+    emissions = params["emissions"]
+    natural = params["natural"]
+    c_pi = params["C_pi"]
+    n_runs = max(emissions.shape[0], natural.shape[0], c_pi.shape[0])
+
+    decay = np.exp(-1.0 / params["lifetimes"][:, 1:])
+    vm = 1.0 / constants["emis2conc"][1:]
+
+    # emissions of each gas at each timestep, with the natural emissions of
+    # CH4 and N2O at t used for both t-1 and t as in fair_scm
+    emis_prev = np.concatenate(
+        [
+            emissions[:, :-1, 3:5] + natural[:, 1:, :],
+            emissions[:, :-1, 12:],
+        ],
+        axis=-1,
+    )
+    emis_now = np.concatenate(
+        [
+            emissions[:, 1:, 3:5] + natural[:, 1:, :],
+            emissions[:, 1:, 12:],
+        ],
+        axis=-1,
+    )
+    source = 0.5 * (emis_now + emis_prev) * vm
+
+    conc = np.empty((n_runs, nt, 30))
+    conc[:, 0, :] = c_pi[:, 1:]
+    for t in range(1, nt):
+        conc[:, t, :] = (
+            conc[:, t - 1, :] - conc[:, t - 1, :] * (1.0 - decay) + source[:, t - 1, :]
+        )
+
+    return conc
+
+
+def _climate_independent_forcing(params, key, conc, constants):
+    """
+    Calculate the forcing which doesn't depend on CO2 or temperature
+
+    The forcing is not scaled yet.
+    """
+    emissions = params["emissions"]
+    e_pi = params["E_pi"][:, np.newaxis, :]
+    c_pi = params["C_pi"][:, np.newaxis, :]
+    ghg, tro3, contrail, landuse, bcsnow, _ = key[2:]
+    n_runs, nt = conc.shape[:2]
+
+    forcing = np.zeros((n_runs, nt, _N_FORCING))
+
+    # minor gases
+    forcing[:, :, 3:31] = (
+        (conc[:, :, 2:] - c_pi[:, :, 3:]) * constants["radeff"] * 0.001
+    )
+
+    # tropospheric ozone (the temperature feedback of Thornhill-Skeie is added
+    # in the main loop)
+    if tro3 == "c":
+        # fair_scm passes the temperature of the current timestep, which is
+        # always zero when the forcing is calculated, so there is no feedback
+        beta = params["b_tro3"][:, np.newaxis, :]
+        forcing[:, :, _IF_TRO3] = (
+            beta[..., 0] * (conc[:, :, 0] - c_pi[..., 1])
+            + beta[..., 1] * (emissions[..., 6] - e_pi[..., 6])
+            + beta[..., 2] * (emissions[..., 7] - e_pi[..., 7])
+            + beta[..., 3] * (emissions[..., 8] - e_pi[..., 8])
+        )
+    elif tro3 == "t":
+        beta = params["b_tro3"][:, np.newaxis, :]
+        forcing[:, :, _IF_TRO3] = (
+            beta[..., 0] * (conc[:, :, 0] - c_pi[..., 1])
+            + beta[..., 1] * (conc[:, :, 1] - c_pi[..., 2])
+            + beta[..., 2] * _eesc(conc[:, :, 14:], c_pi[:, :, 15:], constants)
+            + beta[..., 3] * (emissions[..., 6] - e_pi[..., 6])
+            + beta[..., 4] * (emissions[..., 7] - e_pi[..., 7])
+            + beta[..., 5] * (emissions[..., 8] - e_pi[..., 8])
+        )
+    elif tro3 == "r":
+        beta = params["b_tro3"][:, np.newaxis, :]
+        forcing[:, :, _IF_TRO3] = (
+            beta[..., 0] * (emissions[..., 3] - e_pi[..., 3])
+            + beta[..., 1] * (emissions[..., 6] - e_pi[..., 6])
+            + beta[..., 2] * (emissions[..., 7] - e_pi[..., 7])
+            + beta[..., 3] * (emissions[..., 8] - e_pi[..., 8])
+        )
+    else:
+        forcing[:, :, _IF_TRO3] = params["F_tropO3"]
+
+    # stratospheric ozone (part of the ozone forcing for Thornhill-Skeie)
+    if tro3 != "t":
+        eesc = np.maximum(
+            _eesc(1000.0 * conc[:, :, 14:], 1000.0 * c_pi[:, :, 15:], constants), 0
+        )
+        forcing[:, :, _IF_STO3] = -1.46030698e-5 * (2.05401270e-3 * eesc) ** 1.03143308
+
+    # contrails
+    if contrail == "n":
+        forcing[:, :, _IF_CONT] = (
+            emissions[..., 8]
+            * params["aviNOx_frac"]
+            * (params["F_ref_aviNOx"] / params["E_ref_aviNOx"])[:, np.newaxis]
+            * constants["no2_to_n"]
+        )
+    else:
+        forcing[:, :, _IF_CONT] = params["F_contrails"]
+
+    # aerosols (aerocom direct and ghan2 indirect)
+    b_aero = params["b_aero"][:, np.newaxis, :]
+    delta = emissions[..., 5:12] - e_pi[..., 5:12]
+    forcing[:, :, _IF_ADSO] = b_aero[..., 0] * delta[..., 0]
+    forcing[:, :, _IF_ADVO] = (
+        b_aero[..., 1] * delta[..., 1] + b_aero[..., 2] * delta[..., 2]
+    )
+    forcing[:, :, _IF_ADNI] = (
+        b_aero[..., 3] * delta[..., 3] + b_aero[..., 6] * delta[..., 6]
+    )
+    forcing[:, :, _IF_ADBC] = b_aero[..., 4] * delta[..., 4]
+    forcing[:, :, _IF_ADOC] = b_aero[..., 5] * delta[..., 5]
+
+    ghan = params["ghan_params"][:, np.newaxis, :]
+    forcing[:, :, _IF_AERI] = -ghan[..., 0] * np.log(
+        1
+        + emissions[..., 5] / ghan[..., 1]
+        + emissions[..., 9:11].sum(axis=-1) / ghan[..., 2]
+    ) + ghan[..., 0] * np.log(
+        1 + e_pi[..., 5] / ghan[..., 1] + e_pi[..., 9:11].sum(axis=-1) / ghan[..., 2]
+    )
+
+    # black carbon on snow
+    if bcsnow == "e":
+        forcing[:, :, _IF_BCSN] = (emissions[..., 9] - e_pi[..., 9]) * (
+            params["F_ref_BC"] / params["E_ref_BC"]
+        )[:, np.newaxis]
+    else:
+        forcing[:, :, _IF_BCSN] = params["F_bcsnow"]
+
+    # land use
+    if landuse == "c":
+        forcing[:, :, _IF_LUCH] = (
+            np.cumsum(emissions[..., 2] - e_pi[..., 2], axis=1)
+            * params["aCO2land"][:, np.newaxis]
+        )
+    else:
+        forcing[:, :, _IF_LUCH] = params["F_landuse"]
+
+    forcing[:, :, _IF_VOLC] = params["F_volcanic"]
+    forcing[:, :, _IF_SOLR] = params["F_solar"]
+
+    # CH4 forcing doesn't depend on CO2, so stratospheric water vapour from
+    # CH4 oxidation can also be calculated here
+    _, f_ch4, _ = _ghg_forcing(
+        ghg,
+        np.concatenate([np.ones((n_runs, nt, 1)), conc[:, :, :2]], axis=-1),
+        c_pi[:, :, :3],
+        params["F2x"][:, np.newaxis],
+        key[1],
+    )
+    forcing[:, :, 1] = f_ch4
+    forcing[:, :, _IF_CH4H] = params["stwv_from_ch4"][:, np.newaxis] * f_ch4
+
+    return forcing
+
+
+def _geoffroy_coefficients(params):
+    """
+    Coefficients of the two-layer model (:mod:`fair.temperature.geoffroy`)
+    """
+    lambda_global = params["lambda_global"]
+    heat_capacity = params["ocean_heat_capacity"]
+    efficacy = params["deep_ocean_efficacy"]
+    exchange = params["ocean_heat_exchange"]
+
+    cdeep_p = heat_capacity[:, 1] * efficacy
+    gamma_p = exchange * efficacy
+    g1 = (lambda_global + gamma_p) / heat_capacity[:, 0]
+    g2 = gamma_p / cdeep_p
+    g = g1 + g2
+    gstar = g1 - g2
+    delsqrt = np.sqrt(g * g - 4 * g2 * lambda_global / heat_capacity[:, 0])
+    afast = (g + delsqrt) / 2
+    aslow = (g - delsqrt) / 2
+    cc = 0.5 / (heat_capacity[:, 0] * delsqrt)
+    adeep_f = -gamma_p / (heat_capacity[:, 0] * cdeep_p * delsqrt)
+
+    adf = 1 / afast
+    ads = 1 / aslow
+
+    return {
+        # (run, component) with component (fast, slow)
+        "a": np.stack([afast, aslow], axis=-1),
+        "ad": np.stack([adf, ads], axis=-1),
+        "exp": np.stack([np.exp(-1.0 / adf), np.exp(-1.0 / ads)], axis=-1),
+        "amix": np.stack([cc * (gstar + delsqrt), -cc * (gstar - delsqrt)], axis=-1),
+        "adeep": np.stack([adeep_f, -adeep_f], axis=-1),
+        "heat_capacity": heat_capacity,
+        "lambda_global": lambda_global,
+        "factor_lambda_eff": (efficacy - 1.0) * exchange,
+    }
+
+
+def _step_temperature(temp_mix, temp_deep, f0, f1, coeffs):
+    """
+    One step of :func:`fair.temperature.geoffroy.forcing_to_temperature`
+    """
+    f0 = f0[:, np.newaxis]
+    f1 = f1[:, np.newaxis]
+    ad = coeffs["ad"]
+    exp = coeffs["exp"]
+    integral = (f0 * ad + f1 * (1 - ad) - exp * (f0 * (1 + ad) - f1 * ad)) / coeffs["a"]
+
+    temp_mix1 = exp * temp_mix + coeffs["amix"] * integral
+    temp_deep1 = exp * temp_deep + coeffs["adeep"] * integral
+
+    heat_capacity = coeffs["heat_capacity"]
+    c_dtemp = heat_capacity[:, 0] * (
+        temp_mix1.sum(axis=-1) - temp_mix.sum(axis=-1)
+    ) + heat_capacity[:, 1] * (temp_deep1.sum(axis=-1) - temp_deep.sum(axis=-1))
+
+    sum_mix = temp_mix1.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(
+            np.abs(sum_mix) > 1e-6,  # noqa: PLR2004
+            (sum_mix - temp_deep1.sum(axis=-1)) / sum_mix,
+            1.0,
+        )
+
+    lambda_eff = coeffs["lambda_global"] + coeffs["factor_lambda_eff"] * ratio
+
+    return temp_mix1, temp_deep1, c_dtemp, lambda_eff
+
+
+def fair_scm_batched(fair_kwargs_list, compiled=False, warm_start=True):  # pylint:disable=too-many-locals
+    """
+    Run a batch of FaIR runs at once
+
+    Parameters
+    ----------
+    fair_kwargs_list : list[dict]
+        Keyword arguments for :func:`fair.forward.fair_scm` for each run. All
+        the runs must have the same (not ``None``) :func:`get_batch_key`.
+
+    compiled : bool
+        Step through time with
+        :func:`openscm_runner.adapters.fair_adapter._kernel.integrate`
+        (compiled with numba if it is installed) rather than with numpy
+        operations over the batch
+
+    warm_start : bool
+        Integrate the history which runs share (e.g. the same config run with
+        scenarios whose emissions only differ after the historical period)
+        only once and branch each run from it (see
+        :func:`_find_shared_history`). The results are the same as without a
+        warm start.
+
+    Returns
+    -------
+    tuple[:obj:`np.ndarray`]
+        Concentrations, forcing, temperature, effective climate feedback,
+        ocean heat content, heat flux and airborne fraction as returned by
+        :func:`fair.forward.fair_scm`, each with a leading axis over the runs
+    """
+    key = get_batch_key(fair_kwargs_list[0])
+    nt = key[0]
+    n_runs = len(fair_kwargs_list)
+    constants = _get_constants()
+    stacked = _get_parameters(fair_kwargs_list, nt)
+    params = {
+        name: np.broadcast_to(value, (n_runs, *value.shape[1:]))
+        for name, value in stacked.items()
+    }
+
+    emissions = params["emissions"]
+    c_pi = params["C_pi"]
+
+    conc = np.empty((n_runs, nt, 31))
+    conc[:, :, 1:] = _gas_concentrations(params, nt, constants)
+
+    forcing = _climate_independent_forcing(params, key, conc[:, :, 1:], constants)
+
+    # carbon cycle
+    a = params["a"]
+    tau = params["tau"]
+    iirf_h = params["iirf_h"][:, np.newaxis]
+    g1 = np.sum(a * tau * (1 - (1 + iirf_h / tau) * np.exp(-iirf_h / tau)), axis=-1)
+    g0 = 1 / (np.sinh(np.sum(a * tau * (1 - np.exp(-iirf_h / tau)), axis=-1) / g1))
+    co2_emissions = emissions[..., 1:3].sum(axis=-1)
+    cumulative_emissions = np.cumsum(co2_emissions, axis=1)
+    airborne_emissions = np.zeros((n_runs, nt))
+    oxidised_ch4 = np.maximum(
+        (conc[:, :-1, 1] - c_pi[:, 1:2])
+        * (1.0 - np.exp(-1.0 / params["lifetimes"][:, 1:2]))
+        * (constants["ch4_to_c"] * params["oxCH4_frac"][:, np.newaxis])
+        * params["fossilCH4_frac"][:, 1:],
+        0,
+    )
+
+    coeffs = _geoffroy_coefficients(params)
+    temperature = np.zeros((n_runs, nt))
+    lambda_eff = np.zeros((n_runs, nt))
+    heatflux = np.zeros((n_runs, nt))
+    ohc = np.zeros((n_runs, nt))
+
+    # the climate-dependent part has to be stepped through time
+    integrate_func = _integrate_compiled if compiled else _integrate_numpy
+    carbon = (g0, g1, co2_emissions, cumulative_emissions, oxidised_ch4)
+    outputs = (temperature, lambda_eff, heatflux, ohc, airborne_emissions)
+    state = (
+        np.zeros((n_runs, a.shape[1])),
+        np.zeros((n_runs, 2)),
+        np.zeros((n_runs, 2)),
+        np.zeros(n_runs),
+    )
+
+    history = _find_shared_history(stacked, n_runs) if warm_start else None
+    start = 0
+    if history is not None:
+        representatives, inverse, start = history
+
+        def _take(value):
+            return value[representatives]
+
+        history_conc = _take(conc)
+        history_forcing = _take(forcing)
+        history_outputs = tuple(_take(value) for value in outputs)
+        history_state = tuple(_take(value) for value in state)
+        integrate_func(
+            {name: _take(value) for name, value in params.items()},
+            key,
+            constants,
+            history_conc,
+            history_forcing,
+            tuple(_take(value) for value in carbon),
+            {name: _take(value) for name, value in coeffs.items()},
+            history_outputs,
+            range(start),
+            history_state,
+        )
+
+        # branch every run from its representative's history
+        conc[:, :start, 0] = history_conc[inverse, :start, 0]
+        forcing[:, :start, :] = history_forcing[inverse, :start, :]
+        for value, history_value in zip(outputs, history_outputs):
+            value[:, :start] = history_value[inverse, :start]
+
+        for value, history_value in zip(state, history_state):
+            value[...] = history_value[inverse]
+
+    integrate_func(
+        params,
+        key,
+        constants,
+        conc,
+        forcing,
+        carbon,
+        coeffs,
+        outputs,
+        range(start, nt),
+        state,
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        airborne_fraction = airborne_emissions / cumulative_emissions
+
+    return (
+        conc,
+        forcing,
+        temperature,
+        lambda_eff,
+        ohc,
+        heatflux,
+        airborne_fraction,
+    )
+
+
+def _find_shared_history(params, n_runs):
+    """
+    Find runs which share their history
+
+    Runs share their history if all their time-independent parameters are the
+    same and their time-dependent inputs (emissions, natural emissions,
+    external forcing, scale factors etc.) are the same up to some timestep.
+    FaIR is causal, so their outputs are identical up to that timestep and
+    only need to be calculated for one of the runs.
+
+    Parameters
+    ----------
+    params : dict[str: :obj:`np.ndarray`]
+        Parameters of the runs as returned by :func:`_get_parameters` (with a
+        leading axis over the runs, or of length one if every run uses the
+        same value)
+
+    n_runs : int
+        Number of runs
+
+    Returns
+    -------
+    tuple[:obj:`np.ndarray`, :obj:`np.ndarray`, int] or None
+        Indices of the runs which represent each history, the index of the
+        representative of each run and the number of timesteps which every
+        run shares with its representative. ``None`` if no runs share a
+        history.
+    """
+    # parameters which every run shares can be ignored
+    varying = [name for name, value in params.items() if value.shape[0] > 1]
+    time_dependent = [
+        name
+        for name in varying
+        if name in _PARAMETER_SHAPES and _PARAMETER_SHAPES[name][0] == "nt"
+    ]
+    time_independent = [name for name in varying if name not in time_dependent]
+
+    groups = {}
+    for i in range(n_runs):
+        signature = b"".join(
+            np.ascontiguousarray(params[name][i]).tobytes() for name in time_independent
+        )
+        groups.setdefault(signature, []).append(i)
+
+    if len(groups) == n_runs:
+        return None
+
+    representative = np.empty(n_runs, dtype=int)
+    for members in groups.values():
+        representative[members] = members[0]
+
+    differs = np.zeros((n_runs, params["F_solar"].shape[1]), dtype=bool)
+    for name in time_dependent:
+        value = params[name]
+        differs |= (
+            (value != value[representative])
+            .reshape(n_runs, value.shape[1], -1)
+            .any(axis=-1)
+        )
+
+    shared = np.where(differs.any(axis=1), differs.argmax(axis=1), differs.shape[1])
+    start = int(shared[representative != np.arange(n_runs)].min())
+    if start == 0:
+        return None
+
+    representatives, inverse = np.unique(representative, return_inverse=True)
+
+    return representatives, inverse, start
+
+
+def _integrate_compiled(  # noqa: PLR0913
+    params, key, constants, conc, forcing, carbon, coeffs, outputs, steps, state
+):  # pylint:disable=too-many-arguments
+    g0, g1, co2_emissions, cumulative_emissions, oxidised_ch4 = carbon
+    n_runs = conc.shape[0]
+    c_pi = params["C_pi"][:, :3]
+
+    scale_co2 = np.ones(n_runs)
+    if key[1]:
+        scale_co2 = params["F2x"] / (
+            (
+                -2.4e-7 * c_pi[:, 0] ** 2
+                + 7.2e-4 * c_pi[:, 0]
+                - 2.1e-4 * c_pi[:, 2]
+                + 5.36
+            )
+            * np.log(2)
+        )
+
+    def _per_run(value):
+        return np.ascontiguousarray(np.broadcast_to(value, (n_runs, *value.shape[1:])))
+
+    ozone_feedback = np.zeros(n_runs)
+    if key[3] == "t":
+        ozone_feedback = _per_run(params["ozone_feedback"])
+
+    integrate(
+        conc,
+        forcing,
+        _per_run(params["scale"]),
+        (
+            _per_run(params["a"]),
+            _per_run(params["tau"]),
+            _per_run(g0),
+            _per_run(g1),
+            _per_run(params["r0"]),
+            _per_run(params["rc"]),
+            _per_run(params["rt"]),
+            _per_run(co2_emissions),
+            _per_run(cumulative_emissions),
+            _per_run(oxidised_ch4),
+            _per_run(c_pi),
+            _per_run(scale_co2),
+            float(constants["ppm_gtc"]),
+        ),
+        (
+            _per_run(coeffs["a"]),
+            _per_run(coeffs["ad"]),
+            _per_run(coeffs["exp"]),
+            _per_run(coeffs["amix"]),
+            _per_run(coeffs["adeep"]),
+            _per_run(coeffs["heat_capacity"]),
+            _per_run(coeffs["lambda_global"]),
+            _per_run(coeffs["factor_lambda_eff"]),
+            float(constants["ntoa_joule"]),
+        ),
+        GHG_METHODS[key[2]],
+        ozone_feedback,
+        outputs,
+        steps.start,
+        steps.stop,
+        state,
+    )
+
+
+def _integrate_numpy(  # noqa: PLR0913
+    params, key, constants, conc, forcing, carbon, coeffs, outputs, steps, state
+):  # pylint:disable=too-many-arguments,too-many-locals
+    g0, g1, co2_emissions, cumulative_emissions, oxidised_ch4 = carbon
+    temperature, lambda_eff, heatflux, ohc, airborne_emissions = outputs
+    a = params["a"]
+    tau = params["tau"]
+    c_pi = params["C_pi"]
+    ppm_gtc = constants["ppm_gtc"]
+    scale = params["scale"]
+    ozone_feedback = params["ozone_feedback"] if key[3] == "t" else None
+
+    carbon_boxes, temp_mix, temp_deep, forcing_total_prev = state
+    if steps.start == 0:
+        carbon_boxes = a * co2_emissions[:, 0, np.newaxis] / ppm_gtc
+        conc[:, 0, 0] = np.sum(carbon_boxes, axis=-1) + c_pi[:, 0]
+        forcing_total_prev = None
+
+    for t in steps:
+        if t > 0:
+            iirf = (
+                params["r0"]
+                + params["rc"]
+                * (cumulative_emissions[:, t - 1] - airborne_emissions[:, t - 1])
+                + params["rt"] * temperature[:, t - 1]
+            )
+            iirf = (iirf > 97.0) * 97.0 + iirf * (iirf < 97.0)  # noqa: PLR2004
+            alpha = (g0 * np.sinh(iirf / g1))[:, np.newaxis]
+
+            boxes_prev = carbon_boxes + oxidised_ch4[:, t - 1, np.newaxis]
+            decay = np.exp(-1 / (alpha * tau))
+            carbon_boxes = (
+                co2_emissions[:, t - 1, np.newaxis]
+                / ppm_gtc
+                * a
+                * alpha
+                * tau
+                * (1.0 - decay)
+                + boxes_prev * decay
+            )
+            conc[:, t, 0] = c_pi[:, 0] + np.sum(carbon_boxes + boxes_prev, axis=-1) / 2
+            airborne_emissions[:, t] = np.sum(carbon_boxes, axis=-1) * ppm_gtc
+
+        f_co2, _, f_n2o = _ghg_forcing(
+            key[2], conc[:, t, :3], c_pi[:, :3], params["F2x"], key[1]
+        )
+        forcing[:, t, 0] = f_co2
+        forcing[:, t, 2] = f_n2o
+        if ozone_feedback is not None:
+            forcing[:, t, _IF_TRO3] += ozone_feedback * temperature[:, max(t - 1, 0)]
+
+        forcing[:, t, :] *= scale[:, t, :]
+        forcing_total = np.sum(forcing[:, t, :], axis=-1)
+
+        temp_mix, temp_deep, c_dtemp, lambda_eff[:, t] = _step_temperature(
+            temp_mix,
+            temp_deep,
+            forcing_total if forcing_total_prev is None else forcing_total_prev,
+            forcing_total,
+            coeffs,
+        )
+        forcing_total_prev = forcing_total
+        temperature[:, t] = temp_mix.sum(axis=-1)
+        heatflux[:, t] = c_dtemp
+        ohc[:, t] = (0 if t == 0 else ohc[:, t - 1]) + constants["ntoa_joule"] * c_dtemp
+
+    for current, value in zip(state, (carbon_boxes, temp_mix, temp_deep)):
+        current[...] = value
+
+    state[3][...] = forcing_total_prev
@@ -11,3 +11,11 @@ except ImportError:
     fair = None
     fair_scm = None
     HAS_FAIR = False
+
+try:
+    import numba
+
+    HAS_NUMBA = True
+except ImportError:
+    numba = None
+    HAS_NUMBA = False
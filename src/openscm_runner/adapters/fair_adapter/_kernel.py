@@ -0,0 +1,322 @@
+"""
+Compiled time-stepping core of the batched FaIR engine
+
+The climate-dependent part of :func:`fair.forward.fair_scm` (the CO2 carbon
+cycle, CO2 and N2O forcing, the ozone temperature feedback and the two-layer
+temperature model) has to be stepped through time. In
+:func:`openscm_runner.adapters.fair_adapter._batched.fair_scm_batched` each
+step is a handful of numpy operations over the batch, so the cost is dominated
+by numpy's per-call overhead. Here the same step is written as scalar loops
+over runs and time which `numba <https://numba.pydata.org/>`_ compiles to
+machine code.
+
+If numba isn't installed, :func:`integrate` still works (it is plain Python)
+but is far slower than the numpy engine, so it is only used when numba is
+available (see
+:data:`openscm_runner.adapters.fair_adapter._compat.HAS_NUMBA`).
+"""
+import math
+
+from ._compat import numba
+
+GHG_METHODS = {"etminan": 0, "meinshausen": 1}
+"""dict[str: int]: Codes of the GHG forcing methods passed to :func:`integrate`"""
+
+
+def _jit(func):
+    if numba is None:
+        return func
+
+    return numba.njit(cache=True, nogil=True)(func)
+
+
+@_jit
+def _co2_n2o_forcing(  # noqa: PLR0913
+    method, c_co2, c_ch4, c_n2o, pi_co2, pi_ch4, pi_n2o, scale_co2
+):  # pylint:disable=too-many-arguments
+    """
+    CO2 and N2O forcing of a single run and timestep (:mod:`fair.forcing.ghg`)
+    """
+    if method == 0:
+        cbar = 0.5 * (c_co2 + pi_co2)
+        mbar = 0.5 * (c_ch4 + pi_ch4)
+        nbar = 0.5 * (c_n2o + pi_n2o)
+
+        f_co2 = (
+            (
+                -2.4e-7 * (c_co2 - pi_co2) ** 2
+                + 7.2e-4 * abs(c_co2 - pi_co2)
+                - 2.1e-4 * nbar
+                + 5.36
+            )
+            * math.log(c_co2 / pi_co2)
+            * scale_co2
+        )
+        f_n2o = (-8.0e-6 * cbar + 4.2e-6 * nbar - 4.9e-6 * mbar + 0.117) * (
+            math.sqrt(c_n2o) - math.sqrt(pi_n2o)
+        )
+
+        return f_co2, f_n2o
+
+    a1, b1, c1, d1 = -2.4785e-07, 0.00075906, -0.0021492, 5.2488
+    a2, b2, c2, d2 = -0.00034197, 0.00025455, -0.00024357, 0.12173
+
+    camax = pi_co2 - b1 / (2 * a1)
+    if c_co2 <= pi_co2:
+        alphap = d1
+    elif c_co2 <= camax:
+        alphap = d1 + a1 * (c_co2 - pi_co2) ** 2 + b1 * (c_co2 - pi_co2)
+    else:
+        alphap = d1 - b1**2 / (4 * a1)
+
+    f_co2 = (alphap + c1 * math.sqrt(c_n2o)) * math.log(c_co2 / pi_co2) * scale_co2
+    f_n2o = (
+        a2 * math.sqrt(c_co2) + b2 * math.sqrt(c_n2o) + c2 * math.sqrt(c_ch4) + d2
+    ) * (math.sqrt(c_n2o) - math.sqrt(pi_n2o))
+
+    return f_co2, f_n2o
+
+
+@_jit
+def _carbon_cycle_step(  # noqa: PLR0913
+    i, t, carbon, temperature, airborne_emissions, boxes
+):  # pylint:disable=too-many-arguments
+    """
+    Step the carbon cycle of a single run to ``t`` (:mod:`fair.gas_cycle.fair1`)
+
+    Returns
+    -------
+    float, float
+        Sum of the carbon boxes at ``t`` and that sum plus the sum at
+        ``t - 1`` (including oxidised CH4)
+    """
+    (
+        a,
+        tau,
+        g0,
+        g1,
+        r0,
+        rc,
+        rt,
+        co2_emissions,
+        cumulative_emissions,
+        oxidised_ch4,
+        _,
+        _,
+        ppm_gtc,
+    ) = carbon
+
+    iirf = (
+        r0[i]
+        + rc[i] * (cumulative_emissions[i, t - 1] - airborne_emissions[i, t - 1])
+        + rt[i] * temperature[i, t - 1]
+    )
+    # as in fair_scm, which sets iirf to zero if it is exactly 97
+    if iirf > 97.0:  # noqa: PLR2004
+        iirf = 97.0
+    elif iirf == 97.0:  # noqa: PLR2004
+        iirf = 0.0
+    alpha = g0[i] * math.sinh(iirf / g1[i])
+
+    total = 0.0
+    total_with_prev = 0.0
+    for box in range(a.shape[1]):
+        box_prev = boxes[box] + oxidised_ch4[i, t - 1]
+        decay = math.exp(-1 / (alpha * tau[i, box]))
+        boxes[box] = (
+            co2_emissions[i, t - 1]
+            / ppm_gtc
+            * a[i, box]
+            * alpha
+            * tau[i, box]
+            * (1.0 - decay)
+            + box_prev * decay
+        )
+        total += boxes[box]
+        total_with_prev += boxes[box] + box_prev
+
+    return total, total_with_prev
+
+
+@_jit
+def integrate(  # noqa: PLR0913
+    conc,
+    forcing,
+    scale,
+    carbon,
+    climate,
+    ghg_method,
+    ozone_feedback,
+    outputs,
+    start,
+    stop,
+    state,
+):  # pylint:disable=too-many-arguments,too-many-locals,too-many-statements
+    """
+    Step the climate-dependent part of FaIR through time
+
+    All the arrays have a leading axis over the runs. The output arrays are
+    filled in place.
+
+    Integration can be split into several calls (e.g. to integrate a shared
+    history once, see
+    :func:`openscm_runner.adapters.fair_adapter._batched.fair_scm_batched`):
+    each call steps from ``start`` up to, but not including, ``stop`` and
+    leaves the state needed to continue in ``state``.
+
+    Parameters
+    ----------
+    conc : :obj:`np.ndarray`
+        Concentrations ``(run, time, 31)``, with every gas except CO2 already
+        filled in. CO2 concentrations are written to ``conc[:, :, 0]``.
+
+    forcing : :obj:`np.ndarray`
+        Unscaled forcing ``(run, time, 45)`` which doesn't depend on CO2 or
+        temperature. The CO2 and N2O forcing and the ozone temperature
+        feedback are added, then the forcing is scaled in place.
+
+    scale : :obj:`np.ndarray`
+        Forcing scale factors ``(run, time, 45)``
+
+    carbon : tuple[:obj:`np.ndarray`]
+        Carbon cycle inputs: ``a`` and ``tau`` ``(run, 4)``; ``g0``, ``g1``,
+        ``r0``, ``rc``, ``rt`` ``(run,)``; CO2 emissions and cumulative
+        emissions ``(run, time)``; oxidised fossil CH4 ``(run, time - 1)``;
+        pre-industrial CO2, CH4 and N2O concentrations ``(run, 3)``; the CO2
+        forcing scale factor ``(run,)`` and ``ppm_gtc``
+
+    climate : tuple[:obj:`np.ndarray`]
+        Two-layer model coefficients ``a``, ``ad``, ``exp``, ``amix``,
+        ``adeep`` and ``heat_capacity`` ``(run, 2)``; ``lambda_global`` and
+        ``factor_lambda_eff`` ``(run,)`` and ``ntoa_joule``
+
+    ghg_method : int
+        GHG forcing method (see :data:`GHG_METHODS`)
+
+    ozone_feedback : :obj:`np.ndarray`
+        Temperature feedback on tropospheric ozone forcing ``(run,)``, zero
+        unless the Thornhill-Skeie ozone forcing is used
+
+    outputs : tuple[:obj:`np.ndarray`]
+        Temperature, effective climate feedback, heat flux, ocean heat
+        content and airborne emissions ``(run, time)``
+
+    start : int
+        First timestep to integrate. If zero, the state is initialised,
+        otherwise it is read from ``state``.
+
+    stop : int
+        Timestep at which to stop
+
+    state : tuple[:obj:`np.ndarray`]
+        Carbon boxes ``(run, 4)``, mixed layer and deep ocean temperature
+        components ``(run, 2)`` and the total forcing of the last timestep
+        ``(run,)``, updated in place
+    """
+    a = carbon[0]
+    co2_emissions = carbon[7]
+    c_pi, scale_co2, ppm_gtc = carbon[10:]
+    (
+        coeff_a,
+        ad,
+        exp,
+        amix,
+        adeep,
+        heat_capacity,
+        lambda_global,
+        factor_lambda_eff,
+        ntoa_joule,
+    ) = climate
+    temperature, lambda_eff, heatflux, ohc, airborne_emissions = outputs
+    boxes_state, temp_mix_state, temp_deep_state, forcing_total_prev_state = state
+
+    n_runs, _, n_forcing = forcing.shape
+    n_boxes = a.shape[1]
+
+    for i in range(n_runs):
+        boxes = boxes_state[i]
+        temp_mix = temp_mix_state[i]
+        temp_deep = temp_deep_state[i]
+        forcing_total_prev = forcing_total_prev_state[i]
+
+        if start == 0:
+            total = 0.0
+            for box in range(n_boxes):
+                boxes[box] = a[i, box] * co2_emissions[i, 0] / ppm_gtc
+                total += boxes[box]
+
+            conc[i, 0, 0] = total + c_pi[i, 0]
+            for component in range(2):
+                temp_mix[component] = 0.0
+                temp_deep[component] = 0.0
+
+        for t in range(start, stop):
+            if t > 0:
+                total, total_with_prev = _carbon_cycle_step(
+                    i, t, carbon, temperature, airborne_emissions, boxes
+                )
+                conc[i, t, 0] = c_pi[i, 0] + total_with_prev / 2
+                airborne_emissions[i, t] = total * ppm_gtc
+
+            f_co2, f_n2o = _co2_n2o_forcing(
+                ghg_method,
+                conc[i, t, 0],
+                conc[i, t, 1],
+                conc[i, t, 2],
+                c_pi[i, 0],
+                c_pi[i, 1],
+                c_pi[i, 2],
+                scale_co2[i],
+            )
+            forcing[i, t, 0] = f_co2
+            forcing[i, t, 2] = f_n2o
+            # index 31 is tropospheric ozone
+            forcing[i, t, 31] += ozone_feedback[i] * temperature[i, max(t - 1, 0)]
+
+            forcing_total = 0.0
+            for j in range(n_forcing):
+                forcing[i, t, j] *= scale[i, t, j]
+                forcing_total += forcing[i, t, j]
+
+            if t == 0:
+                forcing_total_prev = forcing_total
+
+            # two-layer model (fair.temperature.geoffroy)
+            sum_mix_prev = temp_mix[0] + temp_mix[1]
+            sum_deep_prev = temp_deep[0] + temp_deep[1]
+            for component in range(2):
+                integral = (
+                    forcing_total_prev * ad[i, component]
+                    + forcing_total * (1 - ad[i, component])
+                    - exp[i, component]
+                    * (
+                        forcing_total_prev * (1 + ad[i, component])
+                        - forcing_total * ad[i, component]
+                    )
+                ) / coeff_a[i, component]
+                temp_mix[component] = (
+                    exp[i, component] * temp_mix[component]
+                    + amix[i, component] * integral
+                )
+                temp_deep[component] = (
+                    exp[i, component] * temp_deep[component]
+                    + adeep[i, component] * integral
+                )
+
+            sum_mix = temp_mix[0] + temp_mix[1]
+            sum_deep = temp_deep[0] + temp_deep[1]
+            c_dtemp = heat_capacity[i, 0] * (sum_mix - sum_mix_prev) + heat_capacity[
+                i, 1
+            ] * (sum_deep - sum_deep_prev)
+
+            ratio = 1.0
+            if abs(sum_mix) > 1e-6:  # noqa: PLR2004
+                ratio = (sum_mix - sum_deep) / sum_mix
+
+            lambda_eff[i, t] = lambda_global[i] + factor_lambda_eff[i] * ratio
+            temperature[i, t] = sum_mix
+            heatflux[i, t] = c_dtemp
+            ohc[i, t] = (0.0 if t == 0 else ohc[i, t - 1]) + ntoa_joule * c_dtemp
+            forcing_total_prev = forcing_total
+
+        forcing_total_prev_state[i] = forcing_total_prev
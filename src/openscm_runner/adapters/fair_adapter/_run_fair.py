@@ -9,20 +9,75 @@ import numpy as np
 from scmdata import ScmRun, run_append
 
 from ...settings import config
+from ..utils._config_table import ScenarioConfigProduct
 from ..utils._parallel_process import _parallel_process
-from ._compat import fair_scm
+from ._batched import fair_scm_batched, get_batch_key
+from ._compat import HAS_NUMBA, fair_scm
 
 LOGGER = logging.getLogger(__name__)
 
 
-def run_fair(cfgs, output_vars):  # pylint: disable=R0914
+_WORKER_STATE = {}
+"""dict: Configs, output variables and engine of the current :func:`run_fair` call"""
+
+_META_KEYS = ("scenario", "model", "run_id", "gmst_factor", "ohu_factor", "startyear")
+"""tuple[str]: Keys of the configs which are not arguments of ``fair_scm``"""
+
+
+def _init_fair_worker(cfgs, output_vars, engine="batched"):
+    _WORKER_STATE["cfgs"] = cfgs
+    _WORKER_STATE["output_vars"] = output_vars
+    _WORKER_STATE["engine"] = engine
+
+
+def _get_batches(cfgs, ncpu, engine):
+    """
+    Split the runs into batches to send to the workers
+
+    With the numba and batched engines, batches hold up to ``FAIR_BATCH_SIZE``
+    runs but are made small enough that every worker gets at least one batch.
+    If ``cfgs`` is a :obj:`ScenarioConfigProduct`, the runs are ordered by
+    config and then by scenario so that each config's runs end up in the same
+    batch and their shared history is only integrated once (see
+    :func:`openscm_runner.adapters.fair_adapter._batched.fair_scm_batched`).
+    """
+    n_runs = len(cfgs)
+    if engine == "fair_scm":
+        return [[index] for index in range(n_runs)]
+
+    batch_size = int(config.get("FAIR_BATCH_SIZE", 250))
+    batch_size = max(1, min(batch_size, -(-n_runs // ncpu)))
+
+    order = np.arange(n_runs)
+    if isinstance(cfgs, ScenarioConfigProduct):
+        order = order.reshape(len(cfgs.scenarios), len(cfgs.cfgs)).T.ravel()
+
+    return [
+        order[start : start + batch_size].tolist()
+        for start in range(0, n_runs, batch_size)
+    ]
+
+
+def run_fair(cfgs, output_vars):
     """
     Run FaIR
 
+    By default, runs are integrated in batches with
+    :func:`openscm_runner.adapters.fair_adapter._batched.fair_scm_batched`
+    (runs with options it doesn't support are run with
+    :func:`fair.forward.fair_scm`). If numba is installed, the time stepping
+    of each batch is done by a compiled kernel (the ``numba`` engine),
+    otherwise with numpy (the ``batched`` engine). ``FAIR_ENGINE`` can be set
+    to ``numba``, ``batched`` or ``fair_scm`` (every run with
+    :func:`fair.forward.fair_scm`) to choose the engine explicitly.
+
     Parameters
     ----------
-    cfgs : list[dict]
-        List of configurations with which to run FaIR
+    cfgs : sequence of dict
+        Configurations with which to run FaIR (e.g. a list of dicts or a lazy
+        :obj:`ScenarioConfigProduct`). The configurations are sent to each
+        worker process once, after which the workers are only sent the index
+        of each run.
 
     output_vars : list[str]
         Variables to output
@@ -31,343 +86,366 @@ def run_fair(cfgs, output_vars):  # pylint: disable=R0914
     -------
     :obj:`ScmRun`
         :obj:`ScmRun` instance with all results.
-    """
-    res = []
-    updated_config = []
-    for i, cfg in enumerate(cfgs):
-        updated_config.append({})
-        for key, value in cfg.items():
-            if isinstance(value, list):
-                updated_config[i][key] = np.asarray(value)
-            else:
-                updated_config[i][key] = value
-        updated_config[i]["output_vars"] = output_vars
 
+    Raises
+    ------
+    ValueError
+        ``FAIR_ENGINE`` is not ``auto``, ``numba``, ``batched`` or ``fair_scm``
+
+    ImportError
+        ``FAIR_ENGINE`` is ``numba`` but numba is not installed
+    """
     ncpu = int(config.get("FAIR_WORKER_NUMBER", multiprocessing.cpu_count()))
-    LOGGER.info("Running FaIR with %s workers", ncpu)
+    engine = _get_engine()
+
+    batches = _get_batches(cfgs, ncpu, engine)
+    LOGGER.info(
+        "Running FaIR with %s workers (%d batches, %s engine)",
+        ncpu,
+        len(batches),
+        engine,
+    )
 
+    output_vars = _resolve_output_variables(output_vars)
+
+    # front serial runs happen in this process so it needs the state too
+    _init_fair_worker(cfgs, output_vars, engine)
     parallel_process_kwargs = dict(
-        func=_single_fair_iteration,
-        configuration=updated_config,
+        func=_run_fair_batch,
+        configuration=batches,
         config_are_kwargs=False,
     )
-    if ncpu > 1:
-        with ProcessPoolExecutor(ncpu) as pool:
-            res = _parallel_process(
-                **parallel_process_kwargs,
-                pool=pool,
-            )
-    else:
-        res = _parallel_process(**parallel_process_kwargs)
+    if engine != "fair_scm":
+        # each batch is already a large piece of work
+        parallel_process_kwargs.update(front_serial=0, front_parallel=0)
+
+    try:
+        if ncpu > 1:
+            with ProcessPoolExecutor(
+                ncpu,
+                initializer=_init_fair_worker,
+                initargs=(cfgs, output_vars, engine),
+            ) as pool:
+                res = _parallel_process(
+                    **parallel_process_kwargs,
+                    pool=pool,
+                )
+        else:
+            res = _parallel_process(**parallel_process_kwargs)
+
+    finally:
+        _WORKER_STATE.clear()
 
     res = run_append(res)
 
     return res
 
 
-def _single_fair_iteration(cfg):  # pylint: disable=R0914
-    scenario = cfg.pop("scenario")
-    model = cfg.pop("model")
-    run_id = cfg.pop("run_id")
-    factors = {}
-    factors["gmst"] = cfg.pop("gmst_factor")
-    factors["ohu"] = cfg.pop("ohu_factor")
-    startyear = cfg.pop("startyear")
-    output_vars = cfg.pop("output_vars")
-
-    data, unit, nt = _process_output(fair_scm(**cfg), output_vars, factors)
-
-    data_scmrun = []
-    variables = []
-    units = []
-    for key, variable in data.items():
-        variables.append(key)
-        data_scmrun.append(variable)
-        units.append(unit[key])
-
-    tempres = ScmRun(
-        np.vstack(data_scmrun).T,
-        index=np.arange(startyear, startyear + nt),
-        columns={
-            "scenario": scenario,
-            "model": model,
-            "region": "World",
-            "variable": variables,
-            "unit": units,
-            "run_id": run_id,
-        },
-    )
+def _get_engine():
+    engine = config.get("FAIR_ENGINE", "auto")
+    if engine not in ("auto", "numba", "batched", "fair_scm"):
+        raise ValueError(
+            "FAIR_ENGINE must be 'auto', 'numba', 'batched' or 'fair_scm', "
+            f"received {engine!r}"
+        )
+
+    if engine == "auto":
+        return "numba" if HAS_NUMBA else "batched"
+
+    if engine == "numba" and not HAS_NUMBA:
+        raise ImportError("numba is not installed. Run 'pip install numba'")
+
+    return engine
+
+
+def _get_run(index):
+    """
+    Get the metadata and ``fair_scm`` arguments of a run
+    """
+    cfg = {
+        key: np.asarray(value) if isinstance(value, list) else value
+        for key, value in _WORKER_STATE["cfgs"][index].items()
+    }
+    meta = {key: cfg.pop(key) for key in _META_KEYS}
+
+    return meta, cfg
+
 
-    return tempres
+def _run_fair_batch(indices):
+    runs = [_get_run(index) for index in indices]
 
+    engine = _WORKER_STATE["engine"]
+    groups = {}
+    for meta, fair_kwargs in runs:
+        key = get_batch_key(fair_kwargs) if engine != "fair_scm" else None
+        groups.setdefault(key, []).append((meta, fair_kwargs))
 
-def _process_output(fair_output, output_vars, factors):  # pylint: disable=R0915
+    out = []
+    for key, group in groups.items():
+        if key is None:
+            outputs = [fair_scm(**fair_kwargs) for _, fair_kwargs in group]
+            batch_output = tuple(np.stack(values) for values in zip(*outputs))
+        else:
+            batch_output = fair_scm_batched(
+                [fair_kwargs for _, fair_kwargs in group],
+                compiled=engine == "numba",
+            )
+
+        out.append(
+            _make_scmrun(
+                batch_output,
+                [meta for meta, _ in group],
+                _WORKER_STATE["output_vars"],
+            )
+        )
+
+    return run_append(out)
+
+
+def _make_scmrun(fair_output, metas, output_vars):
     """
-    Make sense of FaIR1.6 output
+    Make a single :obj:`ScmRun` from the output of a batch of runs
 
     Parameters
     ----------
-    fair_output : tuple
-        7-tuple of concentrations, forcing, temperature, lambda_eff, ohc, heatflux, airborne_emissions:
-            c : np.ndarray
-                (nt, 31) array of greenhouse gas concentrations
-            f : np.ndarray
-                (nt, 41) array of effective radiative forcings
-            t : np.ndarray
-                (nt,) array of temperature
-            lambda_eff: np.ndarray
-                effective climate feedback
-            ohc : np.ndarray
-                total ocean heat uptake
-            heatflux:
-                heat transfer into the ocean
-            airborne_emissions:
-                atmospheric carbon content
+    fair_output : tuple[:obj:`np.ndarray`]
+        Output of the runs (as returned by
+        :func:`openscm_runner.adapters.fair_adapter._batched.fair_scm_batched`)
 
-    output_vars : list[str]
-        List of output variables
+    metas : list[dict]
+        Metadata of each run
 
-    factors : dict[(Union[float, numpy.ndarray])]
-        ohu : ratio of ocean heat uptake to total Earth energy uptake
-        gmst : ratio of GMST to GSAT
+    output_vars : tuple
+        Output variables, as returned by :func:`_resolve_output_variables`
 
     Returns
     -------
-    data : dict
-        dict of climate model output
-    unit : dict
-        dict of units corresponding to data
-    nt : int
-        number of timesteps modelled
+    :obj:`ScmRun`
+        Output of the runs
     """
-    (
-        concentrations,
-        forcing,
-        temperature,
-        lambda_eff,
-        ohc,
-        heatflux,
-        airborne_emissions,
-    ) = fair_output
-
-    data = {}
-    unit = {}
-
-    data["Atmospheric Concentrations|CO2"] = concentrations[:, 0]
-    data["Atmospheric Concentrations|CH4"] = concentrations[:, 1]
-    data["Atmospheric Concentrations|N2O"] = concentrations[:, 2]
-    data["Atmospheric Concentrations|CF4"] = concentrations[:, 3]
-    data["Atmospheric Concentrations|C2F6"] = concentrations[:, 4]
-    data["Atmospheric Concentrations|C6F14"] = concentrations[:, 5]
-    data["Atmospheric Concentrations|HFC23"] = concentrations[:, 6]
-    data["Atmospheric Concentrations|HFC32"] = concentrations[:, 7]
-    data["Atmospheric Concentrations|HFC125"] = concentrations[:, 8]
-    data["Atmospheric Concentrations|HFC134a"] = concentrations[:, 9]
-    data["Atmospheric Concentrations|HFC143a"] = concentrations[:, 10]
-    data["Atmospheric Concentrations|HFC227ea"] = concentrations[:, 11]
-    data["Atmospheric Concentrations|HFC245fa"] = concentrations[:, 12]
-    data["Atmospheric Concentrations|HFC4310mee"] = concentrations[:, 13]
-    data["Atmospheric Concentrations|SF6"] = concentrations[:, 14]
-    data["Atmospheric Concentrations|CFC11"] = concentrations[:, 15]
-    data["Atmospheric Concentrations|CFC12"] = concentrations[:, 16]
-    data["Atmospheric Concentrations|CFC113"] = concentrations[:, 17]
-    data["Atmospheric Concentrations|CFC114"] = concentrations[:, 18]
-    data["Atmospheric Concentrations|CFC115"] = concentrations[:, 19]
-    data["Atmospheric Concentrations|CCl4"] = concentrations[:, 20]
-    data["Atmospheric Concentrations|CH3CCl3"] = concentrations[:, 21]
-    data["Atmospheric Concentrations|HCFC22"] = concentrations[:, 22]
-    data["Atmospheric Concentrations|HCFC141b"] = concentrations[:, 23]
-    data["Atmospheric Concentrations|HCFC142b"] = concentrations[:, 24]
-    data["Atmospheric Concentrations|Halon1211"] = concentrations[:, 25]
-    data["Atmospheric Concentrations|Halon1202"] = concentrations[:, 26]
-    data["Atmospheric Concentrations|Halon1301"] = concentrations[:, 27]
-    data["Atmospheric Concentrations|Halon2402"] = concentrations[:, 28]
-    data["Atmospheric Concentrations|CH3Br"] = concentrations[:, 29]
-    data["Atmospheric Concentrations|CH3Cl"] = concentrations[:, 30]
-    data["Effective Radiative Forcing|CO2"] = forcing[:, 0]
-    data["Effective Radiative Forcing|CH4"] = forcing[:, 1]
-    data["Effective Radiative Forcing|N2O"] = forcing[:, 2]
-    data["Effective Radiative Forcing|CF4"] = forcing[:, 3]
-    data["Effective Radiative Forcing|C2F6"] = forcing[:, 4]
-    data["Effective Radiative Forcing|C6F14"] = forcing[:, 5]
-    data["Effective Radiative Forcing|HFC23"] = forcing[:, 6]
-    data["Effective Radiative Forcing|HFC32"] = forcing[:, 7]
-    data["Effective Radiative Forcing|HFC125"] = forcing[:, 8]
-    data["Effective Radiative Forcing|HFC134a"] = forcing[:, 9]
-    data["Effective Radiative Forcing|HFC143a"] = forcing[:, 10]
-    data["Effective Radiative Forcing|HFC227ea"] = forcing[:, 11]
-    data["Effective Radiative Forcing|HFC245fa"] = forcing[:, 12]
-    data["Effective Radiative Forcing|HFC4310mee"] = forcing[:, 13]
-    data["Effective Radiative Forcing|SF6"] = forcing[:, 14]
-    data["Effective Radiative Forcing|CFC11"] = forcing[:, 15]
-    data["Effective Radiative Forcing|CFC12"] = forcing[:, 16]
-    data["Effective Radiative Forcing|CFC113"] = forcing[:, 17]
-    data["Effective Radiative Forcing|CFC114"] = forcing[:, 18]
-    data["Effective Radiative Forcing|CFC115"] = forcing[:, 19]
-    data["Effective Radiative Forcing|CCl4"] = forcing[:, 20]
-    data["Effective Radiative Forcing|CH3CCl3"] = forcing[:, 21]
-    data["Effective Radiative Forcing|HCFC22"] = forcing[:, 22]
-    data["Effective Radiative Forcing|HCFC141b"] = forcing[:, 23]
-    data["Effective Radiative Forcing|HCFC142b"] = forcing[:, 24]
-    data["Effective Radiative Forcing|Halon1211"] = forcing[:, 25]
-    data["Effective Radiative Forcing|Halon1202"] = forcing[:, 26]
-    data["Effective Radiative Forcing|Halon1301"] = forcing[:, 27]
-    data["Effective Radiative Forcing|Halon2402"] = forcing[:, 28]
-    data["Effective Radiative Forcing|CH3Br"] = forcing[:, 29]
-    data["Effective Radiative Forcing|CH3Cl"] = forcing[:, 30]
-    data["Effective Radiative Forcing|Tropospheric Ozone"] = forcing[:, 31]
-    data["Effective Radiative Forcing|Stratospheric Ozone"] = forcing[:, 32]
-    data["Effective Radiative Forcing|CH4 Oxidation Stratospheric H2O"] = forcing[:, 33]
-    data["Effective Radiative Forcing|Contrails"] = forcing[:, 34]
-    data["Effective Radiative Forcing|Aerosols|Direct Effect|SOx"] = forcing[:, 35]
-    data[
-        "Effective Radiative Forcing|Aerosols|Direct Effect|Secondary Organic Aerosol"
-    ] = forcing[:, 36]
-    data["Effective Radiative Forcing|Aerosols|Direct Effect|Nitrate"] = forcing[:, 37]
-    data["Effective Radiative Forcing|Aerosols|Direct Effect|BC"] = forcing[:, 38]
-    data["Effective Radiative Forcing|Aerosols|Direct Effect|OC"] = forcing[:, 39]
-    data["Effective Radiative Forcing|Aerosols|Indirect Effect"] = forcing[:, 40]
-    data["Effective Radiative Forcing|Black Carbon on Snow"] = forcing[:, 41]
-    data["Effective Radiative Forcing|Land-use Change"] = forcing[:, 42]
-    data["Effective Radiative Forcing|Volcanic"] = forcing[:, 43]
-    data["Effective Radiative Forcing|Solar"] = forcing[:, 44]
-    data["Effective Radiative Forcing"] = np.sum(forcing, axis=1)
-    data["Effective Radiative Forcing|Anthropogenic"] = np.sum(forcing[:, :43], axis=1)
-    data["Effective Radiative Forcing|Greenhouse Gases"] = np.sum(
-        forcing[:, :31], axis=1
+    data = _evaluate_output(fair_output, output_vars, metas)
+    n_runs, n_vars, nt = data.shape
+    startyear = metas[0]["startyear"]
+
+    def _per_run(key):
+        return np.repeat([meta[key] for meta in metas], n_vars)
+
+    return ScmRun(
+        data.reshape(n_runs * n_vars, nt).T,
+        index=np.arange(startyear, startyear + nt),
+        columns={
+            "scenario": _per_run("scenario"),
+            "model": _per_run("model"),
+            "region": "World",
+            "variable": [variable for variable, *_ in output_vars] * n_runs,
+            "unit": [unit for *_, unit in output_vars] * n_runs,
+            "run_id": _per_run("run_id"),
+        },
     )
+
+
+_OUTPUTS = (
+    "concentrations",
+    "forcing",
+    "temperature",
+    "lambda_eff",
+    "ohc",
+    "heatflux",
+    "airborne_emissions",
+)
+"""tuple[str]: Arrays output by ``fair_scm``, in order"""
+
+_GASES = (
+    "CO2",
+    "CH4",
+    "N2O",
+    "CF4",
+    "C2F6",
+    "C6F14",
+    "HFC23",
+    "HFC32",
+    "HFC125",
+    "HFC134a",
+    "HFC143a",
+    "HFC227ea",
+    "HFC245fa",
+    "HFC4310mee",
+    "SF6",
+    "CFC11",
+    "CFC12",
+    "CFC113",
+    "CFC114",
+    "CFC115",
+    "CCl4",
+    "CH3CCl3",
+    "HCFC22",
+    "HCFC141b",
+    "HCFC142b",
+    "Halon1211",
+    "Halon1202",
+    "Halon1301",
+    "Halon2402",
+    "CH3Br",
+    "CH3Cl",
+)
+"""tuple[str]: Greenhouse gases, in the order of FaIR's concentrations"""
+
+_OTHER_FORCING = (
+    "Tropospheric Ozone",
+    "Stratospheric Ozone",
+    "CH4 Oxidation Stratospheric H2O",
+    "Contrails",
+    "Aerosols|Direct Effect|SOx",
+    "Aerosols|Direct Effect|Secondary Organic Aerosol",
+    "Aerosols|Direct Effect|Nitrate",
+    "Aerosols|Direct Effect|BC",
+    "Aerosols|Direct Effect|OC",
+    "Aerosols|Indirect Effect",
+    "Black Carbon on Snow",
+    "Land-use Change",
+    "Volcanic",
+    "Solar",
+)
+"""tuple[str]: Forcing agents after the greenhouse gases in FaIR's forcing"""
+
+_FORCING_AGGREGATES = {
+    "": slice(None),
+    "|Anthropogenic": slice(None, 43),
+    "|Greenhouse Gases": slice(None, 31),
     # This definition does not include ozone and H2O from CH4 oxidation
-    data["Effective Radiative Forcing|Kyoto Gases"] = np.sum(forcing[:, :15], axis=1)
-    data["Effective Radiative Forcing|CO2, CH4 and N2O"] = np.sum(
-        forcing[:, :3], axis=1
-    )
+    "|Kyoto Gases": slice(None, 15),
+    "|CO2, CH4 and N2O": slice(None, 3),
     # What is the rigorous definition here? CFCs are not included but contain F
-    data["Effective Radiative Forcing|F-Gases"] = np.sum(forcing[:, 3:15], axis=1)
-    data["Effective Radiative Forcing|Montreal Protocol Halogen Gases"] = np.sum(
-        forcing[:, 15:31], axis=1
-    )
-    data["Effective Radiative Forcing|Aerosols|Direct Effect"] = np.sum(
-        forcing[:, 35:40], axis=1
+    "|F-Gases": slice(3, 15),
+    "|Montreal Protocol Halogen Gases": slice(15, 31),
+    "|Aerosols|Direct Effect": slice(35, 40),
+    "|Aerosols": slice(35, 41),
+    "|Ozone": slice(31, 33),
+}
+"""dict[str: slice]: Columns of FaIR's forcing summed to make aggregates"""
+
+
+def _make_output_table():
+    table = {}
+    for i, gas in enumerate(_GASES):
+        unit = {"CO2": "ppm", "CH4": "ppb", "N2O": "ppb"}.get(gas, "ppt")
+        table[f"Atmospheric Concentrations|{gas}"] = ("concentrations", i, None, unit)
+
+    for i, agent in enumerate(_GASES + _OTHER_FORCING):
+        table[f"Effective Radiative Forcing|{agent}"] = ("forcing", i, None, "W/m**2")
+
+    for suffix, columns in _FORCING_AGGREGATES.items():
+        table[f"Effective Radiative Forcing{suffix}"] = (
+            "forcing",
+            columns,
+            None,
+            "W/m**2",
+        )
+
+    table.update(
+        {
+            "Surface Air Temperature Change": ("temperature", None, None, "K"),
+            "Surface Air Ocean Blended Temperature Change": (
+                "temperature",
+                None,
+                "gmst_factor",
+                "K",
+            ),
+            "Airborne Fraction": (
+                "airborne_emissions",
+                None,
+                None,
+                "dimensionless",
+            ),
+            "Effective Climate Feedback": ("lambda_eff", None, None, "W/m**2/K"),
+            "Heat Content": ("ohc", None, None, "J"),
+            "Heat Content|Ocean": ("ohc", None, "ohu_factor", "J"),
+            "Net Energy Imbalance": ("heatflux", None, None, "W/m**2"),
+            "Heat Uptake": ("heatflux", None, None, "W/m**2"),
+            "Heat Uptake|Ocean": ("heatflux", None, "ohu_factor", "W/m**2"),
+        }
     )
-    data["Effective Radiative Forcing|Aerosols"] = np.sum(forcing[:, 35:41], axis=1)
-    data["Effective Radiative Forcing|Ozone"] = np.sum(forcing[:, 31:33], axis=1)
-    data["Surface Air Temperature Change"] = temperature
-    data["Surface Air Ocean Blended Temperature Change"] = temperature * factors["gmst"]
-    data["Airborne Fraction"] = airborne_emissions
-    data["Effective Climate Feedback"] = lambda_eff
-    data["Heat Content"] = ohc
-    data["Heat Content|Ocean"] = ohc * factors["ohu"]
-    data["Net Energy Imbalance"] = heatflux
-    data["Heat Uptake"] = heatflux
-    data["Heat Uptake|Ocean"] = heatflux * factors["ohu"]
-
-    unit["Atmospheric Concentrations|CO2"] = "ppm"
-    unit["Atmospheric Concentrations|CH4"] = "ppb"
-    unit["Atmospheric Concentrations|N2O"] = "ppb"
-    unit["Atmospheric Concentrations|CF4"] = "ppt"
-    unit["Atmospheric Concentrations|C2F6"] = "ppt"
-    unit["Atmospheric Concentrations|C6F14"] = "ppt"
-    unit["Atmospheric Concentrations|HFC23"] = "ppt"
-    unit["Atmospheric Concentrations|HFC32"] = "ppt"
-    unit["Atmospheric Concentrations|HFC125"] = "ppt"
-    unit["Atmospheric Concentrations|HFC134a"] = "ppt"
-    unit["Atmospheric Concentrations|HFC143a"] = "ppt"
-    unit["Atmospheric Concentrations|HFC227ea"] = "ppt"
-    unit["Atmospheric Concentrations|HFC245fa"] = "ppt"
-    unit["Atmospheric Concentrations|HFC4310mee"] = "ppt"
-    unit["Atmospheric Concentrations|SF6"] = "ppt"
-    unit["Atmospheric Concentrations|CFC11"] = "ppt"
-    unit["Atmospheric Concentrations|CFC12"] = "ppt"
-    unit["Atmospheric Concentrations|CFC113"] = "ppt"
-    unit["Atmospheric Concentrations|CFC114"] = "ppt"
-    unit["Atmospheric Concentrations|CFC115"] = "ppt"
-    unit["Atmospheric Concentrations|CCl4"] = "ppt"
-    unit["Atmospheric Concentrations|CH3CCl3"] = "ppt"
-    unit["Atmospheric Concentrations|HCFC22"] = "ppt"
-    unit["Atmospheric Concentrations|HCFC141b"] = "ppt"
-    unit["Atmospheric Concentrations|HCFC142b"] = "ppt"
-    unit["Atmospheric Concentrations|Halon1211"] = "ppt"
-    unit["Atmospheric Concentrations|Halon1202"] = "ppt"
-    unit["Atmospheric Concentrations|Halon1301"] = "ppt"
-    unit["Atmospheric Concentrations|Halon2402"] = "ppt"
-    unit["Atmospheric Concentrations|CH3Br"] = "ppt"
-    unit["Atmospheric Concentrations|CH3Cl"] = "ppt"
-    unit["Effective Radiative Forcing|CO2"] = "W/m**2"
-    unit["Effective Radiative Forcing|CH4"] = "W/m**2"
-    unit["Effective Radiative Forcing|N2O"] = "W/m**2"
-    unit["Effective Radiative Forcing|CF4"] = "W/m**2"
-    unit["Effective Radiative Forcing|C2F6"] = "W/m**2"
-    unit["Effective Radiative Forcing|C6F14"] = "W/m**2"
-    unit["Effective Radiative Forcing|HFC23"] = "W/m**2"
-    unit["Effective Radiative Forcing|HFC32"] = "W/m**2"
-    unit["Effective Radiative Forcing|HFC125"] = "W/m**2"
-    unit["Effective Radiative Forcing|HFC134a"] = "W/m**2"
-    unit["Effective Radiative Forcing|HFC143a"] = "W/m**2"
-    unit["Effective Radiative Forcing|HFC227ea"] = "W/m**2"
-    unit["Effective Radiative Forcing|HFC245fa"] = "W/m**2"
-    unit["Effective Radiative Forcing|HFC4310mee"] = "W/m**2"
-    unit["Effective Radiative Forcing|SF6"] = "W/m**2"
-    unit["Effective Radiative Forcing|CFC11"] = "W/m**2"
-    unit["Effective Radiative Forcing|CFC12"] = "W/m**2"
-    unit["Effective Radiative Forcing|CFC113"] = "W/m**2"
-    unit["Effective Radiative Forcing|CFC114"] = "W/m**2"
-    unit["Effective Radiative Forcing|CFC115"] = "W/m**2"
-    unit["Effective Radiative Forcing|CCl4"] = "W/m**2"
-    unit["Effective Radiative Forcing|CH3CCl3"] = "W/m**2"
-    unit["Effective Radiative Forcing|HCFC22"] = "W/m**2"
-    unit["Effective Radiative Forcing|HCFC141b"] = "W/m**2"
-    unit["Effective Radiative Forcing|HCFC142b"] = "W/m**2"
-    unit["Effective Radiative Forcing|Halon1211"] = "W/m**2"
-    unit["Effective Radiative Forcing|Halon1202"] = "W/m**2"
-    unit["Effective Radiative Forcing|Halon1301"] = "W/m**2"
-    unit["Effective Radiative Forcing|Halon2402"] = "W/m**2"
-    unit["Effective Radiative Forcing|CH3Br"] = "W/m**2"
-    unit["Effective Radiative Forcing|CH3Cl"] = "W/m**2"
-    unit["Effective Radiative Forcing|Tropospheric Ozone"] = "W/m**2"
-    unit["Effective Radiative Forcing|Stratospheric Ozone"] = "W/m**2"
-    unit["Effective Radiative Forcing|CH4 Oxidation Stratospheric H2O"] = "W/m**2"
-    unit["Effective Radiative Forcing|Contrails"] = "W/m**2"
-    unit["Effective Radiative Forcing|Aerosols|Direct Effect|SOx"] = "W/m**2"
-    unit[
-        "Effective Radiative Forcing|Aerosols|Direct Effect|Secondary Organic Aerosol"
-    ] = "W/m**2"
-    unit["Effective Radiative Forcing|Aerosols|Direct Effect|Nitrate"] = "W/m**2"
-    unit["Effective Radiative Forcing|Aerosols|Direct Effect|BC"] = "W/m**2"
-    unit["Effective Radiative Forcing|Aerosols|Direct Effect|OC"] = "W/m**2"
-    unit["Effective Radiative Forcing|Aerosols|Indirect Effect"] = "W/m**2"
-    unit["Effective Radiative Forcing|Black Carbon on Snow"] = "W/m**2"
-    unit["Effective Radiative Forcing|Land-use Change"] = "W/m**2"
-    unit["Effective Radiative Forcing|Volcanic"] = "W/m**2"
-    unit["Effective Radiative Forcing|Solar"] = "W/m**2"
-    unit["Effective Radiative Forcing"] = "W/m**2"
-    unit["Effective Radiative Forcing|Anthropogenic"] = "W/m**2"
-    unit["Effective Radiative Forcing|Greenhouse Gases"] = "W/m**2"
-    unit["Effective Radiative Forcing|Kyoto Gases"] = "W/m**2"
-    unit["Effective Radiative Forcing|CO2, CH4 and N2O"] = "W/m**2"
-    unit["Effective Radiative Forcing|F-Gases"] = "W/m**2"
-    unit["Effective Radiative Forcing|Montreal Protocol Halogen Gases"] = "W/m**2"
-    unit["Effective Radiative Forcing|Aerosols|Direct Effect"] = "W/m**2"
-    unit["Effective Radiative Forcing|Aerosols"] = "W/m**2"
-    unit["Effective Radiative Forcing|Ozone"] = "W/m**2"
-    unit["Surface Air Temperature Change"] = "K"
-    unit["Surface Air Ocean Blended Temperature Change"] = "K"
-    unit["Airborne Fraction"] = "dimensionless"
-    unit["Effective Climate Feedback"] = "W/m**2/K"
-    unit["Heat Content"] = "J"
-    unit["Heat Content|Ocean"] = "J"
-    unit["Net Energy Imbalance"] = "W/m**2"
-    unit["Heat Uptake"] = "W/m**2"
-    unit["Heat Uptake|Ocean"] = "W/m**2"
-
-    nt = len(temperature)
-
-    out = ({}, {}, nt)
-    for key in output_vars:
-        if key not in data:
-            LOGGER.warning("%s not available from FaIR", key)
+
+    return table
+
+
+OUTPUT_TABLE = _make_output_table()
+"""
+dict[str: tuple]: Variables available from FaIR
+
+Each variable maps to the name of the array of ``fair_scm``'s output it comes
+from, the column of that array (``None`` if the array only has a time axis, a
+slice if columns are summed), the metadata key of the factor it is multiplied
+by (``None`` if it isn't scaled) and its unit.
+"""
+
+
+def _resolve_output_variables(output_vars):
+    """
+    Look up the requested variables in :data:`OUTPUT_TABLE`
+
+    Variables which aren't available are skipped with a warning, as are
+    repeated variables.
+
+    Parameters
+    ----------
+    output_vars : list[str]
+        Variables to output
+
+    Returns
+    -------
+    tuple[tuple]
+        For each variable to output, the variable followed by its entry in
+        :data:`OUTPUT_TABLE` (with the array's position in ``fair_scm``'s
+        output instead of its name)
+    """
+    resolved = {}
+    for variable in output_vars:
+        if variable not in OUTPUT_TABLE:
+            LOGGER.warning("%s not available from FaIR", variable)
             continue
 
-        out[0][key] = data[key]
-        out[1][key] = unit[key]
+        source, columns, factor, unit = OUTPUT_TABLE[variable]
+        resolved[variable] = (_OUTPUTS.index(source), columns, factor, unit)
+
+    return tuple((variable, *entry) for variable, entry in resolved.items())
+
+
+def _evaluate_output(fair_output, output_vars, metas):
+    """
+    Evaluate the output variables of a batch of runs
+
+    Parameters
+    ----------
+    fair_output : tuple[:obj:`np.ndarray`]
+        7-tuple of concentrations ``(run, time, 31)``, forcing
+        ``(run, time, 45)``, temperature, lambda_eff, ohc, heatflux and
+        airborne_emissions ``(run, time)``
+
+    output_vars : tuple
+        Output variables, as returned by :func:`_resolve_output_variables`
+
+    metas : list[dict]
+        Metadata of each run (holding the factors variables are scaled by)
+
+    Returns
+    -------
+    :obj:`np.ndarray`
+        Output ``(run, variable, time)``
+    """
+    n_runs, nt = fair_output[2].shape
+    out = np.empty((n_runs, len(output_vars), nt))
+    for i, (_, source, columns, factor, _) in enumerate(output_vars):
+        values = fair_output[source]
+        if isinstance(columns, slice):
+            values = np.sum(values[:, :, columns], axis=2)
+        elif columns is not None:
+            values = values[:, :, columns]
+
+        if factor is not None:
+            factors = np.array([meta[factor] for meta in metas], dtype=float)
+            values = values * factors.reshape(n_runs, -1)
+
+        out[:, i, :] = values
 
     return out
@@ -2,12 +2,18 @@
 Conversion of :obj:`scmdata.ScmRun` into FaIR emissions :obj:`np.ndarray`.
 """
 import datetime as dt
+import functools
 import os
 
 import numpy as np
 import pandas as pd
 from scmdata import ScmRun
 
+from ..utils._conversion_tables import get_conversion_factor
+from ..utils._data_cache import load_compiled
+
+_HISTORICAL_EMISSIONS_FILE = "rcmip-emissions-annual-means-v5-1-0-historical-ssp245.csv"
+
 
 class HistoricalWorldEmms:
     """Historical world emissions class"""
@@ -25,7 +31,7 @@ class HistoricalWorldEmms:
             tmp = ScmRun(
                 os.path.join(
                     os.path.dirname(__file__),
-                    "rcmip-emissions-annual-means-v5-1-0-historical-ssp245.csv",
+                    _HISTORICAL_EMISSIONS_FILE,
                 ),
                 lowercase_cols=True,
             )
@@ -126,6 +132,7 @@ EMISSIONS_SPECIES_UNITS_CONTEXT = pd.DataFrame(
 )
 
 
+@functools.cache
 def _get_fair_col_unit_context(variable):
     row = EMISSIONS_SPECIES_UNITS_CONTEXT["species"].apply(
         lambda x: variable.endswith(x)  # pylint: disable=W0108
@@ -141,92 +148,250 @@ def _get_fair_col_unit_context(variable):
     return fair_col, in_unit, context
 
 
-def scmdf_to_emissions(scmrun, startyear=1750, endyear=2100, scen_startyear=2015):  # pylint: disable=R0914
+def _compile_background_emissions():
+    timeseries = historical_world_emms_holder.values_fair_units.timeseries(
+        time_axis="year"
+    )
+    variables = timeseries.index.get_level_values("variable")
+
+    emissions = np.full((timeseries.shape[1], 40), np.nan)
+    emissions[:, 0] = timeseries.columns
+    for species in EMISSIONS_SPECIES_UNITS_CONTEXT["species"]:
+        fair_col, _, _ = _get_fair_col_unit_context(species)
+        emissions[:, fair_col] = timeseries[variables.str.endswith(species)].values
+
+    return {"emissions": emissions}
+
+
+@functools.cache
+def _get_background_emissions():
     """
-    Convert an :obj:`scmdata.ScmRun` into a FaIR emissions :obj:`np.ndarray`
+    Get historical and SSP2-4.5 emissions as a FaIR emissions array
+
+    The array is compiled once and then memory-mapped from the cache (see
+    :mod:`openscm_runner.adapters.utils._data_cache`).
+
+    Returns
+    -------
+    :obj:`np.ndarray`
+        FaIR emissions array (first column is the year)
+    """
+    return load_compiled(
+        "fair-background-emissions",
+        [os.path.join(os.path.dirname(__file__), _HISTORICAL_EMISSIONS_FILE)],
+        _compile_background_emissions,
+    )["emissions"]
+
+
+@functools.cache
+def _get_column_and_factor(variable, unit):
+    """
+    Get a variable's column in FaIR's emissions array and its unit conversion factor
+
+    Returns
+    -------
+    tuple[int, float] or None
+        Column and conversion factor. ``None`` if FaIR doesn't use the
+        variable (e.g. aggregates such as ``Emissions|CO2``).
+    """
+    _, _, species = variable.partition("Emissions")
+    if species not in EMISSIONS_SPECIES_UNITS_CONTEXT.species.values:
+        return None
+
+    fair_col, fair_unit, context = _get_fair_col_unit_context(variable)
+
+    return fair_col, get_conversion_factor(unit, fair_unit, context)
 
-    Interpolates linearly if required and fills in montreal gases based on ssp245.
-    between non-consecutive years in the SCEN file. Fills in Montreal gases
-    from SSP2-4.5.
+
+def _get_year_seconds(years):
+    return (
+        (np.asarray(years, dtype=int) - 1970)
+        .astype("datetime64[Y]")
+        .astype("datetime64[s]")
+        .astype(np.int64)
+        .astype(float)
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _get_interpolation_weights(source_years, target_years):
+    """
+    Get the matrix which linearly interpolates from one set of years to another
+
+    As in :meth:`scmdata.ScmRun.interpolate`, the interpolation is linear in
+    time (so accounts for leap years) and extrapolates linearly.
 
     Parameters
     ----------
-    scmrun : :obj:`ScmRun`
-        :obj:`ScmRun` instance to convert to FaIR emissions array.
-    startyear : int
-        First year of output array to produce.
-    endyear : int
-        Last year of output array to produce.
-    scen_startyear : int
-        First year of the future scenario corresponding to :obj:`ScmRun`.
+    source_years : tuple[int]
+        Years of the data (sorted)
+
+    target_years : tuple[int]
+        Years to interpolate onto
 
     Returns
     -------
-    np.ndarray
-        FaIR emissions array of size (nt, 40).
+    :obj:`np.ndarray`
+        Weights of shape ``(len(source_years), len(target_years))``. The
+        interpolated data is ``data @ weights``.
 
     Raises
     ------
-    AssertionError
-        If there is more than one model-scenario pair in the provided :obj:`ScmRun`.
+    ValueError
+        Fewer than two source years are given
     """
-    n_cols = 40
-    nt = endyear - startyear + 1
+    source = _get_year_seconds(source_years)
+    target = _get_year_seconds(target_years)
+    if source.size < 2:  # noqa: PLR2004
+        raise ValueError("At least two values are needed to interpolate emissions")
 
-    data_out = np.ones((nt, n_cols)) * np.nan
-    data_out[:, 0] = np.arange(startyear, endyear + 1)
+    lower = np.clip(
+        np.searchsorted(source, target, side="right") - 1, 0, source.size - 2
+    )
+    fraction = (target - source[lower]) / (source[lower + 1] - source[lower])
 
-    if scmrun.meta[["model", "scenario"]].drop_duplicates().shape[0] != 1:
-        raise AssertionError("Should only have one model-scenario pair")
+    weights = np.zeros((source.size, target.size))
+    columns = np.arange(target.size)
+    weights[lower, columns] = 1 - fraction
+    weights[lower + 1, columns] += fraction
 
-    scmrun = scmrun.interpolate(
-        [dt.datetime(y, 1, 1) for y in range(scen_startyear, endyear + 1)]
-    )
+    return weights
 
-    years = scmrun["year"].values
-    first_scenyear = years[0]
-    first_scen_row = int(first_scenyear - startyear)
 
-    # if correct units and interpolation were guaranteed we could do this for scenario too which is quicker
-    hist_df = historical_world_emms_holder.values_fair_units.filter(
-        year=range(startyear, scen_startyear)
-    ).timeseries()
+def timeseries_to_emissions(
+    timeseries, startyear=1750, scen_startyear=None, endyear=None
+):
+    """
+    Convert the timeseries of many scenarios into FaIR emissions arrays
 
-    future_df = historical_world_emms_holder.values_fair_units.filter(
-        year=range(scen_startyear, endyear + 1)
-    ).timeseries()
+    All the scenarios are converted at once: the scenario data is
+    interpolated (see :func:`_get_interpolation_weights`) with one matrix
+    product for all the timeseries with the same missing values, converted to
+    FaIR's units and written into an emissions array which is pre-filled
+    with the background (historical and SSP2-4.5) emissions.
 
-    for species in EMISSIONS_SPECIES_UNITS_CONTEXT["species"]:
-        fair_col, _, _ = _get_fair_col_unit_context(species)
+    Parameters
+    ----------
+    timeseries : :obj:`pd.DataFrame`
+        Timeseries with ``scenario``, ``model``, ``variable`` and ``unit``
+        index levels and integer years as columns (e.g.
+        :attr:`openscm_runner.adapters.utils._scenario_bundle.ScenarioBundle.timeseries`).
+        Missing values (``nan``) are interpolated or extrapolated.
+
+    startyear : int
+        First year of the emissions arrays
+
+    scen_startyear : int
+        First year of the scenarios, defaults to the first year of
+        ``timeseries``
+
+    endyear : int
+        Last year of the emissions arrays, defaults to the last year of
+        ``timeseries``
+
+    Returns
+    -------
+    list[tuple[str, str]], :obj:`np.ndarray`
+        (scenario, model) pairs, sorted, and FaIR emissions of shape
+        ``(n_scenarios, nt, 40)`` in the same order
+    """
+    n_cols = 40
+    years = np.asarray(timeseries.columns, dtype=int)
+    if scen_startyear is None:
+        scen_startyear = int(years[0])
 
-        hist_df_row = hist_df.index.get_level_values("variable").str.endswith(species)
+    if endyear is None:
+        endyear = int(years[-1])
 
-        data_out[:first_scen_row, fair_col] = hist_df[hist_df_row].values.squeeze()
+    nt = endyear - startyear + 1
+    first_scen_row = scen_startyear - startyear
 
-        future_df_row = future_df.index.get_level_values("variable").str.endswith(
-            species
+    scenario_model = pd.MultiIndex.from_arrays(
+        [
+            timeseries.index.get_level_values("scenario"),
+            timeseries.index.get_level_values("model"),
+        ]
+    )
+    scenario_codes, scenarios = scenario_model.factorize(sort=True)
+
+    background = _get_background_emissions()
+    background_years = background[:, 0]
+    emissions = np.empty((len(scenarios), nt, n_cols))
+    emissions[:, :, 0] = np.arange(startyear, endyear + 1)
+    emissions[:, :, 1:] = background[
+        (background_years >= startyear) & (background_years <= endyear), 1:
+    ]
+
+    columns_factors = [
+        _get_column_and_factor(variable, unit)
+        for variable, unit in zip(
+            timeseries.index.get_level_values("variable"),
+            timeseries.index.get_level_values("unit"),
+        )
+    ]
+    used = np.array([value is not None for value in columns_factors], dtype=bool)
+    if not used.any():
+        return list(scenarios), emissions
+
+    fair_cols = np.array([value[0] for value in columns_factors if value is not None])
+    factors = np.array([value[1] for value in columns_factors if value is not None])
+    scenario_codes = scenario_codes[used]
+    values = timeseries.to_numpy(dtype=float)[used]
+
+    # interpolate all the timeseries with the same missing values at once
+    available = ~np.isnan(values)
+    patterns, pattern_codes = np.unique(available, axis=0, return_inverse=True)
+    target_years = tuple(range(scen_startyear, endyear + 1))
+    for pattern_code, pattern in enumerate(patterns):
+        rows = np.flatnonzero(pattern_codes.ravel() == pattern_code)
+        weights = _get_interpolation_weights(tuple(years[pattern]), target_years)
+        interpolated = (
+            values[np.ix_(rows, pattern)] @ weights * factors[rows, np.newaxis]
         )
-        data_out[first_scen_row:, fair_col] = future_df[future_df_row].values.squeeze()
+        emissions[scenario_codes[rows], first_scen_row:, fair_cols[rows]] = interpolated
 
-    for var_df in scmrun.groupby("variable"):
-        variable = var_df.get_unique_meta("variable", no_duplicates=True)
+    return list(scenarios), emissions
 
-        # Skip aggregate emissions and emissons not handled by FaIR
-        if (
-            variable.split("Emissions")[1]
-            not in EMISSIONS_SPECIES_UNITS_CONTEXT.species.values
-        ):
-            continue
 
-        in_unit = var_df.get_unique_meta("unit", no_duplicates=True)
+def scmdf_to_emissions(scmrun, startyear=1750, endyear=2100, scen_startyear=2015):
+    """
+    Convert an :obj:`scmdata.ScmRun` into a FaIR emissions :obj:`np.ndarray`
 
-        fair_col, fair_unit, context = _get_fair_col_unit_context(variable)
+    Interpolates linearly if required between non-consecutive years in the
+    SCEN file. Fills in Montreal gases from SSP2-4.5. To convert many
+    scenarios at once, use :func:`timeseries_to_emissions`.
 
-        if in_unit != fair_unit:
-            var_df_fair_unit = var_df.convert_unit(fair_unit, context=context)
-        else:
-            var_df_fair_unit = var_df
+    Parameters
+    ----------
+    scmrun : :obj:`ScmRun`
+        :obj:`ScmRun` instance to convert to FaIR emissions array.
+    startyear : int
+        First year of output array to produce.
+    endyear : int
+        Last year of output array to produce.
+    scen_startyear : int
+        First year of the future scenario corresponding to :obj:`ScmRun`.
 
-        data_out[first_scen_row:, fair_col] = var_df_fair_unit.values.squeeze()
+    Returns
+    -------
+    np.ndarray
+        FaIR emissions array of size (nt, 40).
+
+    Raises
+    ------
+    AssertionError
+        If there is more than one model-scenario pair in the provided :obj:`ScmRun`.
+    """
+    if scmrun.meta[["model", "scenario"]].drop_duplicates().shape[0] != 1:
+        raise AssertionError("Should only have one model-scenario pair")
+
+    _, emissions = timeseries_to_emissions(
+        scmrun.timeseries(
+            meta=["scenario", "model", "variable", "unit"], time_axis="year"
+        ),
+        startyear=startyear,
+        scen_startyear=scen_startyear,
+        endyear=endyear,
+    )
 
-    return data_out
+    return emissions[0]
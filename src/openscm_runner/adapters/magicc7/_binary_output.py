@@ -0,0 +1,279 @@
+"""
+Fast reading of MAGICC's binary output
+
+With ``out_ascii_binary = "BINARY"``, MAGICC writes each output variable to a
+``DAT_<variable>.BINOUT`` file of Fortran unformatted records (each record's
+data is preceded and followed by its size in bytes). pymagicc reads these
+files through :obj:`pymagicc.io.MAGICCData`, which builds several pandas
+objects per file. :func:`read_binary_output` instead reads the data of all the
+files of a run straight into a single array, and :func:`binary_outputs_to_scmrun`
+puts the output of many runs into a single preallocated array from which one
+:obj:`scmdata.ScmRun` is made.
+
+Both of the formats pymagicc reads are supported: version 2 (which starts with
+a ``magicc`` record and names the variable, region and unit of each column)
+and the legacy format (which names nothing, so the variable is taken from the
+file name and the unit is ``unknown``).
+"""
+import functools
+import logging
+import os.path
+import struct
+import typing
+
+import numpy as np
+import scmdata
+
+from ._compat import pymagicc
+
+LOGGER = logging.getLogger(__name__)
+
+_RECORD_SIZE = struct.Struct("i")
+"""struct.Struct: Size of a record, written before and after its data"""
+
+_LEGACY_REGIONS = (
+    "World",
+    "World|Northern Hemisphere|Ocean",
+    "World|Northern Hemisphere|Land",
+    "World|Southern Hemisphere|Ocean",
+    "World|Southern Hemisphere|Land",
+)
+"""tuple[str]: Regions of the columns of legacy files with regional data"""
+
+
+class BinaryOutput(typing.NamedTuple):
+    """
+    Output of a MAGICC run, as read by :func:`read_binary_output`
+    """
+
+    years: np.ndarray
+    """Years of the output"""
+
+    columns: dict[str, list[str]]
+    """``variable``, ``region`` and ``unit`` of each timeseries"""
+
+    values: np.ndarray
+    """Timeseries, with shape ``(timeseries, time)``"""
+
+
+def _read_records(filepath):
+    """
+    Split a file into its records
+
+    Returns
+    -------
+    list[memoryview]
+        Data of each record (without copying)
+
+    Raises
+    ------
+    ValueError
+        The file isn't made of Fortran unformatted records
+    """
+    with open(filepath, "rb") as file_handle:
+        buffer = memoryview(file_handle.read())
+
+    records = []
+    pos = 0
+    while pos < len(buffer):
+        (size,) = _RECORD_SIZE.unpack_from(buffer, pos)
+        start = pos + _RECORD_SIZE.size
+        end = start + size
+        if end + _RECORD_SIZE.size > len(buffer) or (
+            _RECORD_SIZE.unpack_from(buffer, end)[0] != size
+        ):
+            raise ValueError(f"{filepath}: corrupt record at byte {pos}")
+
+        records.append(buffer[start:end])
+        pos = end + _RECORD_SIZE.size
+
+    return records
+
+
+@functools.cache
+def _to_openscm_variable(magicc_variable):
+    variable = magicc_variable.removeprefix("DAT_")
+    variable = pymagicc.definitions.convert_magicc6_to_magicc7_variables(variable)
+
+    return pymagicc.definitions.convert_magicc7_to_openscm_variables(variable)
+
+
+@functools.cache
+def _to_openscm_region(magicc_region):
+    return pymagicc.definitions.convert_magicc_to_openscm_regions(magicc_region)
+
+
+def _parse_file(filepath):
+    """
+    Parse a binary output file
+
+    Returns
+    -------
+    :obj:`np.ndarray`, dict[str, list[str]], list[:obj:`np.ndarray`]
+        Years, ``variable``, ``region`` and ``unit`` of each column and the
+        data of each column (views of the file's data). ``None`` if the file
+        doesn't have annual data.
+    """
+    records = _read_records(filepath)
+    if records and records[0].tobytes() == b"magicc":
+        version = np.frombuffer(records[1], dtype=np.int16)[0]
+        if version != 2:  # noqa: PLR2004
+            raise ValueError(f"{filepath}: unsupported binary format {version}")
+
+        records = records[2:]
+    else:
+        version = None
+
+    datacolumns, firstyear, lastyear, annualsteps = (
+        int(np.frombuffer(record, dtype=np.uint32)[0]) for record in records[:4]
+    )
+    if annualsteps != 1:
+        LOGGER.warning("Not reading %s: only annual output can be read", filepath)
+        return None
+
+    years = np.arange(firstyear, lastyear + 1)
+    if version is None:
+        variable = _to_openscm_variable(os.path.basename(filepath).split(".")[0])
+        data = [np.frombuffer(records[4], dtype=np.float64)]
+        if datacolumns == 1:
+            regions = _LEGACY_REGIONS[:1]
+        else:
+            # regions are stored one after the other
+            data.extend(
+                np.frombuffer(records[5], dtype=np.float64).reshape(-1, years.size)
+            )
+            regions = _LEGACY_REGIONS
+
+        columns = {
+            "variable": [variable] * len(data),
+            "region": list(regions),
+            "unit": ["unknown"] * len(data),
+        }
+    else:
+        header_records = records[4::4]
+        columns = {
+            "variable": [
+                _to_openscm_variable(r.tobytes().decode()) for r in header_records
+            ],
+            "region": [_to_openscm_region(r.tobytes().decode()) for r in records[5::4]],
+            "unit": [r.tobytes().decode() for r in records[6::4]],
+        }
+        data = [np.frombuffer(record, dtype=np.float64) for record in records[7::4]]
+
+    for column_data in data:
+        if column_data.size != years.size:
+            raise ValueError(
+                f"{filepath}: expected {years.size} values per column, "
+                f"got {column_data.size}"
+            )
+
+    return years, columns, data
+
+
+def read_binary_output(out_dir, variables):
+    """
+    Read the binary output of a MAGICC run
+
+    Parameters
+    ----------
+    out_dir : str
+        MAGICC's output directory
+
+    variables : list[str]
+        MAGICC names of the variables to read (e.g. ``DAT_SURFACE_TEMP``).
+        Variables for which there is no annual output are skipped.
+
+    Returns
+    -------
+    :obj:`BinaryOutput`
+        The output
+
+    Raises
+    ------
+    ValueError
+        There is no output for any of ``variables``, a file is corrupt or the
+        files have different years
+    """
+    years = None
+    columns = {"variable": [], "region": [], "unit": []}
+    data = []
+    for variable in variables:
+        filepath = os.path.join(out_dir, f"{variable}.BINOUT")
+        if not os.path.exists(filepath):
+            LOGGER.debug("No binary output for %s", variable)
+            continue
+
+        parsed = _parse_file(filepath)
+        if parsed is None:
+            continue
+
+        file_years, file_columns, file_data = parsed
+        if years is None:
+            years = file_years
+        elif not np.array_equal(years, file_years):
+            raise ValueError(f"{filepath}: years differ from the other output")
+
+        for key, values in file_columns.items():
+            columns[key].extend(values)
+
+        data.extend(file_data)
+
+    if years is None:
+        raise ValueError(f"No output found for {variables}")
+
+    values = np.empty((len(data), years.size))
+    for i, column_data in enumerate(data):
+        values[i] = column_data
+
+    return BinaryOutput(years, columns, values)
+
+
+def binary_outputs_to_scmrun(results):
+    """
+    Combine the binary output of many runs into an :obj:`scmdata.ScmRun`
+
+    Parameters
+    ----------
+    results : list[tuple[dict, :obj:`BinaryOutput`]]
+        Metadata (e.g. ``scenario`` and ``run_id``) and output of each run.
+        Each run must have the same metadata keys.
+
+    Returns
+    -------
+    :obj:`scmdata.ScmRun`
+        Output of all the runs, with the same metadata as pymagicc gives
+    """
+    if not results:
+        return scmdata.run_append([])
+
+    years = results[0][1].years
+    same_years = all(np.array_equal(output.years, years) for _, output in results)
+    if not same_years:
+        years = np.unique(np.concatenate([output.years for _, output in results]))
+
+    n_timeseries = sum(output.values.shape[0] for _, output in results)
+    values = np.full((n_timeseries, years.size), np.nan)
+    columns = {key: [] for key in (*results[0][1].columns, *results[0][0])}
+    row = 0
+    for meta, output in results:
+        n_run = output.values.shape[0]
+        if same_years:
+            values[row : row + n_run] = output.values
+        else:
+            values[
+                row : row + n_run, np.searchsorted(years, output.years)
+            ] = output.values
+
+        for key, column in output.columns.items():
+            columns[key].extend(column)
+
+        for key, value in meta.items():
+            columns[key].extend([value] * n_run)
+
+        row += n_run
+
+    return scmdata.ScmRun(
+        values.T,
+        index=years,
+        columns={**columns, "climate_model": "MAGICC7", "todo": "not_relevant"},
+    )
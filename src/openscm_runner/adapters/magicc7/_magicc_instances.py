@@ -1,29 +1,181 @@
 """
 Module to keep track of MAGICC instances on disk
+
+Instances are normally removed at the end of each run. If
+``MAGICC_PERSISTENT_WORKERS`` is set, they are instead kept in
+``MAGICC_WORKER_ROOT_DIR`` and reused by later runs (in any process), which
+saves copying and setting up MAGICC each time. Persistent instances are only
+reused with the same MAGICC version and an unchanged ``run`` directory (see
+:func:`get_persistent_instances`). Each instance is claimed by one process at
+a time with a lock file.
 """
+import hashlib
+import json
 import logging
 import multiprocessing
+import os
 import shutil
 import tempfile
 import typing
 
 from ...settings import config
 from ._compat import pymagicc
+from ._provision import ADAPTER_RUN_DIRS, create_worker_copy
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # not available on Windows
+    fcntl = None
 
 LOGGER = logging.getLogger(__name__)
 
+PERSISTENT_DIR_NAME = "openscm-runner-magicc-instances"
+"""str: Name of the directory, in ``MAGICC_WORKER_ROOT_DIR``, of persistent instances"""
+
+_INSTANCE_MARKER = "openscm-runner-instance.json"
+"""str: File written in a persistent instance once it has been set up"""
+
+_LOCKS = {}
+"""dict: Locks (open files) on the persistent instances claimed by this process"""
+
+
+def _get_run_dir_checksum(run_dir):
+    """
+    Get a checksum of MAGICC's run directory
+
+    The checksum covers the path, size and modification time of every file
+    (rather than their contents, so that hundreds of MB don't have to be read
+    on every run). The scenario files written by the adapter (see
+    :data:`ADAPTER_RUN_DIRS`) are ignored.
+    """
+    checksum = hashlib.sha1(usedforsecurity=False)
+    for dirpath, dirnames, filenames in os.walk(run_dir):
+        if dirpath == run_dir:
+            dirnames[:] = [d for d in dirnames if d not in ADAPTER_RUN_DIRS]
+
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            stat = os.stat(path)
+            checksum.update(
+                f"{os.path.relpath(path, run_dir)}\0{stat.st_size}\0"
+                f"{stat.st_mtime_ns}\0".encode()
+            )
+
+    return checksum.hexdigest()
+
+
+def get_persistent_instances(root_dir, executable, magicc_version):
+    """
+    Get the directory and validation data of persistent MAGICC instances
+
+    Stale instances (of other MAGICC versions or run directories) which
+    aren't in use are removed.
+
+    Parameters
+    ----------
+    root_dir : str
+        ``MAGICC_WORKER_ROOT_DIR``
+
+    executable : str
+        Path to the MAGICC executable
+
+    magicc_version : str
+        Version of the MAGICC executable
+
+    Returns
+    -------
+    tuple[str, dict]
+        Directory in which instances of this MAGICC are kept and the data
+        with which every instance in it is validated
+    """
+    run_dir = os.path.abspath(os.path.join(os.path.dirname(executable), "..", "run"))
+    validation = {
+        "executable": os.path.abspath(executable),
+        "magicc_version": magicc_version,
+        "run_dir_checksum": _get_run_dir_checksum(run_dir),
+    }
+    key = hashlib.sha1(
+        json.dumps(validation, sort_keys=True).encode(), usedforsecurity=False
+    ).hexdigest()
+
+    parent_dir = os.path.join(root_dir, PERSISTENT_DIR_NAME)
+    if os.path.isdir(parent_dir):
+        for name in os.listdir(parent_dir):
+            if name != key:
+                _remove_unused_instances(os.path.join(parent_dir, name))
+
+    return os.path.join(parent_dir, key), validation
+
+
+def _lock(lock_file, handle=None):
+    """
+    Lock a file without waiting
+
+    Returns
+    -------
+    file object
+        Open handle holding the lock, ``None`` if the file is already locked
+    """
+    if handle is None:
+        handle = open(lock_file, "a", encoding="ascii")
+
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+
+    return handle
+
+
+def _remove_unused_instances(directory):
+    """
+    Remove the persistent instances in a directory which no process is using
+    """
+    for name in os.listdir(directory):
+        if not name.endswith(".lock"):
+            continue
+
+        lock_file = os.path.join(directory, name)
+        handle = _lock(lock_file)
+        if handle is None:
+            continue
+
+        instance_dir = lock_file[: -len(".lock")]
+        LOGGER.info("removing %s", instance_dir)
+        shutil.rmtree(instance_dir, ignore_errors=True)
+        os.remove(lock_file)
+        handle.close()
+
+    try:
+        os.rmdir(directory)
+    except OSError:
+        # still in use
+        pass
+
 
 class _MagiccInstances:
-    def __init__(self, existing_instances):
+    def __init__(self, existing_instances=None, persistent=None):
         """
         Initialise a MAGICC instances handler
 
+        Each process keeps track of its own instances (see
+        :func:`_init_magicc_worker`).
+
         Parameters
         ----------
-        existing_instances : :obj:`multiprocessing.managers.DictProxy`
-            Dictionary which can store new/existing instances across parallel processes
+        existing_instances : dict
+            Existing instances (a new dictionary is used if ``None``)
+
+        persistent : tuple[str, dict]
+            Directory and validation data of persistent instances, as returned
+            by :func:`get_persistent_instances`. If ``None``, instances are
+            temporary.
         """
-        self.instances = existing_instances
+        self.instances = {} if existing_instances is None else existing_instances
+        self.persistent = persistent
 
     def __enter__(self):
         return self
@@ -31,15 +183,24 @@ class _MagiccInstances:
     def cleanup(self):
         """
         Remove all MAGICC instances
+
+        Persistent instances are kept and the locks this process holds on
+        them are released.
         """
         # have to use list as can't modify dict whilst iterating
         insts = list(self.instances.keys())
 
         for magicc_inst in insts:
-            LOGGER.info("removing %s", self.instances[magicc_inst].root_dir)
-            shutil.rmtree(self.instances[magicc_inst].root_dir)
+            root_dir = self.instances[magicc_inst].root_dir
+            if self.persistent is None:
+                LOGGER.info("removing %s", root_dir)
+                shutil.rmtree(root_dir)
+
             self.instances.pop(magicc_inst)
 
+        for root_dir in list(_LOCKS):
+            _LOCKS.pop(root_dir).close()
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.cleanup()
 
@@ -92,21 +253,115 @@ class _MagiccInstances:
         try:
             return self.instances[key]
         except KeyError:
-            kwargs_init = {}
-            if root_dir:
-                kwargs_init["root_dir"] = self._generate_magicc_root(root_dir)
-
             # ensure pymagicc will behave itself
             pymagicc.config.config["EXECUTABLE_7"] = config["MAGICC_EXECUTABLE_7"]
-            magicc = pymagicc.MAGICC7(strict=False, **kwargs_init)
-            LOGGER.info("Creating new magicc instance: %s - %s", key, magicc.root_dir)
-            magicc.create_copy()
-
-            self.instances[key] = magicc
             if init_callback_kwargs is None:
                 init_callback_kwargs = {}
 
+            magicc = None
+            if self.persistent is not None:
+                magicc = self._claim_persistent()
+
+            if magicc is None:
+                kwargs_init = {}
+                if self.persistent is not None:
+                    kwargs_init["root_dir"] = self._generate_persistent_root()
+                elif root_dir:
+                    kwargs_init["root_dir"] = self._generate_magicc_root(root_dir)
+
+                magicc = pymagicc.MAGICC7(strict=False, **kwargs_init)
+                LOGGER.info(
+                    "Creating new magicc instance: %s - %s", key, magicc.root_dir
+                )
+                create_worker_copy(magicc)
+            else:
+                LOGGER.info(
+                    "Reusing persistent magicc instance: %s - %s", key, magicc.root_dir
+                )
+
+            # callbacks are also run on reused instances so that their
+            # configuration is reset
             if init_callback is not None:
                 init_callback(magicc, **init_callback_kwargs)
 
+            if self.persistent is not None:
+                with open(
+                    os.path.join(magicc.root_dir, _INSTANCE_MARKER),
+                    "w",
+                    encoding="ascii",
+                ) as file_handle:
+                    json.dump(self.persistent[1], file_handle)
+
+            self.instances[key] = magicc
+
             return magicc
+
+    def _generate_persistent_root(self):
+        """
+        Create and claim a new persistent instance directory
+
+        The lock is taken before the directory is created so that other
+        processes never see an unclaimed, incomplete instance.
+        """
+        directory = self.persistent[0]
+        os.makedirs(directory, exist_ok=True)
+        lock_fd, lock_file = tempfile.mkstemp(
+            prefix="pymagicc-", suffix=".lock", dir=directory
+        )
+        handle = _lock(lock_file, os.fdopen(lock_fd, "a", encoding="ascii"))
+        root_dir = lock_file[: -len(".lock")]
+        os.mkdir(root_dir)
+        _LOCKS[root_dir] = handle
+
+        return root_dir
+
+    def _claim_persistent(self):
+        """
+        Claim a persistent instance which no other process is using
+
+        Returns
+        -------
+        :obj:`pymagicc.MAGICC7`
+            Claimed instance, ``None`` if there are no free instances
+        """
+        directory, validation = self.persistent
+        if not os.path.isdir(directory):
+            return None
+
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".lock"):
+                continue
+
+            lock_file = os.path.join(directory, name)
+            handle = _lock(lock_file)
+            if handle is None:
+                # in use
+                continue
+
+            root_dir = lock_file[: -len(".lock")]
+            try:
+                with open(
+                    os.path.join(root_dir, _INSTANCE_MARKER), encoding="ascii"
+                ) as file_handle:
+                    valid = json.load(file_handle) == validation
+            except (OSError, ValueError):
+                # set up was never finished (e.g. the process was killed)
+                valid = False
+
+            if not valid:
+                LOGGER.info("removing invalid instance %s", root_dir)
+                shutil.rmtree(root_dir, ignore_errors=True)
+                os.remove(lock_file)
+                handle.close()
+                continue
+
+            # output of previous runs must not be read as this run's output
+            out_dir = os.path.join(root_dir, "out")
+            shutil.rmtree(out_dir, ignore_errors=True)
+            os.makedirs(out_dir)
+
+            _LOCKS[root_dir] = handle
+
+            return pymagicc.MAGICC7(root_dir=root_dir, strict=False)
+
+        return None
@@ -0,0 +1,206 @@
+"""
+Provisioning of MAGICC worker directories
+
+:meth:`pymagicc.MAGICC7.create_copy` copies the whole MAGICC distribution
+(around 500 MB) for every worker. Almost all of it is only ever read, so
+:func:`create_linked_copy` links to those files instead and only gives each
+worker its own copy of the files which are written during a run: the
+configuration namelists (``MAGCFG_*`` and ``MAGTUNE_*``, which pymagicc
+rewrites in place so they can't be shared) and the ``out`` directory.
+
+Files are hard linked where possible. If that fails (e.g. the workers are on a
+different filesystem to MAGICC), data files are symlinked and the executable
+is copied so that it doesn't run from the original MAGICC directory. Copies
+are reflinks (copy-on-write clones) on filesystems which support them
+(e.g. Btrfs and XFS).
+
+``MAGICC_WORKER_PROVISIONING`` chooses between ``link`` (the default) and
+``copy`` (pymagicc's full copy).
+"""
+import fnmatch
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+from ...settings import config
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # not available on Windows
+    fcntl = None
+
+LOGGER = logging.getLogger(__name__)
+
+ADAPTER_RUN_DIRS = ("openscm-runner",)
+"""
+tuple[str]: Directories the adapter writes into MAGICC's run directory (which
+aren't part of MAGICC and aren't needed by workers)
+"""
+
+WRITTEN_FILES = ("MAGCFG_*", "MAGTUNE_*")
+"""tuple[str]: Patterns of the files in the run directory which are written to"""
+
+_FICLONE = 0x40049409
+"""int: Linux ioctl request to clone a file (see ``ioctl_ficlone(2)``)"""
+
+
+def _clone_file(source, target):
+    """
+    Copy a file, as a reflink if the filesystem supports it
+    """
+    if fcntl is not None and sys.platform.startswith("linux"):
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError:
+            shutil.copyfile(source, target)
+    else:  # pragma: no cover
+        shutil.copyfile(source, target)
+
+    shutil.copymode(source, target)
+
+
+def _link_file(source, target, symlink):
+    """
+    Hard link a file, falling back to a symlink (if ``symlink``) or a copy
+    """
+    try:
+        os.link(source, target)
+    except OSError:
+        if symlink:
+            os.symlink(source, target)
+        else:
+            _clone_file(source, target)
+
+
+def _is_written(filename):
+    return any(
+        fnmatch.fnmatchcase(filename.upper(), pattern) for pattern in WRITTEN_FILES
+    )
+
+
+def create_linked_copy(magicc):
+    """
+    Create a worker copy of MAGICC which links to the original's files
+
+    This is equivalent to :meth:`pymagicc.MAGICC7.create_copy`, including the
+    configuration it writes.
+
+    Parameters
+    ----------
+    magicc : :obj:`pymagicc.MAGICC7`
+        Instance for which to create the copy (in ``magicc.root_dir``, or a
+        new temporary directory if that is ``None``)
+
+    Raises
+    ------
+    FileNotFoundError
+        The MAGICC executable can't be found
+
+    FileExistsError
+        ``magicc.root_dir`` already contains a copy of MAGICC
+    """
+    if magicc.executable is None or not os.path.isfile(magicc.executable):
+        raise FileNotFoundError(
+            f"Could not find MAGICC7 executable: {magicc.executable}"
+        )
+
+    if magicc.root_dir is None:
+        magicc.root_dir = tempfile.mkdtemp(prefix="pymagicc-")
+
+    if os.path.exists(magicc.run_dir):
+        raise FileExistsError(f"A copy of MAGICC already exists in {magicc.root_dir}")
+
+    # as in pymagicc, the root and bin directories are copied without their
+    # subdirectories
+    exec_dir = os.path.abspath(magicc.original_dir)
+    distribution_dir = os.path.dirname(exec_dir)
+    for directory in (".", "bin", "run"):
+        source_dir = os.path.join(distribution_dir, directory)
+        if not os.path.isdir(source_dir):
+            continue
+
+        for dirpath, dirnames, filenames in os.walk(source_dir):
+            if directory != "run":
+                dirnames.clear()
+            elif dirpath == source_dir:
+                dirnames[:] = [d for d in dirnames if d not in ADAPTER_RUN_DIRS]
+
+            target_dir = os.path.join(
+                magicc.root_dir, os.path.relpath(dirpath, distribution_dir)
+            )
+            os.makedirs(target_dir, exist_ok=True)
+            for filename in filenames:
+                source = os.path.join(dirpath, filename)
+                target = os.path.join(target_dir, filename)
+                if directory == "run" and _is_written(filename):
+                    _clone_file(source, target)
+                else:
+                    _link_file(
+                        source,
+                        target,
+                        symlink=os.path.abspath(dirpath) != exec_dir,
+                    )
+
+    os.makedirs(magicc.out_dir)
+
+    # configuration written by pymagicc.MAGICC7.create_copy
+    magicc.set_years()
+    magicc.set_config()
+    magicc.update_config(
+        "MAGCFG_USER.CFG",
+        file_tuningmodel_1="PYMAGICC",
+        **{f"file_tuningmodel_{i}": "USER" for i in range(2, 11)},
+    )
+    if magicc.strict:
+        magicc.update_config(
+            "MAGCFG_USER.CFG",
+            **{f"file_emisscen_{i}": "NONE" for i in range(2, 9)},
+        )
+
+
+def get_worker_provisioning():
+    """
+    Get how worker copies of MAGICC are made
+
+    Returns
+    -------
+    str
+        ``MAGICC_WORKER_PROVISIONING`` (``link`` if it is not set)
+
+    Raises
+    ------
+    ValueError
+        ``MAGICC_WORKER_PROVISIONING`` is not ``link`` or ``copy``
+    """
+    provisioning = config.get("MAGICC_WORKER_PROVISIONING", "link")
+    if provisioning not in ("link", "copy"):
+        raise ValueError(
+            "MAGICC_WORKER_PROVISIONING must be 'link' or 'copy', "
+            f"received {provisioning!r}"
+        )
+
+    return provisioning
+
+
+def create_worker_copy(magicc):
+    """
+    Create a worker copy of MAGICC as set by ``MAGICC_WORKER_PROVISIONING``
+
+    Parameters
+    ----------
+    magicc : :obj:`pymagicc.MAGICC7`
+        Instance for which to create the copy
+
+    Raises
+    ------
+    ValueError
+        ``MAGICC_WORKER_PROVISIONING`` is not ``link`` or ``copy``
+    """
+    if get_worker_provisioning() == "link":
+        create_linked_copy(magicc)
+    else:
+        magicc.create_copy()
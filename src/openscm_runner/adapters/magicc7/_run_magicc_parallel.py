@@ -4,67 +4,24 @@ Module for running MAGICC in parallel
 import logging
 import multiprocessing
 import os.path
+import subprocess  # nosec
 import tempfile
 import typing
 from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
 from subprocess import CalledProcessError  # nosec
 
 import scmdata
 
 from ...settings import config
 from ..utils._parallel_process import _parallel_process
+from ._binary_output import binary_outputs_to_scmrun, read_binary_output
 from ._compat import f90nml, pymagicc
-from ._magicc_instances import _MagiccInstances
+from ._magicc_instances import _MagiccInstances, fcntl, get_persistent_instances
 
 LOGGER = logging.getLogger(__name__)
 
 
-class TemporaryDirectoryIfNeeded:
-    """
-    A temporary directory context manager which works like
-    tempfile.TemporaryDirectory but supports existing directories.
-
-    If instantiated without a directory, behaves exactly like
-    tempfile.TemporaryDirectory. If instantiated with an explicit directory
-    name, will use this directory instead and will *not* delete the directory
-    when exiting the context.
-    """
-
-    def __init__(self, tempdir: typing.Union[None, str] = None, **kwargs):
-        if tempdir is None:
-            # pylint: disable-next=consider-using-with
-            self._td = tempfile.TemporaryDirectory(**kwargs)
-        else:
-            self._td = None
-            self._tempdir = tempdir
-
-    def __enter__(self) -> str:
-        """Create temporary directory if needed."""
-        if self._td is None:
-            return self._tempdir
-        return self._td.__enter__()
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Delete directory if temporary directory was created."""
-        if self._td is not None:
-            self._td.__exit__(exc_type, exc_val, exc_tb)
-
-    def __repr__(self):
-        """Human-readable representation."""
-        if self._td is None:
-            return f"<TemporaryDirectoryIfNeeded {self._tempdir}>"
-        return repr(self._td)
-
-    def cleanup(self):
-        """
-        Delete the temporary directory if it was created.
-
-        Does not delete the directory if an existing directory was used.
-        """
-        if self._td is not None:
-            self._td.cleanup()
-
-
 def _inject_pymagicc_compatible_magcfg_user(magicc):
     """
     Overwrite ``magicc.run_dir / MAGCFG_USER.CFG`` with config that only point to ``MAGTUNE_PYMAGICC.CFG``
@@ -92,34 +49,106 @@ def _setup_func(magicc):
     _inject_pymagicc_compatible_magcfg_user(magicc)
 
 
-def _init_magicc_worker(dict_shared_instances):
+_WORKER_STATE = {}
+"""
+dict: Configs, shared settings and MAGICC instances of the current
+:func:`run_magicc_parallel` call
+"""
+
+
+def _init_magicc_worker(cfgs=None, cfg_extra=None, root_dir=None, persistent=None):
+    """
+    Initialise a worker process
+
+    Each worker keeps track of its own MAGICC instances, which are cleaned up
+    when the worker exits (or, in the calling process, by
+    :func:`run_magicc_parallel`).
+    """
     LOGGER.debug("Initialising process %s", multiprocessing.current_process())
-    LOGGER.debug("Existing instances %s", dict_shared_instances)
-    magicc_instances = _MagiccInstances(  # noqa: F841 # pylint:disable=unused-variable
-        dict_shared_instances
+    instances = _MagiccInstances(persistent=persistent)
+    _WORKER_STATE["instances"] = instances
+    _WORKER_STATE["cleanup"] = Finalize(instances, instances.cleanup, exitpriority=10)
+    _WORKER_STATE["cfgs"] = cfgs
+    _WORKER_STATE["cfg_extra"] = cfg_extra
+    _WORKER_STATE["root_dir"] = root_dir
+
+
+def _run_magicc_binary(magicc, cfg):
+    """
+    Run MAGICC with binary output
+
+    This does what :meth:`pymagicc.MAGICC7.run` does before reading the
+    output.
+
+    Returns
+    -------
+    :obj:`BinaryOutput`, str
+        Output and stderr of the run
+    """
+    cfg = {**cfg, "out_ascii_binary": "BINARY"}
+    # MAGICC's previous output mustn't be read if this run doesn't write it
+    for variable in cfg["out_dynamic_vars"]:
+        try:
+            os.remove(os.path.join(magicc.out_dir, f"{variable}.BINOUT"))
+        except FileNotFoundError:
+            pass
+
+    magicc.update_config(**cfg)
+    magicc.check_config()
+
+    executable = os.path.join(
+        magicc.root_dir, os.path.basename(magicc.original_dir), magicc.binary_name
     )
+    res = subprocess.run(  # nosec
+        [executable],  # noqa: S603
+        check=True,
+        capture_output=True,
+        cwd=magicc.run_dir,
+    )
+
+    output = read_binary_output(magicc.out_dir, cfg["out_dynamic_vars"])
+
+    return output, res.stderr.decode("ascii")
 
 
 def _run_func(
     magicc: "pymagicc.MAGICC7", cfg: dict[str, typing.Any]
-) -> typing.Union[None, dict[str, typing.Any]]:
+) -> typing.Union[None, "scmdata.ScmRun", tuple[dict[str, typing.Any], typing.Any]]:
+    """
+    Do a MAGICC run
+
+    If ``cfg["binary_output"]``, MAGICC writes binary output which is read
+    with :func:`read_binary_output` (rather than by pymagicc) and the metadata
+    and output of the run are returned, to be combined with
+    :func:`binary_outputs_to_scmrun`. Otherwise, the output is returned as an
+    :obj:`scmdata.ScmRun`.
+    """
     try:
         scenario = cfg.pop("scenario")
         model = cfg.pop("model")
         output_config = cfg.pop("output_config")
+        binary_output = cfg.pop("binary_output", False)
 
-        res = magicc.run(**cfg)
-        if res.metadata["stderr"]:
-            LOGGER.warning("magicc run stderr: %s", res.metadata["stderr"])
+        if binary_output:
+            cfg.pop("only")
+            res, stderr = _run_magicc_binary(magicc, cfg)
+        else:
+            res = magicc.run(**cfg)
+            stderr = res.metadata["stderr"]
+
+        if stderr:
+            LOGGER.warning("magicc run stderr: %s", stderr)
             LOGGER.info("cfg: %s", cfg)
 
-        res["scenario"] = scenario
-        res["model"] = model
-        res["run_id"] = cfg["run_id"]
+        meta = {"scenario": scenario, "model": model, "run_id": cfg["run_id"]}
         if output_config is not None:
-            magicc_out_cfg = res.metadata["parameters"]["allcfgs"]
+            if binary_output:
+                magicc_out_cfg = magicc.read_parameters()["allcfgs"]
+            else:
+                magicc_out_cfg = res.metadata["parameters"]["allcfgs"]
+
             for k in output_config:
-                res[k] = cfg[k]
+                meta[k] = cfg[k]
                 if k in magicc_out_cfg and magicc_out_cfg[k] != cfg[k]:
                     LOGGER.warning(
                         "Parameter: %s. "
@@ -130,6 +159,12 @@ def _run_func(
                         magicc_out_cfg[k],
                     )
 
+        if binary_output:
+            return meta, res
+
+        for k, value in meta.items():
+            res[k] = value
+
         return res
     except CalledProcessError as exc:
         # Swallow the exception, but return None
@@ -158,18 +193,91 @@ def _execute_run(
     return run_func(magicc, cfg)
 
 
+def _execute_run_index(index):
+    return _execute_run(
+        cfg={**_WORKER_STATE["cfgs"][index], **_WORKER_STATE["cfg_extra"]},
+        run_func=_run_func,
+        setup_func=_setup_func,
+        instances=_WORKER_STATE["instances"],
+        root_dir=_WORKER_STATE["root_dir"],
+    )
+
+
+def _get_persistent_instances(magicc_version):
+    """
+    Get the persistent instances to use, if they are enabled
+
+    Returns
+    -------
+    tuple[str, dict]
+        Directory and validation data of the persistent instances (see
+        :func:`get_persistent_instances`), ``None`` if instances shouldn't
+        persist
+    """
+    enabled = str(config.get("MAGICC_PERSISTENT_WORKERS", "false")).lower()
+    if enabled not in ("1", "true", "yes"):
+        return None
+
+    root_dir = config.get("MAGICC_WORKER_ROOT_DIR", None)
+    if root_dir is None:
+        LOGGER.warning(
+            "MAGICC_PERSISTENT_WORKERS is ignored as MAGICC_WORKER_ROOT_DIR is not set"
+        )
+        return None
+
+    if fcntl is None:  # pragma: no cover
+        LOGGER.warning(
+            "MAGICC_PERSISTENT_WORKERS is ignored as file locking isn't supported "
+            "on this platform"
+        )
+        return None
+
+    if magicc_version is None:
+        # avoid a circular import
+        # pylint:disable-next=import-outside-toplevel
+        from .magicc7 import _get_magicc_version
+
+        magicc_version = _get_magicc_version(config["MAGICC_EXECUTABLE_7"])
+
+    return get_persistent_instances(
+        root_dir, config["MAGICC_EXECUTABLE_7"], magicc_version
+    )
+
+
+def _get_binary_output():
+    output_format = config.get("MAGICC_OUTPUT_FORMAT", "ascii")
+    if output_format not in ("ascii", "binary"):
+        raise ValueError(
+            "MAGICC_OUTPUT_FORMAT must be 'ascii' or 'binary', "
+            f"received {output_format!r}"
+        )
+
+    return output_format == "binary"
+
+
 def run_magicc_parallel(
-    cfgs: typing.Iterable[dict[str, typing.Any]],
+    cfgs: typing.Sequence[dict[str, typing.Any]],
     output_vars: typing.Iterable[str],
     output_config: typing.Iterable[str],
+    magicc_version: typing.Optional[str] = None,
 ):
     """
     Run MAGICC in parallel using compact out files
 
+    If ``MAGICC_PERSISTENT_WORKERS`` is set, MAGICC instances are kept in
+    ``MAGICC_WORKER_ROOT_DIR`` after the run and reused by later runs (see
+    :mod:`openscm_runner.adapters.magicc7._magicc_instances`).
+
+    If ``MAGICC_OUTPUT_FORMAT`` is ``binary``, MAGICC writes binary output,
+    which is read into arrays and combined into a single :obj:`ScmRun` without
+    pymagicc's per-file parsing (see
+    :mod:`openscm_runner.adapters.magicc7._binary_output`).
+
     Parameters
     ----------
-    cfgs : list[dict]
-        List of configurations with which to run MAGICC
+    cfgs : sequence of dict
+        Configurations with which to run MAGICC (e.g. a list of dicts or a
+        lazy :obj:`ScenarioConfigProduct`)
 
     output_vars : list[str]
         Variables to output
@@ -177,64 +285,81 @@ def run_magicc_parallel(
     output_config : tuple[str]
         Configuration to include in the output
 
+    magicc_version : str
+        Version of the MAGICC executable, used to validate persistent
+        instances (read from the executable if not provided)
+
     Returns
     -------
     :obj:`ScmRun`
         :obj:`ScmRun` instance with all results.
+
+    Raises
+    ------
+    ValueError
+        ``MAGICC_OUTPUT_FORMAT`` is not ``ascii`` or ``binary``
     """
     LOGGER.info("Entered _parallel_magicc_compact_out")
-    shared_manager = multiprocessing.Manager()
-    shared_dict = shared_manager.dict()
-    instances = _MagiccInstances(existing_instances=shared_dict)
+    binary_output = _get_binary_output()
+    persistent = _get_persistent_instances(magicc_version)
 
     magicc_internal_vars = [
         f"DAT_{pymagicc.definitions.convert_magicc7_to_openscm_variables(v, inverse=True)}"
         for v in output_vars
     ]
 
-    with TemporaryDirectoryIfNeeded(
-        tempdir=config.get("MAGICC_WORKER_ROOT_DIR", None)
+    # all the (non-persistent) instances of this call are created in this
+    # directory, so they are removed even if a worker dies without cleaning up
+    with tempfile.TemporaryDirectory(
+        prefix="openscm-runner-magicc-",
+        dir=config.get("MAGICC_WORKER_ROOT_DIR", None),
     ) as root_dir:
-        runs = [
+        # the configs are sent to each worker once, after which workers are
+        # only sent the index of each run
+        worker_state = (
+            cfgs,
             {
-                "cfg": {
-                    **cfg,
-                    "only": output_vars,
-                    "out_dynamic_vars": magicc_internal_vars,
-                    "output_config": output_config,
-                },
-                "run_func": _run_func,
-                "setup_func": _setup_func,
-                "instances": instances,
-                "root_dir": root_dir,
-            }
-            for cfg in cfgs
-        ]
+                "only": output_vars,
+                "out_dynamic_vars": magicc_internal_vars,
+                "output_config": output_config,
+                "binary_output": binary_output,
+            },
+            root_dir,
+            persistent,
+        )
+        # front serial runs happen in this process so it needs the state too
+        _init_magicc_worker(*worker_state)
 
         max_workers = int(
             config.get("MAGICC_WORKER_NUMBER", multiprocessing.cpu_count())
         )
         LOGGER.info("Running in parallel with up to %d workers", max_workers)
-        pool = ProcessPoolExecutor(  # need to handle shared_manager too
+        pool = ProcessPoolExecutor(
             max_workers=max_workers,
             initializer=_init_magicc_worker,
-            initargs=(shared_dict,),
+            initargs=worker_state,
         )
         try:
             res = _parallel_process(
-                func=_execute_run,
-                configuration=runs,
+                func=_execute_run_index,
+                configuration=range(len(cfgs)),
                 pool=pool,
-                config_are_kwargs=True,
+                config_are_kwargs=False,
                 front_serial=2,
                 front_parallel=2,
             )
 
+            res = [r for r in res if r is not None]
+            if binary_output:
+                LOGGER.info("Combining results into a single ScmRun")
+                return binary_outputs_to_scmrun(res)
+
             LOGGER.info("Appending results into a single ScmRun")
-            return scmdata.run_append([r for r in res if r is not None])
+            return scmdata.run_append(res)
 
         finally:
-            instances.cleanup()
             LOGGER.info("Shutting down parallel pool")
-            shared_manager.shutdown()
+            # workers clean up their instances as they exit
             pool.shutdown()
+            _WORKER_STATE["cleanup"]()
+            _WORKER_STATE.clear()
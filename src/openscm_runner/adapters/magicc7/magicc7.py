@@ -1,16 +1,21 @@
 """
 MAGICC7 adapter
 """
+import functools
 import logging
 import os
 from subprocess import check_output  # nosec
 
+import pandas as pd
 from scmdata import ScmRun, run_append
 
 from ...progress import progress
 from ...settings import config
 from ..base import _Adapter
+from ..utils._config_table import ScenarioConfigProduct
+from ..utils._conversion_tables import convert_timeseries_units, translate
 from ._compat import pymagicc
+from ._provision import get_worker_provisioning
 from ._run_magicc_parallel import run_magicc_parallel
 
 LOGGER = logging.getLogger(__name__)
@@ -30,6 +35,7 @@ they should really be made in pymagicc.
 """
 
 
+@functools.cache
 def _convert_to_pymagicc_var(in_var):
     """
     Convert an OpenSCM-Runner name to a Pymagicc name
@@ -42,6 +48,53 @@ def _convert_to_pymagicc_var(in_var):
     return out
 
 
+def _convert_to_magicc_scenario_var(in_var):
+    """
+    Convert an OpenSCM-Runner emissions name to the name used in SCEN7 files
+    """
+    return (
+        in_var.replace("Sulfur", "SOx")
+        .replace("HFC4310mee", "HFC4310")
+        .replace("VOC", "NMVOC")
+    )
+
+
+@functools.cache
+def _get_magicc_emissions_units():
+    """
+    Get the unit and conversion context of each MAGICC7 emissions variable
+
+    Returns
+    -------
+    dict[str, tuple[str, str]]
+        Unit and context (``None`` if no context is needed) for each emissions
+        variable (using OpenSCM names)
+    """
+    emms_units = pymagicc.definitions.MAGICC7_EMISSIONS_UNITS
+    out = {}
+    for magicc_variable, unit in zip(
+        emms_units["magicc_variable"], emms_units["emissions_unit"]
+    ):
+        variable = pymagicc.definitions.convert_magicc7_to_openscm_variables(
+            f"{magicc_variable}_EMIS"
+        )
+        if "NOx" in variable:
+            context = "NOx_conversions"
+        elif "NH3" in variable:
+            context = "NH3_conversions"
+        else:
+            context = None
+
+        out.setdefault(variable, (unit, context))
+
+    return out
+
+
+@functools.cache
+def _get_magicc_version(executable):
+    return check_output([executable, "--version"]).decode("utf-8").strip()  # nosec
+
+
 class MAGICC7(_Adapter):
     """
     Adapter for running MAGICC7
@@ -51,6 +104,11 @@ class MAGICC7(_Adapter):
     """
 
     model_name = "MAGICC7"
+    accepts_scenario_bundle = True
+    worker_state = True
+    worker_number_setting = "MAGICC_WORKER_NUMBER"
+    positional_run_ids = True
+    scratch_dir_setting = "MAGICC_WORKER_ROOT_DIR"
 
     def __init__(self):
         """
@@ -75,48 +133,46 @@ class MAGICC7(_Adapter):
     def _init_model(self):  # pylint:disable=arguments-differ
         pass
 
+    @property
+    def scratch_disk_per_worker(self):
+        """
+        int: Scratch disk space used by each worker (bytes)
+
+        Each worker has its own copy of the MAGICC run directory. With
+        ``MAGICC_WORKER_PROVISIONING=link`` (the default), only the files
+        MAGICC writes are copied, otherwise the whole distribution is.
+        """
+        if get_worker_provisioning() == "copy":
+            return 500 * 1024**2
+
+        return 20 * 1024**2
+
     @staticmethod
-    def _convert_to_magicc_units(scenarios):
-        magicc_scmdf = pymagicc.io.MAGICCData(scenarios)
-        emms_units = pymagicc.definitions.MAGICC7_EMISSIONS_UNITS
-        emms_units["openscm_variable"] = emms_units["magicc_variable"].apply(
-            lambda x: pymagicc.definitions.convert_magicc7_to_openscm_variables(
-                f"{x}_EMIS"
-            )
+    def _convert_to_magicc_units(timeseries):
+        return pymagicc.io.MAGICCData(
+            convert_timeseries_units(timeseries, _get_magicc_emissions_units())
         )
-        emms_units = emms_units.set_index("openscm_variable")
-        for variable in magicc_scmdf["variable"].unique():
-            magicc_unit = emms_units.loc[variable, "emissions_unit"]
-            if "NOx" in variable:
-                context = "NOx_conversions"
-            elif "NH3" in variable:
-                context = "NH3_conversions"
-            else:
-                context = None
-            magicc_scmdf = magicc_scmdf.convert_unit(
-                magicc_unit,
-                variable=variable,
-                context=context,
-            )
-
-        return magicc_scmdf
 
     def _run(self, scenarios, cfgs, output_variables, output_config):
         # TODO: add use of historical data properly  # pylint:disable=fixme
         LOGGER.warning("Historical data has not been checked")
 
-        magicc_df = scenarios.timeseries().reset_index()
-        magicc_df["variable"] = magicc_df["variable"].apply(
-            lambda x: x.replace("Sulfur", "SOx")
-            .replace("HFC4310mee", "HFC4310")
-            .replace("VOC", "NMVOC")
+        timeseries = scenarios.timeseries
+        meta = timeseries.index.to_frame(index=False)
+        meta["variable"] = translate(meta["variable"], _convert_to_magicc_scenario_var)
+        magicc_df = pd.DataFrame(
+            timeseries.to_numpy(),
+            index=pd.MultiIndex.from_frame(meta),
+            columns=timeseries.columns,
         )
 
         magicc_scmdf = self._convert_to_magicc_units(magicc_df)
         full_cfgs = self._write_scen_files_and_make_full_cfgs(magicc_scmdf, cfgs)
 
         pymagicc_vars = [_convert_to_pymagicc_var(v) for v in output_variables]
-        res = run_magicc_parallel(full_cfgs, pymagicc_vars, output_config)
+        res = run_magicc_parallel(
+            full_cfgs, pymagicc_vars, output_config, magicc_version=self.get_version()
+        )
 
         LOGGER.debug("Dropping todo metadata")
         res = res.drop_meta("todo")
@@ -125,9 +181,7 @@ class MAGICC7(_Adapter):
         res = self._fix_pint_incompatible_units(res)
         LOGGER.debug("Mapping variables to OpenSCM conventions")
         inverse_map = {v: k for k, v in _VARIABLE_MAP.items()}
-        res["variable"] = res["variable"].apply(
-            lambda x: inverse_map[x] if x in inverse_map else x
-        )
+        res["variable"] = translate(res["variable"], inverse_map)
 
         res = ScmRun(res)
 
@@ -155,8 +209,7 @@ class MAGICC7(_Adapter):
         return out
 
     def _write_scen_files_and_make_full_cfgs(self, scenarios, cfgs, out_directory=None):
-        full_cfgs = []
-        run_id_block = 0
+        scenario_inputs = []
 
         if out_directory is None:
             # Defaults to writing to the run/openscm-runner directory
@@ -184,20 +237,17 @@ class MAGICC7(_Adapter):
                 magicc_version=self.get_version()[1],
             )
 
-            scenario_cfg = [
+            scenario_inputs.append(
                 {
                     "scenario": scenario,
                     "model": model,
                     "file_emisscen": scen_file_name,
-                    "run_id": i + run_id_block,
-                    **cfg,
-                    **self.magicc_scenario_setup,
                 }
-                for i, cfg in enumerate(cfgs)
-            ]
-            run_id_block += len(scenario_cfg)
+            )
 
-            full_cfgs += scenario_cfg
+        full_cfgs = ScenarioConfigProduct(
+            scenario_inputs, cfgs, overrides=self.magicc_scenario_setup
+        )
 
         exp_shape = scenarios.meta[["scenario", "model"]].drop_duplicates().shape[
             0
@@ -215,12 +265,13 @@ class MAGICC7(_Adapter):
         -------
         str
             The MAGICC7 version id
+
+        Notes
+        -----
+        The version is only read from the executable once per process (for
+        each executable)
         """
-        return (
-            check_output([cls._executable(), "--version"])  # nosec
-            .decode("utf-8")
-            .strip()
-        )
+        return _get_magicc_version(cls._executable())
 
     @classmethod
     def _executable(cls):
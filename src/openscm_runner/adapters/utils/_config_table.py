@@ -0,0 +1,199 @@
+"""
+Compact storage of configuration ensembles
+
+Storing every config as a separate :obj:`dict`, and then merging each config
+with the same defaults once per scenario, creates a very large number of
+Python objects for big ensembles. The classes in this module store the
+configs in columns (or not at all until they are needed) and build the
+:obj:`dict` for a single run only when that run is about to be executed.
+"""
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+class ConfigTable(Sequence):
+    """
+    Ensemble of configs stored as a table
+
+    Each row of the table is one config and each column is one parameter.
+    Parameters which are missing (``NaN`` or ``None``) in a row are left out
+    of that row's config, so rows can set different parameters. Array-valued
+    parameters can be stored in columns with ``object`` dtype.
+
+    Indexing with an integer gives the config as a :obj:`dict`, indexing with
+    a slice or an array of integers gives a :obj:`ConfigTable` of the
+    selected rows.
+    """
+
+    def __init__(self, parameters):
+        """
+        Initialise
+
+        Parameters
+        ----------
+        parameters : :obj:`pd.DataFrame`
+            Table of parameters, one row per config
+        """
+        self._columns = {
+            str(column): parameters[column].to_numpy() for column in parameters.columns
+        }
+        self._n_rows = parameters.shape[0]
+
+    def __len__(self):
+        """Get the number of configs"""
+        return self._n_rows
+
+    def __repr__(self):
+        """Human-readable representation."""
+        return f"<ConfigTable ({len(self)} configs, {len(self._columns)} parameters)>"
+
+    def __getitem__(self, item):
+        """Get a config or a subset of configs"""
+        if isinstance(item, (int, np.integer)):
+            if item < 0:
+                item += self._n_rows
+
+            if not 0 <= item < self._n_rows:
+                raise IndexError(f"config index {item} out of range")
+
+            out = {}
+            for name, values in self._columns.items():
+                value = values[item]
+                if _is_missing(value):
+                    continue
+
+                if isinstance(value, np.generic):
+                    value = value.item()
+
+                out[name] = value
+
+            return out
+
+        return type(self)(self.to_frame().iloc[item])
+
+    def to_frame(self):
+        """
+        Get the configs as a :obj:`pd.DataFrame`
+
+        Returns
+        -------
+        :obj:`pd.DataFrame`
+            Table of parameters, one row per config
+        """
+        return pd.DataFrame(self._columns)
+
+
+def as_config_sequence(cfgs):
+    """
+    Convert configs into a sequence of configs
+
+    Parameters
+    ----------
+    cfgs : list[dict], :obj:`pd.DataFrame`, :obj:`ConfigTable` or iterable of dict
+        Configs. Iterables which are not sequences (e.g. generators) are
+        consumed into a :obj:`list`.
+
+    Returns
+    -------
+    list[dict] or :obj:`ConfigTable`
+        Configs which support :func:`len` and indexing
+    """
+    if isinstance(cfgs, pd.DataFrame):
+        return ConfigTable(cfgs)
+
+    if isinstance(cfgs, Sequence):
+        return cfgs
+
+    return list(cfgs)
+
+
+def take_configs(cfgs, indices):
+    """
+    Select configs by index
+
+    Parameters
+    ----------
+    cfgs : list[dict] or :obj:`ConfigTable`
+        Configs from which to select
+
+    indices : :obj:`np.ndarray`
+        Indices of the configs to select
+
+    Returns
+    -------
+    list[dict] or :obj:`ConfigTable`
+        Selected configs
+    """
+    if isinstance(cfgs, ConfigTable):
+        return cfgs[np.asarray(indices)]
+
+    return [cfgs[i] for i in indices]
+
+
+class ScenarioConfigProduct(Sequence):
+    """
+    Lazy sequence of the full config for every scenario and config
+
+    Item ``i`` is the config for scenario ``i // len(cfgs)`` and config
+    ``i % len(cfgs)``, i.e. runs are ordered by scenario and then by config,
+    and ``i`` is the run ID. Each item is built (as a new :obj:`dict`) from
+    the scenario's values, shared defaults, the config and shared overrides,
+    in that order of increasing precedence.
+
+    Only the inputs are stored, so this is cheap to create and to send to
+    worker processes, which can then be sent only run indices.
+    """
+
+    def __init__(self, scenarios, cfgs, defaults=None, overrides=None):
+        """
+        Initialise
+
+        Parameters
+        ----------
+        scenarios : list[dict]
+            Values which are specific to each scenario
+
+        cfgs : list[dict] or :obj:`ConfigTable`
+            Configs to run for every scenario
+
+        defaults : dict
+            Values used for every run unless set by the config
+
+        overrides : dict
+            Values used for every run, regardless of the config
+        """
+        self.scenarios = scenarios
+        self.cfgs = cfgs
+        self.defaults = {} if defaults is None else defaults
+        self.overrides = {} if overrides is None else overrides
+
+    def __len__(self):
+        """Get the number of runs"""
+        return len(self.scenarios) * len(self.cfgs)
+
+    def __getitem__(self, item):
+        """Get the full config of a run"""
+        if not isinstance(item, (int, np.integer)):
+            return [self[i] for i in range(len(self))[item]]
+
+        if item < 0:
+            item += len(self)
+
+        if not 0 <= item < len(self):
+            raise IndexError(f"run index {item} out of range")
+
+        scenario_idx, cfg_idx = divmod(int(item), len(self.cfgs))
+
+        return {
+            **self.scenarios[scenario_idx],
+            "run_id": int(item),
+            **self.defaults,
+            **self.cfgs[cfg_idx],
+            **self.overrides,
+        }
@@ -0,0 +1,145 @@
+"""
+Cached unit conversion factors and name translations
+
+Converting units with pint, or renaming variables with a Python function, for
+every row (or every variable of every scenario) repeats the same work many
+times. The functions here work out each conversion factor (or translated
+name) once per process and then apply it to all the data at once.
+"""
+import functools
+
+import numpy as np
+import openscm_units
+import pandas as pd
+
+
+@functools.cache
+def get_conversion_factor(from_unit, to_unit, context=None):
+    """
+    Get the factor which converts values from one unit to another
+
+    Results are cached, so pint is only used once per process for each
+    combination of arguments.
+
+    Parameters
+    ----------
+    from_unit : str
+        Unit to convert from
+
+    to_unit : str
+        Unit to convert to
+
+    context : str
+        Context in which to do the conversion (e.g. ``"NOx_conversions"``)
+
+    Returns
+    -------
+    float
+        Conversion factor
+
+    Raises
+    ------
+    ValueError
+        The conversion is not a simple scaling (e.g. it has an offset)
+    """
+    if from_unit == to_unit:
+        return 1.0
+
+    registry = openscm_units.unit_registry
+
+    def _convert(value):
+        return registry.Quantity(value, from_unit).to(to_unit).magnitude
+
+    if context is None:
+        factor, offset = _convert(1.0), _convert(0.0)
+    else:
+        with registry.context(context):
+            factor, offset = _convert(1.0), _convert(0.0)
+
+    if offset != 0:
+        raise ValueError(
+            f"Conversion from {from_unit} to {to_unit} is not a simple scaling"
+        )
+
+    return float(factor)
+
+
+def convert_timeseries_units(timeseries, targets):
+    """
+    Convert the units of timeseries
+
+    Parameters
+    ----------
+    timeseries : :obj:`pd.DataFrame`
+        Timeseries with ``variable`` and ``unit`` index levels
+
+    targets : dict[str, tuple[str, str]]
+        Unit and context (``None`` for no context) to which to convert each
+        variable
+
+    Returns
+    -------
+    :obj:`pd.DataFrame`
+        Timeseries in the target units
+
+    Raises
+    ------
+    KeyError
+        A variable in ``timeseries`` is not in ``targets``
+    """
+    pairs = pd.MultiIndex.from_arrays(
+        [
+            timeseries.index.get_level_values("variable"),
+            timeseries.index.get_level_values("unit"),
+        ]
+    )
+    codes, uniques = pd.factorize(pairs)
+
+    factors = np.empty(len(uniques))
+    new_units = np.empty(len(uniques), dtype=object)
+    for i, (variable, unit) in enumerate(uniques):
+        target_unit, context = targets[variable]
+        factors[i] = get_conversion_factor(unit, target_unit, context)
+        new_units[i] = target_unit
+
+    if (factors == 1).all() and (new_units == uniques.get_level_values(1)).all():
+        return timeseries
+
+    meta = timeseries.index.to_frame(index=False)
+    meta["unit"] = new_units[codes]
+
+    return pd.DataFrame(
+        timeseries.to_numpy() * factors[codes][:, np.newaxis],
+        index=pd.MultiIndex.from_frame(meta),
+        columns=timeseries.columns,
+    )
+
+
+def translate(values, translation):
+    """
+    Translate values (e.g. variable names)
+
+    The translation is only applied to each unique value once and the result
+    is then mapped back onto all the values.
+
+    Parameters
+    ----------
+    values : array_like
+        Values to translate
+
+    translation : callable or dict
+        Translation to apply. Values which are not in a :obj:`dict` are left
+        unchanged.
+
+    Returns
+    -------
+    :obj:`np.ndarray`
+        Translated values
+    """
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    if isinstance(translation, dict):
+        translated = [translation.get(v, v) for v in uniques]
+    else:
+        translated = [translation(v) for v in uniques]
+
+    return np.array(translated, dtype=object)[codes]
@@ -0,0 +1,230 @@
+"""
+Cache of packaged input data compiled into binary arrays
+
+Several adapters parse the same packaged text files (and, for FaIR, convert
+their units with pint) in every worker process. The functions here do that
+work once, save the result as ``.npy`` files in a cache directory and then
+memory-map those files in every later process, so that start-up only costs a
+hash of the source files and an ``mmap``.
+
+The cache directory is taken from the ``OPENSCM_RUNNER_CACHE_DIR`` setting,
+falling back to ``$XDG_CACHE_HOME/openscm_runner`` (``~/.cache/openscm_runner``
+if ``XDG_CACHE_HOME`` is not set). Entries are keyed by the content of the
+source files and the versions of OpenSCM-Runner and openscm-units (which
+defines the unit conversions), so they never go stale. If the
+cache directory can't be written, the data is compiled in memory instead.
+"""
+import hashlib
+import logging
+import os
+import os.path
+import shutil
+import tempfile
+
+import numpy as np
+import openscm_units
+import pandas as pd
+
+from ...settings import config
+
+LOGGER = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 1
+"""int: Version of the layout of cache entries, bump to invalidate all entries"""
+
+_INDEX_KEY = "__index__"
+_COLUMNS_KEY = "__columns__"
+_INDEX_NAME_KEY = "__index_name__"
+
+_LOADED = {}
+"""dict: Data already loaded by this process"""
+
+
+def get_cache_dir():
+    """
+    Get the directory in which compiled data is cached
+
+    Returns
+    -------
+    str
+        Cache directory (which may not exist yet)
+    """
+    cache_dir = config.get("OPENSCM_RUNNER_CACHE_DIR", None)
+    if cache_dir is None:
+        cache_dir = os.path.join(
+            os.environ.get(
+                "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+            ),
+            "openscm_runner",
+        )
+
+    return os.path.expanduser(cache_dir)
+
+
+def _get_key(name, sources):
+    from ... import __version__  # pylint: disable=import-outside-toplevel
+
+    key = hashlib.sha1(
+        f"{name}\0{_FORMAT_VERSION}\0{__version__}\0{openscm_units.__version__}".encode(),
+        usedforsecurity=False,
+    )
+    for source in sources:
+        with open(source, "rb") as file_handle:
+            key.update(file_handle.read())
+
+    return f"{name}-{key.hexdigest()}"
+
+
+def _load_entry(entry_dir):
+    # plain arrays (which still share the memory map) as some libraries
+    # (e.g. fair) reject subclasses of np.ndarray
+    return {
+        filename[: -len(".npy")]: np.asarray(
+            np.load(os.path.join(entry_dir, filename), mmap_mode="r")
+        )
+        for filename in os.listdir(entry_dir)
+        if filename.endswith(".npy")
+    }
+
+
+def _save_entry(entry_dir, arrays):
+    cache_dir = os.path.dirname(entry_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # write somewhere private then rename so that other processes never see a
+    # partially written entry
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp-")
+    try:
+        for array_name, values in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{array_name}.npy"), values)
+
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.isdir(entry_dir):
+            raise
+        # another process got there first
+
+
+def load_compiled(name, sources, compile_func):
+    """
+    Load compiled data, compiling it first if it isn't in the cache
+
+    Parameters
+    ----------
+    name : str
+        Name of the data (used to name the cache entry)
+
+    sources : list[str]
+        Files from which the data is compiled. The cache entry is only reused
+        if these files are unchanged.
+
+    compile_func : callable
+        Function which takes no arguments and returns the compiled data as a
+        dict of :obj:`np.ndarray`. The arrays must not have ``object`` dtype.
+
+    Returns
+    -------
+    dict[str, :obj:`np.ndarray`]
+        Compiled data. Arrays are read-only (memory-mapped from the cache if
+        possible). The data is only loaded once per process.
+    """
+    loaded_key = (name, tuple(sources))
+    if loaded_key not in _LOADED:
+        _LOADED[loaded_key] = _load_or_compile(name, sources, compile_func)
+
+    return _LOADED[loaded_key]
+
+
+def _load_or_compile(name, sources, compile_func):
+    entry_dir = os.path.join(get_cache_dir(), _get_key(name, sources))
+    if os.path.isdir(entry_dir):
+        LOGGER.debug("Loading %s from %s", name, entry_dir)
+        return _load_entry(entry_dir)
+
+    LOGGER.info("Compiling %s", name)
+    arrays = compile_func()
+    try:
+        _save_entry(entry_dir, arrays)
+    except OSError as exc:
+        LOGGER.warning("Could not cache %s in %s: %s", name, entry_dir, exc)
+        for values in arrays.values():
+            values.setflags(write=False)
+
+        return arrays
+
+    return _load_entry(entry_dir)
+
+
+def frame_to_arrays(frame):
+    """
+    Convert a :obj:`pd.DataFrame` into arrays which can be cached
+
+    Each column is stored separately so that its dtype is kept. ``object``
+    columns (and the index and column names) are stored as strings.
+
+    Parameters
+    ----------
+    frame : :obj:`pd.DataFrame`
+        Frame to convert. Must have a single-level index.
+
+    Returns
+    -------
+    dict[str, :obj:`np.ndarray`]
+        Arrays to pass to :func:`arrays_to_frame`
+    """
+
+    def _as_array(values):
+        values = np.asarray(values)
+        if values.dtype == object:
+            return values.astype(str)
+
+        return values
+
+    arrays = {
+        _INDEX_KEY: _as_array(frame.index),
+        _COLUMNS_KEY: np.asarray(frame.columns, dtype=str),
+        _INDEX_NAME_KEY: np.asarray(
+            [] if frame.index.name is None else [frame.index.name], dtype=str
+        ),
+    }
+    for i, column in enumerate(frame.columns):
+        arrays[f"column_{i}"] = _as_array(frame[column])
+
+    return arrays
+
+
+def arrays_to_frame(arrays):
+    """
+    Convert arrays made by :func:`frame_to_arrays` back into a :obj:`pd.DataFrame`
+
+    Parameters
+    ----------
+    arrays : dict[str, :obj:`np.ndarray`]
+        Output of :func:`frame_to_arrays`
+
+    Returns
+    -------
+    :obj:`pd.DataFrame`
+        Rebuilt frame. String columns have ``object`` dtype again.
+    """
+
+    def _from_array(values):
+        if values.dtype.kind == "U":
+            return values.astype(object)
+
+        return np.array(values)
+
+    columns = arrays[_COLUMNS_KEY].tolist()
+    index_name = arrays[_INDEX_NAME_KEY].tolist()
+
+    return pd.DataFrame(
+        {
+            column: _from_array(arrays[f"column_{i}"])
+            for i, column in enumerate(columns)
+        },
+        index=pd.Index(
+            _from_array(arrays[_INDEX_KEY]), name=index_name[0] if index_name else None
+        ),
+        columns=columns,
+    )
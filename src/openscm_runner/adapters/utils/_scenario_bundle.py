@@ -0,0 +1,183 @@
+"""
+Pre-processed view of scenarios which is shared by all adapters in a run
+"""
+import numpy as np
+import pandas as pd
+import scmdata
+
+
+def _get_year_timeseries(scenarios):
+    if isinstance(scenarios, scmdata.run.BaseScmRun):
+        return scenarios.timeseries(time_axis="year")
+
+    # e.g. pyam.IamDataFrame
+    timeseries = scenarios.timeseries()
+    if not pd.api.types.is_integer_dtype(timeseries.columns):
+        timeseries.columns = [getattr(col, "year", col) for col in timeseries.columns]
+
+    return timeseries
+
+
+class ScenarioBundle:
+    """
+    Scenarios pivoted and grouped once for use by every adapter
+
+    The timeseries are stored with an integer-year time axis and are grouped
+    by (scenario, model), sorted in the same order as
+    ``timeseries.groupby(["scenario", "model"])``. A bundle is created once
+    per :func:`openscm_runner.run.run` call, so the cost of pivoting and
+    grouping the input is paid once rather than once per climate model.
+
+    The bundle and the data it holds must be treated as read-only.
+    """
+
+    def __init__(self, groups):
+        """
+        Initialise
+
+        Use :meth:`from_scenarios` rather than calling this directly.
+
+        Parameters
+        ----------
+        groups : tuple[tuple[tuple[str, str], :obj:`pd.DataFrame`]]
+            Timeseries of each (scenario, model) pair, sorted by scenario then
+            model
+        """
+        self._groups = tuple(groups)
+        self._timeseries = None
+        self._scmrun = None
+
+    @classmethod
+    def from_scenarios(cls, scenarios):
+        """
+        Create a bundle from scenarios
+
+        Parameters
+        ----------
+        scenarios : :obj:`pyam.IamDataFrame`, :obj:`scmdata.ScmRun` or :obj:`ScenarioBundle`
+            Scenarios. If a :obj:`ScenarioBundle` is supplied, it is returned
+            as is.
+
+        Returns
+        -------
+        :obj:`ScenarioBundle`
+            Bundle of the scenarios
+
+        Raises
+        ------
+        ValueError
+            The scenarios have more than one value in a given year
+        """  # noqa: E501
+        if isinstance(scenarios, cls):
+            return scenarios
+
+        timeseries = _get_year_timeseries(scenarios)
+        if not timeseries.columns.is_unique:
+            raise ValueError("Scenarios must have at most one value per year")
+
+        timeseries = timeseries.reindex(sorted(timeseries.columns), axis="columns")
+        out = cls(timeseries.groupby(["scenario", "model"]))
+        out._timeseries = timeseries  # pylint:disable=protected-access
+
+        return out
+
+    def __len__(self):
+        """Get the number of (scenario, model) pairs"""
+        return len(self._groups)
+
+    def __repr__(self):
+        """Human-readable representation."""
+        return f"<ScenarioBundle ({len(self)} scenarios)>"
+
+    @property
+    def groups(self):
+        """
+        tuple[tuple[tuple[str, str], :obj:`pd.DataFrame`]]: Grouped timeseries
+        """
+        return self._groups
+
+    @property
+    def timeseries(self):
+        """
+        :obj:`pd.DataFrame`: All timeseries, with integer years as columns
+        """
+        if self._timeseries is None:
+            self._timeseries = pd.concat([ts for _, ts in self._groups])
+
+        return self._timeseries
+
+    @property
+    def years(self):
+        """
+        :obj:`np.ndarray`: Years for which there is data
+        """
+        return np.asarray(self.timeseries.columns, dtype=int)
+
+    @property
+    def units(self):
+        """
+        :obj:`pd.DataFrame`: Unique (variable, unit) combinations
+        """
+        index = self.timeseries.index
+        return (
+            pd.DataFrame(
+                {
+                    "variable": index.get_level_values("variable"),
+                    "unit": index.get_level_values("unit"),
+                }
+            )
+            .drop_duplicates()
+            .sort_values("variable")
+            .reset_index(drop=True)
+        )
+
+    def to_scmrun(self):
+        """
+        Get the scenarios as an :obj:`scmdata.ScmRun`
+
+        The result is cached so must not be modified.
+
+        Returns
+        -------
+        :obj:`scmdata.ScmRun`
+            Scenarios
+        """
+        if self._scmrun is None:
+            self._scmrun = scmdata.ScmRun(self.timeseries)
+
+        return self._scmrun
+
+    def batches(self, batch_size):
+        """
+        Split the bundle into smaller bundles
+
+        Parameters
+        ----------
+        batch_size : int
+            Number of (scenario, model) pairs in each batch
+
+        Yields
+        ------
+        int, :obj:`ScenarioBundle`
+            Number of (scenario, model) pairs in previous batches and the
+            batch
+        """
+        for start in range(0, len(self), batch_size):
+            yield start, type(self)(self._groups[start : start + batch_size])
+
+    def take(self, indices):
+        """
+        Select (scenario, model) pairs by position
+
+        Parameters
+        ----------
+        indices : list[int]
+            Positions of the (scenario, model) pairs to select, in increasing
+            order
+
+        Returns
+        -------
+        :obj:`ScenarioBundle`
+            Bundle of the selected pairs
+        """
+        return type(self)([self._groups[i] for i in indices])
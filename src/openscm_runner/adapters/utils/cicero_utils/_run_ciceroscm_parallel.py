@@ -9,6 +9,7 @@ import scmdata
 
 from ....settings import config
 from ...utils._parallel_process import _parallel_process
+from ...utils._scenario_bundle import ScenarioBundle
 
 LOGGER = logging.getLogger(__name__)
 
@@ -26,7 +27,7 @@ def run_ciceroscm_parallel(scenarios, cfgs, output_vars, _execute_run):
 
     Parameters
     ----------
-    scenarios : IamDataFrame
+    scenarios : IamDataFrame, :obj:`ScmRun` or :obj:`ScenarioBundle`
         Scenariodata with which to run
 
     cfgs : list[dict]
@@ -44,9 +45,7 @@ def run_ciceroscm_parallel(scenarios, cfgs, output_vars, _execute_run):
     LOGGER.info("Entered _parallel_ciceroscm")
     runs = [
         {"cfgs": cfgs, "output_variables": output_vars, "scenariodata": smdf}
-        for (scen, model), smdf in scenarios.timeseries(time_axis="year").groupby(
-            ["scenario", "model"]
-        )
+        for _, smdf in ScenarioBundle.from_scenarios(scenarios).groups
     ]
 
     max_workers = int(config.get("CICEROSCM_WORKER_NUMBER", os.cpu_count()))
@@ -10,9 +10,9 @@ import logging
 import os
 
 import numpy as np
-import openscm_units
 import pandas as pd
 
+from .._conversion_tables import get_conversion_factor
 from ._utils import _get_unique_index_values
 
 LOGGER = logging.getLogger(__name__)
@@ -25,23 +25,12 @@ def _unit_conv_factor(unit, cicero_unit):
     Conversion for cicero units that can't be automatically dealt with
     in openscm_units
     """
-    with openscm_units.unit_registry.context("NOx_conversions"):
-        if cicero_unit.startswith("GgH1"):
-            conv_factor = (
-                openscm_units.unit_registry(unit)
-                .to(cicero_unit.replace("GgH1", "GgHalon1"))
-                .magnitude
-            )
-        elif cicero_unit.startswith("GgH2"):
-            conv_factor = (
-                openscm_units.unit_registry(unit)
-                .to(cicero_unit.replace("GgH2", "GgHalon2"))
-                .magnitude
-            )
-        else:
-            conv_factor = openscm_units.unit_registry(unit).to(cicero_unit).magnitude
+    if cicero_unit.startswith("GgH1"):
+        cicero_unit = cicero_unit.replace("GgH1", "GgHalon1")
+    elif cicero_unit.startswith("GgH2"):
+        cicero_unit = cicero_unit.replace("GgH2", "GgHalon2")
 
-    return conv_factor
+    return get_conversion_factor(unit, cicero_unit, "NOx_conversions")
 
 
 cicero_comp_dict = {
@@ -0,0 +1,237 @@
+"""
+Adaptive ensemble size
+
+Large ensembles are run because the tails of the output distribution take
+many members to pin down, but for many scenarios the quantiles which are
+reported settle long before the whole ensemble has been run. With a
+:class:`ConvergenceCriterion`, :func:`openscm_runner.run.run` runs each
+model's configs in randomised batches and, for each scenario, stops running
+new batches once the requested quantiles of a target variable change by less
+than a tolerance from one batch to the next.
+
+.. code:: python
+
+    >>> res = run(
+    ...     climate_models_cfgs,
+    ...     scenarios,
+    ...     output_variables=["Surface Air Temperature Change"],
+    ...     convergence=ConvergenceCriterion(
+    ...         "Surface Air Temperature Change",
+    ...         tolerance=0.01,
+    ...         years=[2100],
+    ...     ),
+    ... )  # doctest: +SKIP
+
+The output then holds a random subset of each model's configs for each
+scenario. Run IDs are the same as those in a full run, so the members which
+were run can be matched between scenarios.
+"""
+import logging
+
+import numpy as np
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ConvergenceCriterion:
+    """
+    When to stop running ensemble members for a scenario
+
+    After the first ``min_members`` configs, configs are run in batches of
+    ``batch_size``. After each batch, the quantiles of ``variable`` are
+    calculated for each (climate model, model, scenario). Once the largest
+    absolute change in any of the quantiles since the previous batch is no
+    more than ``tolerance``, no more configs are run for that scenario.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        variable,
+        quantiles=(0.05, 0.5, 0.95),
+        tolerance=0.01,
+        years=None,
+        region="World",
+        min_members=100,
+        batch_size=50,
+        seed=0,
+    ):  # pylint:disable=too-many-arguments
+        """
+        Initialise
+
+        Parameters
+        ----------
+        variable : str
+            Variable whose quantiles are checked. Must be one of the output
+            variables of the run.
+
+        quantiles : list of float
+            Quantiles which are checked (must be in [0, 1])
+
+        tolerance : float
+            Largest absolute change (in the units of ``variable``) in the
+            quantiles between batches for a scenario to be converged
+
+        years : list[int]
+            Years at which the quantiles are checked. If ``None``, every year
+            in the output is checked.
+
+        region : str
+            Region of ``variable`` which is checked
+
+        min_members : int
+            Number of configs to run before checking convergence
+
+        batch_size : int
+            Number of configs in each subsequent batch
+
+        seed : int
+            Seed used to shuffle the configs
+
+        Raises
+        ------
+        ValueError
+            Any of ``quantiles`` are not in [0, 1], or ``min_members`` or
+            ``batch_size`` are not positive
+        """
+        quantiles = list(quantiles)
+        if any(q < 0 or q > 1 for q in quantiles):
+            raise ValueError(f"quantiles must be in [0, 1], received {quantiles}")
+
+        if min_members < 1 or batch_size < 1:
+            raise ValueError(
+                "min_members and batch_size must be positive, received "
+                f"{min_members} and {batch_size}"
+            )
+
+        self.variable = variable
+        self.quantiles = quantiles
+        self.tolerance = tolerance
+        self.years = None if years is None else np.asarray(years, dtype=int)
+        self.region = region
+        self.min_members = min_members
+        self.batch_size = batch_size
+        self.seed = seed
+
+    def __repr__(self):
+        """Human-readable representation."""
+        return (
+            f"<ConvergenceCriterion {self.variable} quantiles={self.quantiles} "
+            f"tolerance={self.tolerance}>"
+        )
+
+    def get_config_stages(self, n_cfgs):
+        """
+        Split config indices into randomised batches
+
+        Parameters
+        ----------
+        n_cfgs : int
+            Number of configs
+
+        Returns
+        -------
+        list[:obj:`np.ndarray`]
+            Indices of the configs to run in each batch (sorted within each
+            batch)
+        """
+        shuffled = np.random.default_rng(self.seed).permutation(n_cfgs)
+        stages = [shuffled[: self.min_members]] + [
+            shuffled[start : start + self.batch_size]
+            for start in range(self.min_members, n_cfgs, self.batch_size)
+        ]
+
+        return [np.sort(stage) for stage in stages]
+
+
+class _ConvergenceTracker:
+    """
+    Convergence of one climate model for a chunk of scenarios
+
+    Holds the values of the target variable for each (scenario, model) pair
+    which hasn't converged yet.
+    """
+
+    def __init__(self, criterion, scenario_keys, climate_model):
+        """
+        Initialise
+
+        Parameters
+        ----------
+        criterion : :obj:`ConvergenceCriterion`
+            Criterion to check
+
+        scenario_keys : list[tuple[str, str]]
+            (scenario, model) of each pair in the chunk, in the order in
+            which they are run
+
+        climate_model : str
+            Climate model (used for logging)
+        """
+        self.criterion = criterion
+        self.scenario_keys = list(scenario_keys)
+        self.climate_model = climate_model
+        self.converged = set()
+        self._values = {}
+        self._previous = {}
+
+    @property
+    def active(self):
+        """
+        list[int]: Positions of the (scenario, model) pairs still being run
+        """
+        return [
+            i for i, key in enumerate(self.scenario_keys) if key not in self.converged
+        ]
+
+    def update(self, model_res):
+        """
+        Add output of a batch of configs
+
+        Parameters
+        ----------
+        model_res : :obj:`scmdata.ScmRun`
+            Output of the climate model
+        """
+        target = model_res.filter(
+            variable=self.criterion.variable,
+            region=self.criterion.region,
+            log_if_empty=False,
+        )
+        if target.empty:
+            return
+
+        timeseries = target.timeseries(time_axis="year")
+        if self.criterion.years is not None:
+            timeseries = timeseries.reindex(columns=self.criterion.years)
+
+        for key, values in timeseries.groupby(level=["scenario", "model"]):
+            self._values.setdefault(key, []).append(values.to_numpy())
+
+    def finish_stage(self):
+        """
+        Check convergence of the scenarios run in the latest batch
+        """
+        for key, values in self._values.items():
+            if key in self.converged:
+                continue
+
+            values = np.concatenate(values, axis=0)  # noqa: PLW2901
+            current = np.nanquantile(values, self.criterion.quantiles, axis=0)
+            previous = self._previous.get(key)
+            self._previous[key] = current
+
+            if previous is None:
+                continue
+
+            change = np.nanmax(np.abs(current - previous))
+            if change <= self.criterion.tolerance:
+                LOGGER.info(
+                    "%s: %s converged after %d members (change %.3g)",
+                    self.climate_model,
+                    key,
+                    values.shape[0],
+                    change,
+                )
+                self.converged.add(key)
+                # the values aren't needed any more
+                self._values[key] = []
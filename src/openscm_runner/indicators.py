@@ -0,0 +1,170 @@
+"""
+Climate indicators calculated from ensemble output
+
+All calculations are vectorised over the timeseries, so they can be applied
+to an entire ensemble at once or to chunks of an ensemble as they are
+produced (e.g. by :func:`openscm_runner.run.run_iter`).
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+def _get_years(timeseries):
+    return np.asarray(timeseries.columns, dtype=int)
+
+
+def _rebase(values, years, reference_period):
+    if reference_period is None:
+        return values
+
+    in_reference = (years >= reference_period[0]) & (years <= reference_period[1])
+    if not in_reference.any():
+        raise ValueError(
+            f"No data in reference period {reference_period}, available years "
+            f"are {years[0]}-{years[-1]}"
+        )
+
+    with warnings.catch_warnings():
+        # timeseries with no data in the reference period (e.g. failed runs)
+        # become nan without warning the user
+        warnings.simplefilter("ignore", RuntimeWarning)
+        offset = np.nanmean(values[:, in_reference], axis=1, keepdims=True)
+
+    return values - offset
+
+
+def _first_exceedance_year(values, years, threshold):
+    above = values > threshold
+    first = np.argmax(above, axis=1)
+
+    return np.where(above.any(axis=1), years[first], np.nan)
+
+
+def calculate_indicators(  # noqa: PLR0913
+    scmdf,
+    variable="Surface Air Temperature Change",
+    reference_period=(1850, 1900),
+    thresholds=(1.5, 2.0),
+    warming_year=2100,
+    unit="K",
+):  # pylint:disable=too-many-arguments
+    """
+    Calculate warming indicators for each timeseries
+
+    Parameters
+    ----------
+    scmdf : :obj:`scmdata.ScmRun`
+        Model output. Only timeseries of ``variable`` are used.
+
+    variable : str
+        Variable from which to calculate the indicators
+
+    reference_period : tuple[int, int]
+        First and last year (inclusive) of the period relative to which
+        warming is calculated. If ``None``, the data is used as is.
+
+    thresholds : tuple of float
+        Warming levels (in ``unit``) for which to calculate the first
+        exceedance year
+
+    warming_year : int
+        Year for which to report warming
+
+    unit : str
+        Unit in which to calculate the indicators
+
+    Returns
+    -------
+    :obj:`pd.DataFrame`
+        Indicators for each timeseries, indexed by the timeseries' metadata
+        (excluding ``variable`` and ``unit``). Columns are ``peak_warming``,
+        ``peak_warming_year``, ``warming_<warming_year>`` and
+        ``exceedance_year_<threshold>`` for each threshold. The exceedance
+        year is nan if the threshold is never exceeded. All the indicators
+        are nan for timeseries which are all nan.
+
+    Raises
+    ------
+    ValueError
+        ``scmdf`` contains no data for ``variable`` or no data in the
+        reference period
+    """
+    scmdf_variable = scmdf.filter(variable=variable, log_if_empty=False)
+    if scmdf_variable.empty:
+        raise ValueError(f"No data for {variable}")
+
+    if any(u != unit for u in scmdf_variable.get_unique_meta("unit")):
+        scmdf_variable = scmdf_variable.convert_unit(unit)
+
+    timeseries = scmdf_variable.timeseries(time_axis="year")
+    timeseries.index = timeseries.index.droplevel(["variable", "unit"])
+    years = _get_years(timeseries)
+    values = _rebase(timeseries.values, years, reference_period)
+
+    # np.nanargmax raises for timeseries which are all nan (e.g. failed runs)
+    all_nan = np.isnan(values).all(axis=1)
+    peak_idx = np.nanargmax(np.where(all_nan[:, np.newaxis], -np.inf, values), axis=1)
+    indicators = {
+        "peak_warming": np.where(
+            all_nan, np.nan, values[np.arange(values.shape[0]), peak_idx]
+        ),
+        "peak_warming_year": np.where(all_nan, np.nan, years[peak_idx]),
+    }
+
+    warming_year_idx = np.nonzero(years == warming_year)[0]
+    if warming_year_idx.size:
+        indicators[f"warming_{warming_year}"] = values[:, warming_year_idx[0]]
+    else:
+        indicators[f"warming_{warming_year}"] = np.full(values.shape[0], np.nan)
+
+    for threshold in thresholds:
+        indicators[f"exceedance_year_{threshold}"] = _first_exceedance_year(
+            values, years, threshold
+        )
+
+    return pd.DataFrame(indicators, index=timeseries.index)
+
+
+def calculate_exceedance_probabilities(
+    indicators,
+    thresholds=(1.5, 2.0),
+    groups=("climate_model", "model", "scenario"),
+):
+    """
+    Calculate the probability of exceeding warming levels
+
+    The probability is the fraction of ensemble members whose peak warming
+    is above each threshold.
+
+    Parameters
+    ----------
+    indicators : :obj:`pd.DataFrame`
+        Output of :func:`calculate_indicators` (for streamed output, the
+        concatenation of the output for each chunk)
+
+    thresholds : tuple of float
+        Warming levels for which to calculate the exceedance probability
+
+    groups : tuple of str
+        Metadata by which to group the ensemble members (typically all
+        metadata except the column which identifies each member)
+
+    Returns
+    -------
+    :obj:`pd.DataFrame`
+        Exceedance probability for each group (rows) and threshold (columns)
+    """
+    exceeded = pd.DataFrame(
+        {
+            threshold: indicators["peak_warming"].to_numpy() > threshold
+            for threshold in thresholds
+        },
+        index=indicators.index,
+    )
+
+    out = exceeded.groupby(list(groups)).mean()
+    out.columns.name = "threshold"
+
+    return out
@@ -0,0 +1,258 @@
+"""
+Estimation of the cost of a run before it is started
+
+:func:`estimate_run` counts the runs each climate model would do, times a
+small calibration sample of runs and projects the wall time, memory, scratch
+disk space and output size of the full run. The projections are rough (the
+calibration sample includes start-up costs which are only paid once in the
+full run, so times tend to be over-estimated), but are good enough to decide
+whether a job fits on a machine and how many workers to give it.
+
+.. code:: python
+
+    >>> estimate = run(
+    ...     climate_models_cfgs,
+    ...     scenarios,
+    ...     dry_run=True,
+    ... )  # doctest: +SKIP
+    >>> estimate[["n_runs", "wall_time", "peak_memory"]]  # doctest: +SKIP
+"""
+import logging
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from ._deduplicate import get_config_codes, get_scenario_codes
+from .adapters import get_adapter
+from .adapters.utils._config_table import as_config_sequence, take_configs
+from .adapters.utils._scenario_bundle import ScenarioBundle
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    # not available on Windows
+    resource = None
+
+LOGGER = logging.getLogger(__name__)
+
+ESTIMATE_COLUMNS = (
+    "n_scenarios",
+    "n_configs",
+    "n_runs",
+    "n_unique_runs",
+    "n_workers",
+    "seconds_per_run",
+    "wall_time",
+    "peak_memory",
+    "scratch_disk",
+    "result_size",
+)
+"""tuple[str]: Columns of the output of :func:`estimate_run`"""
+
+
+def _get_peak_rss():
+    """
+    Get the peak resident memory of this process and its finished children
+
+    Returns
+    -------
+    tuple[float, float]
+        Peak resident memory (bytes) of this process and of the largest
+        finished child process. ``nan`` if it can't be determined.
+    """
+    if resource is None:  # pragma: no cover
+        return np.nan, np.nan
+
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    scale = 1 if sys.platform == "darwin" else 1024
+
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+    )
+
+
+def _calibrate(runner, bundle, cfgs, output_variables, output_config):
+    """
+    Time a small sample of runs
+
+    Returns
+    -------
+    dict
+        Time per run (seconds, including parallelism within the sample),
+        size of the output per run (bytes) and peak memory of a worker
+        (bytes)
+    """
+    self_before, children_before = _get_peak_rss()
+    start = time.perf_counter()
+    res = runner.run(
+        bundle,
+        cfgs,
+        output_variables=output_variables,
+        output_config=output_config,
+    )
+    elapsed = time.perf_counter() - start
+    self_after, children_after = _get_peak_rss()
+
+    n_runs = len(bundle) * len(cfgs)
+    if children_after > children_before:
+        worker_memory = children_after
+    else:
+        # the runs happened in this process (or in workers which were
+        # already running, in which case this is a lower bound)
+        worker_memory = self_after - self_before
+
+    return {
+        "seconds_per_run": elapsed / n_runs,
+        "result_size_per_run": res.timeseries().memory_usage(deep=True).sum() / n_runs,
+        "worker_memory": worker_memory,
+    }
+
+
+def estimate_run(  # noqa: PLR0913
+    climate_models_cfgs,
+    scenarios,
+    output_variables=("Surface Temperature",),
+    out_config=None,
+    deduplicate=True,
+    calibration_configs=4,
+    keep_results_in_memory=True,
+):  # pylint:disable=too-many-arguments,too-many-locals
+    """
+    Estimate the cost of running climate models over scenarios
+
+    For each climate model, one scenario is run with ``calibration_configs``
+    configs to measure the time per run, the size of the output and the
+    memory used by each worker. These are then scaled up to the full number
+    of runs and the model's number of workers (see
+    :meth:`openscm_runner.adapters.base._Adapter.get_worker_number`).
+
+    Parameters
+    ----------
+    climate_models_cfgs : dict[str: list]
+        Configs for each model, as passed to :func:`openscm_runner.run.run`
+
+    scenarios : :obj:`pyam.IamDataFrame` or :obj:`scmdata.ScmRun`
+        Scenarios to run (iterables of chunks of scenarios are not supported
+        as they can't be counted without reading them)
+
+    output_variables : list[str]
+        Variables to include in the output
+
+    out_config : dict[str: tuple of str]
+        Configuration values to include in the output's metadata, as passed
+        to :func:`openscm_runner.run.run`
+
+    deduplicate : bool
+        Whether duplicate scenarios and configs will be run only once
+
+    calibration_configs : int
+        Number of configs to run in the calibration sample of each model. If
+        zero, no calibration runs are done and the time, memory and output
+        size columns are ``nan``.
+
+    keep_results_in_memory : bool
+        Whether the full output will be kept in memory (i.e. neither
+        ``quantiles`` nor ``out_store`` will be passed to
+        :func:`openscm_runner.run.run`)
+
+    Returns
+    -------
+    :obj:`pd.DataFrame`
+        Estimate for each climate model (one row per model and a ``Total``
+        row) with columns:
+
+        - ``n_scenarios``, ``n_configs``: number of (model, scenario) pairs
+          and configs
+        - ``n_runs``: number of runs requested
+        - ``n_unique_runs``: number of runs which will actually be done
+        - ``n_workers``: number of workers the adapter will use
+        - ``seconds_per_run``: time per run in the calibration sample
+        - ``wall_time``: projected wall time (seconds)
+        - ``peak_memory``: projected peak memory (bytes) of the workers plus
+          the output kept in memory
+        - ``scratch_disk``: scratch disk space used by the workers (bytes)
+        - ``result_size``: projected size of the output in memory (bytes)
+
+        The ``Total`` row sums each column (models are run one after the
+        other so its ``peak_memory`` is the largest of the models' plus the
+        output of the other models).
+
+    Raises
+    ------
+    ValueError
+        ``scenarios`` is an iterable of chunks
+    """
+    if not hasattr(scenarios, "timeseries"):
+        raise ValueError("Can't estimate the cost of streamed scenarios")
+
+    bundle = ScenarioBundle.from_scenarios(scenarios)
+    n_scenarios = len(bundle)
+    n_unique_scenarios = (
+        np.unique(get_scenario_codes(bundle)).size if deduplicate else n_scenarios
+    )
+
+    rows = {}
+    for climate_model, cfgs_cm in climate_models_cfgs.items():
+        cfgs = as_config_sequence(cfgs_cm)
+        runner = get_adapter(climate_model)
+        n_workers = runner.get_worker_number()
+        if deduplicate and runner.positional_run_ids:
+            n_unique_runs = n_unique_scenarios * np.unique(get_config_codes(cfgs)).size
+        else:
+            n_unique_runs = n_scenarios * len(cfgs)
+
+        row = {
+            "n_scenarios": n_scenarios,
+            "n_configs": len(cfgs),
+            "n_runs": n_scenarios * len(cfgs),
+            "n_unique_runs": n_unique_runs,
+            "n_workers": n_workers,
+            "scratch_disk": runner.scratch_disk_per_worker * n_workers,
+        }
+
+        n_calibration = min(calibration_configs, len(cfgs))
+        if n_calibration > 0 and n_scenarios > 0:
+            LOGGER.info("Calibrating %s with %d runs", climate_model, n_calibration)
+            calibration = _calibrate(
+                runner,
+                ScenarioBundle(bundle.groups[:1]),
+                take_configs(cfgs, np.arange(n_calibration)),
+                output_variables=output_variables,
+                output_config=None
+                if out_config is None
+                else out_config.get(climate_model),
+            )
+            # the calibration runs were spread over at most n_calibration
+            # workers, the full run can use all of them
+            speed_up = n_workers / min(n_workers, n_calibration)
+            row["seconds_per_run"] = calibration["seconds_per_run"]
+            row["wall_time"] = n_unique_runs * calibration["seconds_per_run"] / speed_up
+            row["result_size"] = row["n_runs"] * calibration["result_size_per_run"]
+            row["peak_memory"] = n_workers * calibration["worker_memory"] + (
+                row["result_size"] if keep_results_in_memory else 0
+            )
+
+        rows[climate_model] = row
+
+    out = pd.DataFrame.from_dict(rows, orient="index").reindex(
+        columns=list(ESTIMATE_COLUMNS)
+    )
+    out.index.name = "climate_model"
+
+    total = out.sum(numeric_only=True, min_count=1)
+    total["n_scenarios"] = n_scenarios
+    total["seconds_per_run"] = np.nan
+    total["n_workers"] = out["n_workers"].max()
+    if keep_results_in_memory:
+        total["peak_memory"] = (out["peak_memory"] - out["result_size"]).max() + out[
+            "result_size"
+        ].sum()
+    else:
+        total["peak_memory"] = out["peak_memory"].max()
+
+    out.loc["Total"] = total
+
+    return out
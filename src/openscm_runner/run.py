@@ -1,12 +1,26 @@
 """
 High-level run function
 """
+import functools
 import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import scmdata
 
+from ._deduplicate import DeduplicationPlan, get_config_codes, get_scenario_codes
 from .adapters import get_adapter
+from .adapters.utils._config_table import as_config_sequence, take_configs
+from .adapters.utils._scenario_bundle import ScenarioBundle
+from .adaptive import _ConvergenceTracker
+from .planning import estimate_run
 from .progress import progress
+from .settings import config
+from .store import ResultStore
+from .streaming import QuantileAccumulator
 
 LOGGER = logging.getLogger(__name__)
 
@@ -29,12 +43,656 @@ def _check_out_config(out_config, climate_models_cfgs):
                 )
 
 
-def run(
+def _get_output_config(out_config, climate_model):
+    if out_config is not None and climate_model in out_config:
+        output_config_cm = out_config[climate_model]
+        LOGGER.debug("Using output config: %s for %s", output_config_cm, climate_model)
+    else:
+        LOGGER.debug("No output config for %s", climate_model)
+        output_config_cm = None
+
+    return output_config_cm
+
+
+def _iter_scenario_batches(scenarios, scenario_batch_size):
+    """
+    Split scenarios into batches of (model, scenario) pairs
+
+    Batches are created in the same order as the adapters group scenarios
+    (i.e. sorted by scenario then model) so that the run IDs of batched runs
+    of adapters with
+    :attr:`~openscm_runner.adapters.base._Adapter.positional_run_ids` can be
+    converted into the run IDs of unbatched runs.
+
+    Parameters
+    ----------
+    scenarios : :obj:`ScenarioBundle`
+        Scenarios to split
+
+    scenario_batch_size : int
+        Number of (model, scenario) pairs in each batch. If ``None``, the
+        scenarios are not split.
+
+    Yields
+    ------
+    int, :obj:`ScenarioBundle`
+        Number of (model, scenario) pairs in previous batches and the batch
+    """
+    if scenario_batch_size is None:
+        yield 0, scenarios
+        return
+
+    yield from scenarios.batches(scenario_batch_size)
+
+
+def _is_scenario_stream(scenarios):
+    """
+    Check whether scenarios are an iterable of chunks
+
+    The alternative is a single collection of timeseries
+    (:obj:`pyam.IamDataFrame`, :obj:`scmdata.ScmRun` or
+    :obj:`ScenarioBundle`).
+    """
+    return not hasattr(scenarios, "timeseries")
+
+
+def _get_config_stages(n_cfgs, preview_members):
+    """
+    Split config indices into stages
+
+    The first stage is a stratified subset of ``preview_members`` configs,
+    spread evenly through the list of configs. The remaining configs follow in
+    stages of the same size.
+
+    Returns
+    -------
+    list[:obj:`np.ndarray`]
+        Indices of the configs to run in each stage
+    """
+    all_idx = np.arange(n_cfgs)
+    if preview_members is None or preview_members >= n_cfgs:
+        return [all_idx]
+
+    if preview_members < 1:
+        raise ValueError(
+            f"preview_members must be positive, received {preview_members}"
+        )
+
+    preview = np.unique(np.linspace(0, n_cfgs - 1, preview_members).round().astype(int))
+    rest = np.setdiff1d(all_idx, preview)
+
+    return [preview] + [
+        rest[start : start + preview.size]
+        for start in range(0, rest.size, preview.size)
+    ]
+
+
+def _set_global_run_ids(model_res, n_cfgs, cfg_idx, n_previous, scenario_idx=None):
+    """
+    Convert the run IDs of a subset of runs into the run IDs of a full run
+
+    Only valid for adapters with
+    :attr:`~openscm_runner.adapters.base._Adapter.positional_run_ids`.
+
+    Parameters
+    ----------
+    model_res : :obj:`scmdata.ScmRun`
+        Output of the adapter
+
+    n_cfgs : int
+        Number of configs in the full run
+
+    cfg_idx : :obj:`np.ndarray`
+        Positions (in the full run) of the configs which were run
+
+    n_previous : int
+        Number of (model, scenario) pairs before the ones which were run
+
+    scenario_idx : :obj:`np.ndarray`
+        Positions (in the full run) of the (model, scenario) pairs which were
+        run. If supplied, ``n_previous`` is ignored.
+
+    Returns
+    -------
+    :obj:`scmdata.ScmRun`
+        ``model_res`` with converted run IDs
+    """
+    n_run = cfg_idx.size
+    if scenario_idx is None and n_previous == 0 and n_run == n_cfgs:
+        return model_res
+
+    local_run_id = model_res["run_id"].to_numpy().astype(int)
+    local_scenario = local_run_id // n_run
+    if scenario_idx is None:
+        global_scenario = n_previous + local_scenario
+    else:
+        global_scenario = scenario_idx[local_scenario]
+
+    model_res["run_id"] = global_scenario * n_cfgs + cfg_idx[local_run_id % n_run]
+
+    return model_res
+
+
+def _get_scenario_batch_size(runner, scenario_batch_size):
+    """
+    Get the number of (model, scenario) pairs to pass to an adapter at once
+
+    Parameters
+    ----------
+    runner : :obj:`openscm_runner.adapters.base._Adapter`
+        Adapter
+
+    scenario_batch_size : int
+        Batch size requested by the user (``None`` to choose based on the
+        adapter's capabilities)
+
+    Returns
+    -------
+    int
+        Batch size (``None`` to pass all the scenarios at once)
+    """
+    if scenario_batch_size is not None:
+        return scenario_batch_size
+
+    if runner.preferred_scenario_batch_size is not None:
+        return runner.preferred_scenario_batch_size
+
+    if runner.vectorised or runner.worker_state:
+        return None
+
+    return 1
+
+
+def _check_scratch_disk(runner):
+    """
+    Warn if there isn't enough disk space for an adapter's scratch files
+    """
+    if not runner.scratch_disk_per_worker:
+        return
+
+    scratch_dir = None
+    if runner.scratch_dir_setting is not None:
+        scratch_dir = config.get(runner.scratch_dir_setting, None)
+
+    if scratch_dir is None:
+        scratch_dir = tempfile.gettempdir()
+
+    try:
+        free = shutil.disk_usage(os.path.expanduser(scratch_dir)).free
+    except OSError:
+        return
+
+    required = runner.scratch_disk_per_worker * runner.get_worker_number()
+    if free < required:
+        LOGGER.warning(
+            "%s needs about %.1f GB of scratch space in %s but only %.1f GB "
+            "is free, consider reducing the number of workers",
+            runner.model_name,
+            required / 1e9,
+            scratch_dir,
+            free / 1e9,
+        )
+
+
+def _run_deduplicated(runner, plan, output_variables, output_config):
+    """
+    Run only the unique combinations of scenarios and configs in ``plan``
+    """
+    if plan.is_trivial:
+        return runner.run(
+            plan.scenarios,
+            plan.cfgs,
+            output_variables=output_variables,
+            output_config=output_config,
+        )
+
+    LOGGER.info(
+        "Running %d unique scenarios and %d unique configs (of %d and %d)",
+        len(plan.scenarios),
+        len(plan.cfgs),
+        len(plan.labels),
+        plan.n_cfgs,
+    )
+    model_res = plan.fan_out(
+        runner.run(
+            plan.scenarios,
+            plan.cfgs,
+            output_variables=output_variables,
+            output_config=output_config,
+        )
+    )
+    if model_res is not None:
+        return model_res
+
+    LOGGER.warning(
+        "%s does not number its runs by scenario and then by config so its "
+        "output can't be copied to duplicate scenarios and configs, re-running "
+        "without deduplication",
+        runner.model_name,
+    )
+    return runner.run(
+        plan.bundle,
+        plan.all_cfgs,
+        output_variables=output_variables,
+        output_config=output_config,
+    )
+
+
+def _run_scenario_batch(  # noqa: PLR0913
+    n_previous,
+    scenarios_batch,
+    runner,
+    cfgs,
+    scenario_codes,
+    cfg_codes,
+    output_variables,
+    output_config,
+):  # pylint:disable=too-many-arguments
+    """
+    Run a batch of scenarios, deduplicating if codes are supplied
+
+    ``scenario_codes`` are the codes of the whole chunk of scenarios from
+    which the batch comes (``None`` to not deduplicate).
+
+    Returns
+    -------
+    :obj:`scmdata.ScmRun`
+        Output of the adapter
+    """
+    if scenario_codes is None:
+        return runner.run(
+            scenarios_batch,
+            cfgs,
+            output_variables=output_variables,
+            output_config=output_config,
+        )
+
+    return _run_deduplicated(
+        runner,
+        DeduplicationPlan(
+            scenarios_batch,
+            scenario_codes[n_previous : n_previous + len(scenarios_batch)],
+            cfgs,
+            cfg_codes,
+        ),
+        output_variables=output_variables,
+        output_config=output_config,
+    )
+
+
+def _run_batches(runner, batches, run_batch):
+    """
+    Run batches of scenarios, concurrently if the adapter is thread-safe
+
+    Parameters
+    ----------
+    runner : :obj:`openscm_runner.adapters.base._Adapter`
+        Adapter
+
+    batches : list[tuple[int, :obj:`ScenarioBundle`]]
+        Batches to run (output of :func:`_iter_scenario_batches`)
+
+    run_batch : callable
+        Function which runs a batch and returns its output
+
+    Yields
+    ------
+    int, :obj:`scmdata.ScmRun`
+        Number of (model, scenario) pairs in previous batches and output, in
+        the same order as ``batches``
+    """
+    if not runner.thread_safe or len(batches) < 2:  # noqa: PLR2004
+        for n_previous, scenarios_batch in batches:
+            yield n_previous, run_batch(n_previous, scenarios_batch)
+
+        return
+
+    max_workers = min(runner.get_worker_number(), len(batches))
+    LOGGER.info(
+        "Running %d batches with %s in %d threads",
+        len(batches),
+        runner.model_name,
+        max_workers,
+    )
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda batch: run_batch(*batch), batches)
+        for (n_previous, _), model_res in zip(batches, results):
+            yield n_previous, model_res
+
+
+def _check_convergence(convergence, output_variables, preview_members):
+    if convergence is None:
+        return
+
+    if preview_members is not None:
+        raise ValueError("`preview_members` cannot be used with `convergence`")
+
+    if convergence.variable not in output_variables:
+        raise ValueError(
+            f"The convergence variable ({convergence.variable}) must be one of "
+            f"the output variables ({output_variables})"
+        )
+
+
+def _get_convergence_stages(convergence, runner, n_cfgs):
+    """
+    Split config indices into the stages used to check convergence
+
+    The configs of adapters without
+    :attr:`~openscm_runner.adapters.base._Adapter.positional_run_ids` are all
+    run in a single stage, as the run IDs of a subset of their configs can't
+    be converted into the run IDs of the full ensemble.
+
+    Returns
+    -------
+    list[:obj:`np.ndarray`]
+        Indices of the configs to run in each stage
+    """
+    if not runner.positional_run_ids:
+        LOGGER.warning(
+            "%s does not number its runs by scenario and then by config so "
+            "`convergence` is ignored and all its configs are run",
+            runner.model_name,
+        )
+        return [np.arange(n_cfgs)]
+
+    return convergence.get_config_stages(n_cfgs)
+
+
+def _run_stages(  # noqa: PLR0913, PLR0912, PLR0915
+    climate_models_cfgs,
+    scenarios,
+    output_variables,
+    out_config,
+    scenario_batch_size,
+    preview_members,
+    deduplicate,
+    convergence=None,
+):  # pylint:disable=too-many-arguments,too-many-locals,too-many-branches,too-many-statements
+    """
+    Run the climate models in stages of configs
+
+    If ``convergence`` is supplied, the stages are randomised batches of
+    configs and each stage only runs the (model, scenario) pairs which
+    haven't converged yet.
+
+    Yields
+    ------
+    int, :obj:`scmdata.ScmRun`
+        Stage and output of a single climate model for a single stage and
+        batch of scenarios. All output for a stage is yielded before any
+        output of the next stage.
+    """
+    _check_out_config(out_config, climate_models_cfgs)
+    _check_convergence(convergence, output_variables, preview_members)
+    climate_models_cfgs = {
+        climate_model: as_config_sequence(cfgs)
+        for climate_model, cfgs in climate_models_cfgs.items()
+    }
+
+    runners = {
+        climate_model: get_adapter(climate_model)
+        for climate_model in climate_models_cfgs
+    }
+    for runner in runners.values():
+        _check_scratch_disk(runner)
+
+    if _is_scenario_stream(scenarios):
+        if preview_members is not None:
+            raise ValueError("`preview_members` cannot be used with streamed scenarios")
+
+        scenario_chunks = (ScenarioBundle.from_scenarios(chunk) for chunk in scenarios)
+    else:
+        # pivot and group the scenarios once, rather than once per adapter call
+        scenario_chunks = [ScenarioBundle.from_scenarios(scenarios)]
+
+    if convergence is None:
+        stages = {
+            climate_model: _get_config_stages(len(cfgs), preview_members)
+            for climate_model, cfgs in climate_models_cfgs.items()
+        }
+    else:
+        stages = {
+            climate_model: _get_convergence_stages(
+                convergence, runners[climate_model], len(cfgs)
+            )
+            for climate_model, cfgs in climate_models_cfgs.items()
+        }
+
+    n_stages = max(len(v) for v in stages.values())
+
+    # the output of a deduplicated run can only be copied to the runs which
+    # requested it if the adapter numbers its runs by scenario and then by
+    # config
+    cfg_codes = {}
+    for climate_model, cfgs in climate_models_cfgs.items():
+        cfg_codes[climate_model] = None
+        if not deduplicate:
+            continue
+
+        if runners[climate_model].positional_run_ids:
+            cfg_codes[climate_model] = get_config_codes(cfgs)
+        else:
+            LOGGER.info(
+                "Not deduplicating %s as it does not number its runs by "
+                "scenario and then by config",
+                climate_model,
+            )
+
+    deduplicate = any(codes is not None for codes in cfg_codes.values())
+
+    n_previous_chunks = 0
+    for scenarios_chunk in scenario_chunks:
+        scenario_codes = get_scenario_codes(scenarios_chunk) if deduplicate else None
+        if convergence is not None:
+            trackers = {
+                climate_model: _ConvergenceTracker(
+                    convergence,
+                    [key for key, _ in scenarios_chunk.groups],
+                    climate_model,
+                )
+                for climate_model in climate_models_cfgs
+            }
+
+        for stage in range(n_stages):
+            for climate_model, cfgs in progress(
+                climate_models_cfgs.items(), desc="Climate models"
+            ):
+                if stage >= len(stages[climate_model]):
+                    continue
+
+                cfg_idx = stages[climate_model][stage]
+                if cfg_idx.size == len(cfgs):
+                    cfgs_stage = cfgs
+                else:
+                    cfgs_stage = take_configs(cfgs, cfg_idx)
+
+                scenarios_stage = scenarios_chunk
+                scenario_codes_stage = None
+                if cfg_codes[climate_model] is not None:
+                    scenario_codes_stage = scenario_codes
+
+                scenario_idx = None
+                if convergence is not None:
+                    active = trackers[climate_model].active
+                    if not active:
+                        continue
+
+                    if len(active) < len(scenarios_chunk):
+                        scenario_idx = np.asarray(active)
+                        scenarios_stage = scenarios_chunk.take(scenario_idx)
+                        if scenario_codes_stage is not None:
+                            scenario_codes_stage = scenario_codes[scenario_idx]
+
+                runner = runners[climate_model]
+                output_config_cm = _get_output_config(out_config, climate_model)
+
+                run_batch = functools.partial(
+                    _run_scenario_batch,
+                    runner=runner,
+                    cfgs=cfgs_stage,
+                    scenario_codes=scenario_codes_stage,
+                    cfg_codes=None
+                    if cfg_codes[climate_model] is None
+                    else cfg_codes[climate_model][cfg_idx],
+                    output_variables=output_variables,
+                    output_config=output_config_cm,
+                )
+                batches = list(
+                    _iter_scenario_batches(
+                        scenarios_stage,
+                        _get_scenario_batch_size(runner, scenario_batch_size),
+                    )
+                )
+                for n_previous, model_res in _run_batches(runner, batches, run_batch):
+                    if runner.positional_run_ids:
+                        model_res = _set_global_run_ids(  # noqa: PLW2901
+                            model_res,
+                            len(cfgs),
+                            cfg_idx,
+                            n_previous_chunks + n_previous,
+                            scenario_idx=None
+                            if scenario_idx is None
+                            else n_previous_chunks + scenario_idx[n_previous:],
+                        )
+
+                    if convergence is not None:
+                        trackers[climate_model].update(model_res)
+
+                    yield stage, model_res
+
+                if convergence is not None:
+                    trackers[climate_model].finish_stage()
+
+        n_previous_chunks += len(scenarios_chunk)
+
+
+def run_iter(  # noqa: PLR0913
+    climate_models_cfgs,
+    scenarios,
+    output_variables=("Surface Temperature",),
+    out_config=None,
+    scenario_batch_size=None,
+    preview_members=None,
+    deduplicate=True,
+    convergence=None,
+):  # pylint:disable=too-many-arguments
+    """
+    Run climate models over scenarios, yielding results as they are produced
+
+    Parameters
+    ----------
+    climate_models_cfgs : dict[str: list]
+        Dictionary where each key is a model and each value is the configs
+        with which to run the model. The configs are passed to the model
+        adapter. Configs can be a list of dicts, a :obj:`pd.DataFrame` with
+        one row per config and one column per parameter or a generator of
+        dicts.
+
+    scenarios : :obj:`pyam.IamDataFrame`, :obj:`scmdata.ScmRun` or iterable
+        Scenarios to run. An iterable of :obj:`pyam.IamDataFrame` or
+        :obj:`scmdata.ScmRun` (e.g. from
+        :func:`openscm_runner.scenario_io.iter_scenarios_csv`) is consumed
+        one chunk at a time, with all models run for a chunk before the next
+        chunk is read. Each (model, scenario) pair must be in only one chunk.
+
+    output_variables : list[str]
+        Variables to include in the output
+
+    out_config : dict[str: tuple of str]
+        Dictionary where each key is a model and each value is a tuple of
+        configuration values to include in the output's metadata.
+
+    scenario_batch_size : int
+        Number of (model, scenario) pairs to pass to the adapters at once. If
+        ``None``, the batch size is chosen from each adapter's capabilities
+        (see :class:`openscm_runner.adapters.base._Adapter`). The built-in
+        adapters are passed all the scenarios in a single call.
+
+    preview_members : int
+        If supplied, a stratified subset of this many configs (spread evenly
+        through each model's configs) is run for every scenario first. The
+        remaining configs are then run in stages of the same size. This
+        allows provisional statistics to be calculated long before the full
+        ensemble completes. Cannot be used with an iterable of scenarios.
+
+    deduplicate : bool
+        If ``True``, scenarios with identical data (ignoring their model and
+        scenario names) and identical configs are only run once and the
+        output is copied to every (model, scenario) and run ID which
+        requested it. Duplicates are only detected within the same chunk of
+        an iterable of scenarios. Adapters without
+        :attr:`~openscm_runner.adapters.base._Adapter.positional_run_ids` are
+        not deduplicated, as their output can't be copied to the runs which
+        requested it.
+
+    convergence : :obj:`openscm_runner.adaptive.ConvergenceCriterion`
+        If supplied, each model's configs are run in randomised batches and
+        no more batches are run for a (model, scenario) pair once the
+        quantiles of the criterion's variable have converged. The output then
+        holds a subset of the configs for each scenario. Cannot be used with
+        ``preview_members``. Ignored (with a warning) for adapters without
+        :attr:`~openscm_runner.adapters.base._Adapter.positional_run_ids`,
+        whose configs are all run.
+
+    Yields
+    ------
+    :obj:`scmdata.ScmRun`
+        Output of a single climate model for a single batch of scenarios (and
+        stage of configs)
+
+    Raises
+    ------
+    KeyError
+        ``out_config`` has keys which are not in ``climate_models_cfgs``
+
+    TypeError
+        A value in ``out_config`` is not a :obj:`tuple`
+
+    ValueError
+        ``preview_members`` is supplied with an iterable of scenarios or with
+        ``convergence``, or the variable of ``convergence`` is not in
+        ``output_variables``
+
+    Notes
+    -----
+    When batching scenarios or configs, the run IDs of adapters which number
+    their runs by scenario and then by config (see
+    :attr:`~openscm_runner.adapters.base._Adapter.positional_run_ids`, which
+    is set by FaIR, MAGICC7 and the emulator) are converted so that they match
+    the run IDs which would be produced by a single, unbatched run. For an
+    iterable of scenarios, these run IDs are numbered in the order in which
+    the chunks are received (and sorted by scenario then model within each
+    chunk). Other adapters' run IDs are kept as the adapter reports them
+    (e.g. CICERO-SCM uses the ``Index`` of each config).
+    """
+    for _, model_res in _run_stages(
+        climate_models_cfgs,
+        scenarios,
+        output_variables=output_variables,
+        out_config=out_config,
+        scenario_batch_size=scenario_batch_size,
+        preview_members=preview_members,
+        deduplicate=deduplicate,
+        convergence=convergence,
+    ):
+        yield model_res
+
+
+def run(  # noqa: PLR0912, PLR0913
     climate_models_cfgs,
     scenarios,
     output_variables=("Surface Temperature",),
     out_config=None,
-):  # pylint: disable=W9006
+    quantiles=None,
+    scenario_batch_size=None,
+    out_store=None,
+    preview_members=None,
+    preview_callback=None,
+    deduplicate=True,
+    convergence=None,
+    dry_run=False,
+):  # pylint: disable=W9006,too-many-arguments,too-many-locals,too-many-branches
     """
     Run a number of climate models over a number of scenarios
 
@@ -43,10 +701,13 @@ def run(
     climate_models_cfgs : dict[str: list]
         Dictionary where each key is a model and each value is the configs
         with which to run the model. The configs are passed to the model
-        adapter.
+        adapter. Configs can be a list of dicts, a :obj:`pd.DataFrame` with
+        one row per config and one column per parameter or a generator of
+        dicts.
 
-    scenarios : :obj:`pyam.IamDataFrame`
-        Scenarios to run
+    scenarios : :obj:`pyam.IamDataFrame`, :obj:`scmdata.ScmRun` or iterable
+        Scenarios to run. Large scenario files can be streamed by passing an
+        iterable of chunks, see :func:`run_iter`.
 
     output_variables : list[str]
         Variables to include in the output
@@ -55,10 +716,52 @@ def run(
         Dictionary where each key is a model and each value is a tuple of
         configuration values to include in the output's metadata.
 
+    quantiles : list of float
+        If supplied, the quantiles of the ensemble are calculated while the
+        models run (using :class:`openscm_runner.streaming.QuantileAccumulator`)
+        and returned instead of the individual ensemble members. Quantiles are
+        calculated per climate model, i.e. over ``run_id`` (and
+        ``ensemble_member``) only. Combine with ``scenario_batch_size`` to
+        avoid holding every ensemble member in memory at once.
+
+    scenario_batch_size : int
+        Number of (model, scenario) pairs to run at once, see
+        :func:`run_iter`.
+
+    out_store : str or :obj:`openscm_runner.store.ResultStore`
+        If supplied, results are written to this
+        :class:`openscm_runner.store.ResultStore` (or a store in this
+        directory) as they are produced rather than being kept in memory.
+
+    preview_members : int
+        Number of configs to run for every scenario before running the rest
+        of the ensemble, see :func:`run_iter`.
+
+    preview_callback : callable
+        Called with the provisional quantiles (an :obj:`scmdata.ScmRun`) each
+        time a stage of configs has been run for all models and scenarios.
+        The first call happens once the ``preview_members`` subset has
+        completed. Requires ``quantiles``.
+
+    deduplicate : bool
+        Run identical scenarios and configs only once, see :func:`run_iter`.
+
+    convergence : :obj:`openscm_runner.adaptive.ConvergenceCriterion`
+        Stop running configs for each scenario once the quantiles of a
+        target variable have converged, see :func:`run_iter`.
+
+    dry_run : bool
+        If ``True``, don't run the full ensemble. Instead, run a small
+        calibration sample for each model and return an estimate of the
+        cost of the run, see :func:`openscm_runner.planning.estimate_run`.
+
     Returns
     -------
-    :obj:`scmdata.ScmRun`
-        Model output
+    :obj:`scmdata.ScmRun`, :obj:`ResultStore` or :obj:`pd.DataFrame`
+        Model output. If ``quantiles`` is supplied, the quantiles of the
+        model output. Otherwise, if ``out_store`` is supplied, the store to
+        which the output was written. If ``dry_run`` is ``True``, the
+        estimated cost of the run.
 
     Raises
     ------
@@ -67,43 +770,79 @@ def run(
 
     TypeError
         A value in ``out_config`` is not a :obj:`tuple`
-    """
-    _check_out_config(out_config, climate_models_cfgs)
 
-    res = []
-    for climate_model, cfgs in progress(
-        climate_models_cfgs.items(), desc="Climate models"
-    ):
-        runner = get_adapter(climate_model)
+    ValueError
+        ``preview_callback`` is supplied without ``quantiles``,
+        ``preview_members`` is supplied with an iterable of scenarios or with
+        ``convergence``, or the variable of ``convergence`` is not in
+        ``output_variables``
+    """
+    if preview_callback is not None and quantiles is None:
+        raise ValueError("`preview_callback` requires `quantiles`")
 
-        if out_config is not None and climate_model in out_config:
-            output_config_cm = out_config[climate_model]
-            LOGGER.debug(
-                "Using output config: %s for %s", output_config_cm, climate_model
-            )
-        else:
-            LOGGER.debug("No output config for %s", climate_model)
-            output_config_cm = None
+    if dry_run:
+        _check_out_config(out_config, climate_models_cfgs)
 
-        model_res = runner.run(
+        return estimate_run(
+            climate_models_cfgs,
             scenarios,
-            cfgs,
             output_variables=output_variables,
-            output_config=output_config_cm,
+            out_config=out_config,
+            deduplicate=deduplicate,
+            keep_results_in_memory=quantiles is None and out_store is None,
         )
-        res.append(model_res)
 
-    for i, model_res in enumerate(res):
-        if i < 1:
-            key_meta = set(model_res.meta.columns.tolist())
+    res_iter = _run_stages(
+        climate_models_cfgs,
+        scenarios,
+        output_variables=output_variables,
+        out_config=out_config,
+        scenario_batch_size=scenario_batch_size,
+        preview_members=preview_members,
+        deduplicate=deduplicate,
+        convergence=convergence,
+    )
+
+    accumulator = QuantileAccumulator(quantiles) if quantiles is not None else None
+    if out_store is not None and not isinstance(out_store, ResultStore):
+        out_store = ResultStore(out_store)
+
+    res = []
+    key_meta = None
+    current_stage = 0
+    for stage, model_res in res_iter:
+        if stage != current_stage and preview_callback is not None:
+            preview_callback(accumulator.to_scmrun())
 
+        current_stage = stage
         model_meta = set(model_res.meta.columns.tolist())
-        climate_model = model_res.get_unique_meta("climate_model")
-        if model_meta != key_meta:
+        if key_meta is None:
+            key_meta = model_meta
+        elif model_meta != key_meta:
+            climate_model = model_res.get_unique_meta("climate_model")
             raise AssertionError(
                 f"{climate_model} meta: {model_meta}, expected meta: {key_meta}"
             )
 
+        if out_store is not None:
+            out_store.write(model_res)
+
+        if accumulator is not None:
+            accumulator.update(model_res)
+
+        if out_store is None and accumulator is None:
+            res.append(model_res)
+
+    if accumulator is not None:
+        quantiles_res = accumulator.to_scmrun()
+        if preview_callback is not None:
+            preview_callback(quantiles_res)
+
+        return quantiles_res
+
+    if out_store is not None:
+        return out_store
+
     if len(res) == 1:
         LOGGER.info("Only one model run, returning its results")
         scmdf = res[0]
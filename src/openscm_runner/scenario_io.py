@@ -0,0 +1,93 @@
+"""
+Lazy reading of large scenario files
+
+The functions in this module read scenarios in chunks of complete
+(model, scenario) pathways, so that :func:`openscm_runner.run.run` can start
+running the first pathways before the rest of the file has been read and
+without ever holding the entire file in memory.
+"""
+import pandas as pd
+import scmdata
+
+
+def iter_scenarios_csv(filepath, scenarios_per_chunk=100, read_chunksize=100_000):
+    """
+    Read scenarios from a CSV file in chunks of (model, scenario) pathways
+
+    The file must be in the wide format read by :class:`scmdata.ScmRun` (one
+    row per timeseries, one column per year) and all the rows of each
+    (model, scenario) pathway must be next to each other, as they are in
+    files written by :mod:`pyam` and :mod:`scmdata`. Column names are
+    converted to lower case.
+
+    .. code:: python
+
+        >>> run(
+        ...     climate_models_cfgs,
+        ...     iter_scenarios_csv("scenario-database.csv"),
+        ...     scenario_batch_size=20,
+        ... )  # doctest: +SKIP
+
+    Parameters
+    ----------
+    filepath : str or :obj:`pathlib.Path`
+        File to read
+
+    scenarios_per_chunk : int
+        Number of (model, scenario) pathways in each chunk (the last chunk
+        may be smaller)
+
+    read_chunksize : int
+        Number of rows to read from the file at once. This limits the memory
+        used while reading, independent of ``scenarios_per_chunk``.
+
+    Yields
+    ------
+    :obj:`scmdata.ScmRun`
+        Chunk of complete (model, scenario) pathways
+
+    Raises
+    ------
+    ValueError
+        The rows of a (model, scenario) pathway are not next to each other
+        in the file
+    """
+    completed = []
+    n_completed = 0
+    current_pair = None
+    current_parts = []
+    seen = set()
+
+    for raw in pd.read_csv(filepath, chunksize=read_chunksize):
+        raw.columns = [str(c).lower() for c in raw.columns]
+
+        pairs = raw["model"].astype(str) + "\0" + raw["scenario"].astype(str)
+        block = pairs.ne(pairs.shift()).cumsum()
+        for _, rows in raw.groupby(block, sort=False):
+            pair = (rows["model"].iloc[0], rows["scenario"].iloc[0])
+            if pair == current_pair:
+                current_parts.append(rows)
+                continue
+
+            if pair in seen:
+                raise ValueError(
+                    f"Rows for (model, scenario) {pair} are not next to each "
+                    f"other in {filepath}"
+                )
+
+            if current_pair is not None:
+                completed.extend(current_parts)
+                n_completed += 1
+
+            if n_completed >= scenarios_per_chunk:
+                yield scmdata.ScmRun(pd.concat(completed))
+                completed = []
+                n_completed = 0
+
+            seen.add(pair)
+            current_pair = pair
+            current_parts = [rows]
+
+    completed.extend(current_parts)
+    if completed:
+        yield scmdata.ScmRun(pd.concat(completed))
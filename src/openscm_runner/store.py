@@ -0,0 +1,255 @@
+"""
+On-disk storage of results with fast, filtered reads
+
+Results are stored in a directory which contains an index (a table of chunks)
+and the chunks themselves. Each chunk holds the timeseries for a single
+(climate_model, scenario, variable) combination from a single write. Values
+are stored as ``.npy`` arrays with time as the first axis, so that they can
+be memory-mapped and a range of years can be read without reading the rest
+of the chunk. Metadata is stored as csv, with its dtypes stored alongside.
+
+A filtered read only opens the chunks which match the filters on the index
+columns, which is much faster than loading all the results and then calling
+:meth:`scmdata.ScmRun.filter`.
+"""
+import fnmatch
+import json
+import os
+import os.path
+
+import numpy as np
+import pandas as pd
+import scmdata
+
+INDEX_COLUMNS = ("climate_model", "scenario", "variable")
+"""tuple[str]: Metadata columns used to split results into chunks"""
+
+_INDEX_FILE = "index.csv"
+
+
+def _matches(values, selection):
+    """
+    Get a mask which is ``True`` where ``values`` match ``selection``
+
+    ``selection`` can be a single value or a list of values. String values
+    can include wildcards (``*`` and ``?``).
+    """
+    if isinstance(selection, (str, int, float)):
+        selection = [selection]
+
+    values = pd.Series(values)
+    mask = np.zeros(values.shape[0], dtype=bool)
+    for sel in selection:
+        if isinstance(sel, str):
+            mask |= values.astype(str).apply(lambda v, s=sel: fnmatch.fnmatchcase(v, s))
+        else:
+            mask |= (values == sel).to_numpy()
+
+    return np.asarray(mask)
+
+
+class ResultStore:
+    """
+    Indexed on-disk store of model results
+
+    .. code:: python
+
+        >>> store = ResultStore("results-dir")  # doctest: +SKIP
+        >>> store.write(res)  # doctest: +SKIP
+        >>> store.read(
+        ...     scenario="ssp245",
+        ...     variable="Surface Air Temperature Change",
+        ...     year=range(2000, 2101),
+        ... )  # doctest: +SKIP
+
+    Writing from more than one process at once is not supported.
+    """
+
+    def __init__(self, path):
+        """
+        Initialise
+
+        Parameters
+        ----------
+        path : str
+            Directory in which the results are stored. It is created if it
+            doesn't exist already.
+        """
+        self.path = str(path)
+        os.makedirs(os.path.join(self.path, "chunks"), exist_ok=True)
+
+        index_file = os.path.join(self.path, _INDEX_FILE)
+        if os.path.isfile(index_file):
+            self._index = pd.read_csv(index_file, dtype={c: str for c in INDEX_COLUMNS})
+        else:
+            self._index = pd.DataFrame(
+                columns=["chunk", *INDEX_COLUMNS, "n_timeseries", "n_times"]
+            )
+
+    def __repr__(self):
+        """Human-readable representation."""
+        return f"<ResultStore {self.path} ({self._index.shape[0]} chunks)>"
+
+    @property
+    def index(self):
+        """
+        :obj:`pd.DataFrame`: Table of the chunks in the store
+        """
+        return self._index.copy()
+
+    def _chunk_path(self, chunk, kind):
+        return os.path.join(self.path, "chunks", f"{chunk}-{kind}")
+
+    def write(self, scmrun):
+        """
+        Add results to the store
+
+        Parameters
+        ----------
+        scmrun : :obj:`scmdata.ScmRun`
+            Results to add. Must include all of :data:`INDEX_COLUMNS` in its
+            metadata.
+
+        Raises
+        ------
+        KeyError
+            ``scmrun`` is missing some of the index columns
+        """
+        missing = set(INDEX_COLUMNS) - set(scmrun.meta.columns)
+        if missing:
+            raise KeyError(f"Results are missing index columns: {missing}")
+
+        timeseries = scmrun.timeseries(time_axis="year")
+        next_chunk = int(self._index["chunk"].max()) + 1 if self._index.shape[0] else 0
+
+        new_rows = []
+        for key, group in timeseries.groupby(
+            list(INDEX_COLUMNS), sort=False, dropna=False
+        ):
+            chunk_ts = group.dropna(axis="columns", how="all")
+            chunk = next_chunk + len(new_rows)
+
+            np.save(
+                self._chunk_path(chunk, "values.npy"),
+                np.ascontiguousarray(chunk_ts.values.T),
+            )
+            np.save(
+                self._chunk_path(chunk, "years.npy"),
+                np.asarray(chunk_ts.columns, dtype=int),
+            )
+            meta = chunk_ts.index.to_frame(index=False)
+            meta.to_csv(self._chunk_path(chunk, "meta.csv"), index=False)
+            # csv loses the dtypes (e.g. "001" would be read back as 1) so they
+            # are stored alongside
+            with open(
+                self._chunk_path(chunk, "meta-dtypes.json"), "w", encoding="utf-8"
+            ) as file_handle:
+                json.dump(meta.dtypes.astype(str).to_dict(), file_handle)
+
+            new_rows.append(
+                {
+                    "chunk": chunk,
+                    **dict(zip(INDEX_COLUMNS, key)),
+                    "n_timeseries": chunk_ts.shape[0],
+                    "n_times": chunk_ts.shape[1],
+                }
+            )
+
+        new_rows = pd.DataFrame(new_rows)
+        if self._index.empty:
+            self._index = new_rows
+        else:
+            self._index = pd.concat([self._index, new_rows], ignore_index=True)
+
+        # write to a temporary file first so the index is never left half
+        # written
+        index_file = os.path.join(self.path, _INDEX_FILE)
+        self._index.to_csv(f"{index_file}.tmp", index=False)
+        os.replace(f"{index_file}.tmp", index_file)
+
+    def _read_chunk(self, chunk, year, filters):
+        with open(
+            self._chunk_path(chunk, "meta-dtypes.json"), encoding="utf-8"
+        ) as file_handle:
+            meta_dtypes = json.load(file_handle)
+
+        meta = pd.read_csv(self._chunk_path(chunk, "meta.csv"), dtype=meta_dtypes)
+        row_mask = np.ones(meta.shape[0], dtype=bool)
+        for column, selection in filters.items():
+            if column not in meta:
+                return None
+
+            row_mask &= _matches(meta[column], selection)
+
+        if not row_mask.any():
+            return None
+
+        years = np.load(self._chunk_path(chunk, "years.npy"))
+        if year is None:
+            time_idx = slice(None)
+        else:
+            year_mask = np.isin(years, np.atleast_1d(year))
+            if not year_mask.any():
+                return None
+
+            # read the smallest contiguous block which contains the years
+            selected = np.nonzero(year_mask)[0]
+            time_idx = slice(selected[0], selected[-1] + 1)
+            year_mask = year_mask[time_idx]
+
+        values = np.load(self._chunk_path(chunk, "values.npy"), mmap_mode="r")
+        values = np.asarray(values[time_idx])
+        years = years[time_idx]
+        if year is not None:
+            values = values[year_mask]
+            years = years[year_mask]
+
+        return pd.DataFrame(
+            values[:, row_mask].T,
+            index=pd.MultiIndex.from_frame(meta[row_mask]),
+            columns=years,
+        )
+
+    def read(self, year=None, **filters):
+        """
+        Read results from the store
+
+        Parameters
+        ----------
+        year : int or list of int
+            Years to read. If ``None``, all years are read.
+
+        **filters
+            Metadata to filter on, e.g. ``scenario="ssp245"``. Values can be
+            a single value or a list of values. Strings can include wildcards
+            (``*`` and ``?``). Filters on :data:`INDEX_COLUMNS` are resolved
+            from the index, so chunks which don't match are never opened.
+
+        Returns
+        -------
+        :obj:`scmdata.ScmRun`
+            Results which match the filters
+
+        Raises
+        ------
+        ValueError
+            No results match the filters
+        """
+        chunk_mask = np.ones(self._index.shape[0], dtype=bool)
+        other_filters = {}
+        for column, selection in filters.items():
+            if column in INDEX_COLUMNS:
+                chunk_mask &= _matches(self._index[column], selection)
+            else:
+                other_filters[column] = selection
+
+        out = []
+        for chunk in self._index.loc[chunk_mask, "chunk"]:
+            chunk_ts = self._read_chunk(chunk, year, other_filters)
+            if chunk_ts is not None:
+                out.append(chunk_ts)
+
+        if not out:
+            raise ValueError(f"No results match the filters: {filters}, year={year}")
+
+        return scmdata.ScmRun(pd.concat(out))
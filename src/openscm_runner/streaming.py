@@ -0,0 +1,456 @@
+"""
+Online calculation of ensemble statistics
+
+The classes in this module allow quantiles to be calculated as results are
+produced, rather than requiring the entire ensemble to be held in memory
+before calling :func:`openscm_runner.utils.calculate_quantiles`.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import scmdata
+
+
+class _QuantileSketch:
+    """
+    Mergeable sketch of the distribution of values at each time point
+
+    The sketch is a simplified KLL-style compactor. Values are stored in
+    levels, where each value in level ``h`` carries a weight of ``2 ** h``.
+    Whenever a level holds more than ``capacity`` values, its values are
+    sorted (independently for each time point) and every second value is
+    promoted to the next level. The memory required is hence
+    ``O(capacity * log(n / capacity))`` per time point, regardless of the
+    number of values added.
+
+    All operations are vectorised over the time axis. Values are assumed to be
+    finite.
+    """
+
+    def __init__(self, n_times, capacity):
+        """
+        Initialise
+
+        Parameters
+        ----------
+        n_times : int
+            Number of time points in each timeseries
+
+        capacity : int
+            Maximum number of values to keep in each level before compacting
+        """
+        self.n_times = n_times
+        self.capacity = capacity
+        self.levels = []
+        self._n_compactions = 0
+
+    @property
+    def count(self):
+        """
+        int : Total (weighted) number of values which have been added
+        """
+        return sum(level.shape[0] * 2**h for h, level in enumerate(self.levels))
+
+    def _add_to_level(self, level, values):
+        while len(self.levels) <= level:
+            self.levels.append(np.empty((0, self.n_times)))
+
+        self.levels[level] = np.concatenate([self.levels[level], values], axis=0)
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if values.shape[0] > self.capacity:
+                values = np.sort(values, axis=0)
+                n_even = values.shape[0] - values.shape[0] % 2
+                # alternate the offset so that the compaction error doesn't
+                # systematically bias the sketch in one direction
+                offset = self._n_compactions % 2
+                self._n_compactions += 1
+
+                self.levels[level] = values[n_even:]
+                self._add_to_level(level + 1, values[offset:n_even:2])
+
+            level += 1
+
+    def update(self, values):
+        """
+        Add values to the sketch
+
+        Parameters
+        ----------
+        values : :obj:`np.ndarray`
+            Values to add, shape ``(n, n_times)``
+        """
+        self._add_to_level(0, np.asarray(values, dtype=float))
+        self._compact()
+
+    def merge(self, other):
+        """
+        Merge another sketch into this one
+
+        Parameters
+        ----------
+        other : :obj:`_QuantileSketch`
+            Sketch to merge. Must have the same number of time points.
+
+        Raises
+        ------
+        ValueError
+            ``other`` has a different number of time points
+        """
+        if other.n_times != self.n_times:
+            raise ValueError(
+                f"Cannot merge sketches with {self.n_times} and {other.n_times} "
+                "time points"
+            )
+
+        for level, values in enumerate(other.levels):
+            self._add_to_level(level, values)
+
+        self._compact()
+
+    def quantiles(self, quantiles):
+        """
+        Estimate quantiles at each time point
+
+        Parameters
+        ----------
+        quantiles : list of float
+            Quantiles to estimate (must be in [0, 1])
+
+        Returns
+        -------
+        :obj:`np.ndarray`
+            Estimated quantiles, shape ``(len(quantiles), n_times)``
+        """
+        values = np.concatenate(self.levels, axis=0)
+        weights = np.concatenate(
+            [np.full(level.shape[0], 2.0**h) for h, level in enumerate(self.levels)]
+        )
+
+        order = np.argsort(values, axis=0)
+        values_sorted = np.take_along_axis(values, order, axis=0)
+        weights_sorted = weights[order]
+
+        # approximate the CDF at each stored value, using the centre of each
+        # value's weight so that the extremes map to (close to) 0 and 1
+        cumulative = np.cumsum(weights_sorted, axis=0)
+        centres = cumulative - weights_sorted / 2
+        cdf = (centres - centres[:1]) / (centres[-1:] - centres[:1])
+
+        if values.shape[0] == 1:
+            return np.repeat(values_sorted, len(quantiles), axis=0)
+
+        out = np.empty((len(quantiles), self.n_times))
+        time_idx = np.arange(self.n_times)
+        for i, quant in enumerate(quantiles):
+            upper = np.clip((cdf < quant).sum(axis=0), 1, values.shape[0] - 1)
+            lower = upper - 1
+            cdf_lower = cdf[lower, time_idx]
+            cdf_upper = cdf[upper, time_idx]
+            frac = np.clip((quant - cdf_lower) / (cdf_upper - cdf_lower), 0, 1)
+
+            out[i, :] = values_sorted[lower, time_idx] + frac * (
+                values_sorted[upper, time_idx] - values_sorted[lower, time_idx]
+            )
+
+        return out
+
+
+class _GroupState:
+    """
+    Accumulated values for a single group of timeseries
+    """
+
+    def __init__(self, time_points, max_exact, sketch_capacity):
+        self.time_points = time_points
+        self.max_exact = max_exact
+        self.sketch_capacity = sketch_capacity
+        self.buffer = []
+        self.n_buffered = 0
+        self.sketch = None
+
+    @property
+    def is_exact(self):
+        """
+        bool : Are the quantiles calculated from this state exact?
+        """
+        return self.sketch is None
+
+    @property
+    def count(self):
+        """
+        int : Number of timeseries which have been added
+        """
+        if self.is_exact:
+            return self.n_buffered
+
+        return self.sketch.count
+
+    def _switch_to_sketch(self):
+        self.sketch = _QuantileSketch(len(self.time_points), self.sketch_capacity)
+        if self.buffer:
+            self.sketch.update(np.concatenate(self.buffer, axis=0))
+
+        self.buffer = []
+        self.n_buffered = 0
+
+    def update(self, values):
+        if self.is_exact:
+            self.buffer.append(values)
+            self.n_buffered += values.shape[0]
+            if self.n_buffered > self.max_exact:
+                self._switch_to_sketch()
+
+        else:
+            self.sketch.update(values)
+
+    def merge(self, other):
+        if other.is_exact:
+            for values in other.buffer:
+                self.update(values)
+
+            return
+
+        if self.is_exact:
+            self._switch_to_sketch()
+
+        self.sketch.merge(other.sketch)
+
+    def quantiles(self, quantiles):
+        if self.is_exact:
+            values = np.concatenate(self.buffer, axis=0)
+            if np.isnan(values).any():
+                return np.nanquantile(values, quantiles, axis=0)
+
+            return np.quantile(values, quantiles, axis=0)
+
+        return self.sketch.quantiles(quantiles)
+
+
+def _normalise_key(key):
+    """
+    Make nan values in a group's key the same object
+
+    ``float("nan") != float("nan")`` (and nan values hash by identity), so
+    without this the nan values pandas gives in each update (or which come
+    from another process) would never match existing groups.
+    """
+    if not isinstance(key, tuple):
+        key = (key,)
+
+    return tuple(np.nan if pd.isna(value) else value for value in key)
+
+
+class QuantileAccumulator:
+    """
+    Calculate quantiles of an ensemble as its members become available
+
+    Timeseries are grouped by all their metadata except
+    ``process_over_columns`` (by default, this gives one group per climate
+    model, scenario, variable, region and unit). While a group holds no more
+    than ``max_exact`` timeseries, its values are kept and exact quantiles are
+    returned (identical to those from
+    :func:`openscm_runner.utils.calculate_quantiles`). Beyond that, the group's
+    values are moved into a mergeable sketch with bounded memory and the
+    returned quantiles are estimates.
+
+    .. code:: python
+
+        >>> accumulator = QuantileAccumulator([0.05, 0.5, 0.95])
+        >>> for res in run_iter(climate_models_cfgs, scenarios):  # doctest: +SKIP
+        ...     accumulator.update(res)
+        >>> accumulator.to_scmrun()  # doctest: +SKIP
+    """
+
+    def __init__(
+        self,
+        quantiles,
+        process_over_columns=("run_id", "ensemble_member"),
+        max_exact=1000,
+        sketch_capacity=200,
+    ):
+        """
+        Initialise
+
+        Parameters
+        ----------
+        quantiles : list of float
+            Quantiles to calculate (must be in [0, 1])
+
+        process_over_columns : list of str
+            Columns to process over. All other metadata columns are used to
+            group the timeseries.
+
+        max_exact : int
+            Maximum number of timeseries to keep per group before switching to
+            a sketch (after which quantiles are approximate)
+
+        sketch_capacity : int
+            Number of values kept per level of the sketch. Larger values give
+            more accurate estimates at the cost of more memory.
+
+        Raises
+        ------
+        ValueError
+            Any of ``quantiles`` are not in [0, 1]
+        """
+        quantiles = list(quantiles)
+        if any(q < 0 or q > 1 for q in quantiles):
+            raise ValueError(f"quantiles must be in [0, 1], received {quantiles}")
+
+        self.quantiles = quantiles
+        self.process_over_columns = tuple(process_over_columns)
+        self.max_exact = max_exact
+        self.sketch_capacity = sketch_capacity
+        self._group_names = None
+        self._groups = {}
+
+    @property
+    def is_exact(self):
+        """
+        bool : Are all the quantiles which would currently be returned exact?
+        """
+        return all(state.is_exact for state in self._groups.values())
+
+    def counts(self):
+        """
+        Get the number of timeseries which have been added to each group
+
+        Returns
+        -------
+        :obj:`pd.Series`
+            Number of timeseries in each group, indexed by the group's metadata
+        """
+        return pd.Series(
+            [state.count for state in self._groups.values()],
+            index=pd.MultiIndex.from_tuples(
+                list(self._groups.keys()), names=self._group_names
+            ),
+            dtype=int,
+        )
+
+    def update(self, scmrun):
+        """
+        Add timeseries to the accumulator
+
+        Parameters
+        ----------
+        scmrun : :obj:`scmdata.ScmRun`
+            Timeseries to add
+
+        Raises
+        ------
+        ValueError
+            The metadata of ``scmrun`` is not consistent with the metadata of
+            timeseries which have already been added
+        """
+        timeseries = scmrun.timeseries(time_axis="year")
+        timeseries = timeseries.droplevel(
+            [c for c in self.process_over_columns if c in timeseries.index.names]
+        )
+
+        group_names = sorted(timeseries.index.names)
+        if self._group_names is None:
+            self._group_names = group_names
+        elif group_names != self._group_names:
+            raise ValueError(
+                f"Metadata columns {group_names} do not match existing metadata "
+                f"columns {self._group_names}"
+            )
+
+        timeseries = timeseries.reorder_levels(self._group_names)
+        for group_key, group in timeseries.groupby(
+            level=self._group_names, sort=False, dropna=False
+        ):
+            key = _normalise_key(group_key)
+            group_values = group.dropna(axis="columns", how="all")
+            if key not in self._groups:
+                self._groups[key] = _GroupState(
+                    group_values.columns.values,
+                    max_exact=self.max_exact,
+                    sketch_capacity=self.sketch_capacity,
+                )
+
+            state = self._groups[key]
+            if not np.array_equal(group_values.columns.values, state.time_points):
+                raise ValueError(f"Time axis for {key} differs from existing data")
+
+            state.update(group_values.values)
+
+    def merge(self, other):
+        """
+        Merge another accumulator into this one
+
+        This is useful for combining accumulators which were updated in
+        different processes.
+
+        Parameters
+        ----------
+        other : :obj:`QuantileAccumulator`
+            Accumulator to merge. Must have been initialised with the same
+            quantiles and ``process_over_columns``.
+
+        Raises
+        ------
+        ValueError
+            ``other`` is not compatible with this accumulator
+        """
+        if (
+            other.quantiles != self.quantiles
+            or other.process_over_columns != self.process_over_columns
+        ):
+            raise ValueError("Cannot merge accumulators with different settings")
+
+        if other._group_names is None:  # pylint:disable=protected-access
+            return
+
+        if self._group_names is None:
+            self._group_names = other._group_names  # pylint:disable=protected-access
+        elif other._group_names != self._group_names:  # pylint:disable=protected-access
+            raise ValueError("Cannot merge accumulators with different metadata")
+
+        for other_key, other_state in other._groups.items():  # pylint:disable=protected-access
+            key = _normalise_key(other_key)
+            if key not in self._groups:
+                self._groups[key] = _GroupState(
+                    other_state.time_points,
+                    max_exact=self.max_exact,
+                    sketch_capacity=self.sketch_capacity,
+                )
+
+            self._groups[key].merge(other_state)
+
+    def to_scmrun(self):
+        """
+        Get the quantiles of the data added so far
+
+        Returns
+        -------
+        :obj:`scmdata.ScmRun`
+            Quantiles of each group, with the quantile stored in the
+            ``quantile`` metadata column
+
+        Raises
+        ------
+        ValueError
+            No data has been added to the accumulator
+        """
+        if not self._groups:
+            raise ValueError("No data has been added")
+
+        out = []
+        for key, state in self._groups.items():
+            quantile_values = state.quantiles(self.quantiles)
+            index = pd.MultiIndex.from_tuples(
+                [(*key, quant) for quant in self.quantiles],
+                names=[*self._group_names, "quantile"],
+            )
+            out.append(
+                pd.DataFrame(quantile_values, index=index, columns=state.time_points)
+            )
+
+        return scmdata.ScmRun(pd.concat(out))
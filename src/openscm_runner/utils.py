@@ -1,9 +1,49 @@
 """
 Utility functions
 """
+import numpy as np
+import pandas as pd
 import scmdata
 
 
+def _calculate_quantiles_sorted(values_sorted, n_valid, quantiles):
+    """
+    Calculate quantiles from values which have already been sorted
+
+    Uses linear interpolation between the closest ranks, the same approach as
+    :meth:`pandas.DataFrame.quantile`, and ignores nan values.
+
+    Parameters
+    ----------
+    values_sorted : :obj:`np.ndarray`
+        Values sorted along the first axis with any nan values at the end,
+        shape ``(n, n_times)``
+
+    n_valid : :obj:`np.ndarray`
+        Number of non-nan values at each time, shape ``(n_times,)``
+
+    quantiles : :obj:`np.ndarray`
+        Quantiles to calculate (must be in [0, 1])
+
+    Returns
+    -------
+    :obj:`np.ndarray`
+        Quantiles at each time, shape ``(len(quantiles), n_times)``
+    """
+    position = quantiles[:, np.newaxis] * np.maximum(n_valid - 1, 0)[np.newaxis, :]
+    lower = np.floor(position).astype(int)
+    upper = np.ceil(position).astype(int)
+    frac = position - lower
+
+    values_lower = np.take_along_axis(values_sorted, lower, axis=0)
+    values_upper = np.take_along_axis(values_sorted, upper, axis=0)
+
+    out = values_lower + (values_upper - values_lower) * frac
+    out[:, n_valid == 0] = np.nan
+
+    return out
+
+
 def calculate_quantiles(
     scmdf,
     quantiles,
@@ -12,6 +52,12 @@ def calculate_quantiles(
     """
     Calculate quantiles of an :obj:`ScmRun`
 
+    The data is grouped once and each group's values are sorted once, after
+    which all the requested quantiles are calculated in a single vectorised
+    step. The result is the same as calling
+    ``scmdf.process_over(process_over_columns, "quantile", q=quant)`` for each
+    quantile.
+
     Parameters
     ----------
     scmdf : :obj:`ScmRun`
@@ -31,13 +77,40 @@ def calculate_quantiles(
         :obj:`ScmRun` containing the quantiles of interest, processed
         over ``process_over_columns``
     """
-    out = []
-    for quant in quantiles:
-        quantile_df = scmdf.process_over(process_over_columns, "quantile", q=quant)
-        quantile_df["quantile"] = quant
+    quantiles_arr = np.asarray(quantiles, dtype=float)
+    timeseries = scmdf.timeseries()
+    group_cols = sorted(set(timeseries.index.names) - set(process_over_columns))
+    values = timeseries.values
 
-        out.append(quantile_df)
+    # nan metadata (e.g. a column only some timeseries have) forms its own
+    # group, as in :meth:`ScmRun.process_over`
+    grouper = timeseries.groupby(group_cols, dropna=False)
+    group_sizes = grouper.size()
+    # group numbers follow the order of ``group_sizes`` (nan keys can't be
+    # looked up in ``grouper.indices`` so rows are found from the numbers)
+    group_rows = np.split(
+        np.argsort(grouper.ngroup().to_numpy(), kind="stable"),
+        np.cumsum(group_sizes.to_numpy())[:-1],
+    )
 
-    out = scmdata.run_append([scmdata.ScmRun(o) for o in out])
+    group_keys = []
+    group_quantiles = []
+    for key, rows in zip(group_sizes.index, group_rows):
+        values_sorted = np.sort(values[rows, :], axis=0)
+        n_valid = (~np.isnan(values_sorted)).sum(axis=0)
 
-    return out
+        group_keys.append(key if isinstance(key, tuple) else (key,))
+        group_quantiles.append(
+            _calculate_quantiles_sorted(values_sorted, n_valid, quantiles_arr)
+        )
+
+    # order the output by quantile, then by group
+    out_values = np.stack(group_quantiles, axis=1).reshape(-1, values.shape[1])
+    out_index = pd.MultiIndex.from_tuples(
+        [(*key, quant) for quant in quantiles for key in group_keys],
+        names=[*group_cols, "quantile"],
+    )
+
+    return scmdata.ScmRun(
+        pd.DataFrame(out_values, index=out_index, columns=timeseries.columns)
+    )
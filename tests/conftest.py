@@ -75,6 +75,16 @@ def pandas_terminal_width():
     pd.set_option("display.max_columns", 1000)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def data_cache_dir(tmp_path_factory):
+    # Cache compiled input data in a temporary directory rather than the
+    # user's cache so that tests don't depend on (or write to) it.
+    cache_dir = tmp_path_factory.mktemp("openscm-runner-cache")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("OPENSCM_RUNNER_CACHE_DIR", str(cache_dir))
+        yield cache_dir
+
+
 @pytest.fixture(scope="session")
 def test_data_dir() -> Path:
     return TEST_DATA_DIR
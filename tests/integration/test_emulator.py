@@ -0,0 +1,201 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+from scmdata import ScmRun, run_append
+
+import openscm_runner.run
+from openscm_runner.adapters.emulator_adapter import accuracy_report, calibrate
+from openscm_runner.adapters.emulator_adapter._model import OUTPUT_UNITS
+from openscm_runner.adapters.emulator_adapter.calibration import (
+    FAST_TIMESCALES,
+    SLOW_TIMESCALES,
+)
+from openscm_runner.adapters.fair_adapter._compat import fair
+from openscm_runner.testing import _AdapterTester
+
+CFGS = [
+    {
+        "forcing_coefficients": {
+            "CO2": 5.35,
+            "CH4": 1.5e-4,
+            "N2O": 3e-4,
+            "Other Greenhouse Gases": 2e-6,
+            "Sulfur": -0.01,
+            "BC and OC": 0.002,
+            "Natural": 1.0,
+        },
+        "q": [0.35, 0.4],
+        "d": [FAST_TIMESCALES[3], SLOW_TIMESCALES[8]],
+    },
+    {
+        "forcing_coefficients": {
+            "CO2": 5.0,
+            "CH4": 1e-4,
+            "N2O": 2e-4,
+            "Other Greenhouse Gases": 1e-6,
+            "Sulfur": -0.02,
+            "BC and OC": 0.0,
+            "Natural": 0.8,
+        },
+        "q": [0.3, 0.6],
+        "d": [FAST_TIMESCALES[5], SLOW_TIMESCALES[4]],
+    },
+]
+
+SCENARIOS = ["ssp126", "ssp370", "ssp585"]
+
+
+class TestEmulatorAdapter(_AdapterTester):
+    def test_run(self, test_scenarios):
+        res = openscm_runner.run.run(
+            climate_models_cfgs={"Emulator": CFGS},
+            scenarios=test_scenarios.filter(scenario=SCENARIOS),
+            output_variables=(
+                "Surface Air Temperature Change",
+                "Effective Radiative Forcing",
+                "Effective Radiative Forcing|CO2",
+            ),
+        )
+
+        assert isinstance(res, ScmRun)
+        assert res["run_id"].min() == 0
+        assert res["run_id"].max() == 5
+        assert res.get_unique_meta("climate_model", no_duplicates=True) == "Emulator"
+        assert set(res.get_unique_meta("variable")) == {
+            "Surface Air Temperature Change",
+            "Effective Radiative Forcing",
+            "Effective Radiative Forcing|CO2",
+        }
+
+        npt.assert_allclose(
+            res.filter(variable="Effective Radiative Forcing|CO2", year=1750).values,
+            0,
+        )
+
+        warming_2100 = (
+            res.filter(variable="Surface Air Temperature Change", year=2100)
+            .timeseries(meta=["scenario", "run_id"])
+            .squeeze()
+        )
+        for cfg_idx in range(len(CFGS)):
+            ssp126, ssp370, ssp585 = (
+                warming_2100.loc[(scenario, i * len(CFGS) + cfg_idx)]
+                for i, scenario in enumerate(SCENARIOS)
+            )
+            assert 1 < ssp126 < ssp370 < ssp585 < 7
+
+    def test_variable_naming(self, test_scenarios):
+        res = openscm_runner.run.run(
+            climate_models_cfgs={"Emulator": CFGS[:1]},
+            scenarios=test_scenarios.filter(scenario="ssp126"),
+            output_variables=self._common_variables,
+        )
+
+        assert set(res["variable"]) == set(self._common_variables) & set(OUTPUT_UNITS)
+
+
+def _run_emulator(scenarios, run_ids=None):
+    res = openscm_runner.run.run(
+        climate_models_cfgs={"Emulator": CFGS},
+        scenarios=scenarios,
+        output_variables=(
+            "Surface Air Temperature Change",
+            "Effective Radiative Forcing",
+        ),
+    )
+    if run_ids is not None:
+        # number the runs like CICERO-SCM, with an ID per config
+        res["run_id"] = np.array(run_ids)[res["run_id"].to_numpy() % len(CFGS)]
+
+    return res
+
+
+def _assert_recovered(calibrated):
+    assert len(calibrated) == len(CFGS)
+    for cfg, exp in zip(calibrated, CFGS):
+        npt.assert_allclose(cfg["d"], exp["d"])
+        npt.assert_allclose(cfg["q"], exp["q"], rtol=1e-6)
+        for name, value in exp["forcing_coefficients"].items():
+            npt.assert_allclose(
+                cfg["forcing_coefficients"][name], value, rtol=1e-5, atol=1e-12
+            )
+
+
+def test_calibrate_recovers_parameters(test_scenarios):
+    scenarios = test_scenarios.filter(scenario=SCENARIOS)
+    res = _run_emulator(scenarios)
+
+    calibrated = calibrate(scenarios, res, n_configs=len(CFGS))
+
+    _assert_recovered(calibrated)
+    report = accuracy_report(calibrated, scenarios, res)
+    assert set(report.index.get_level_values("scenario")) == {*SCENARIOS, "All"}
+    assert (report["rmse"] < 1e-6).all()
+
+
+@pytest.mark.parametrize(
+    "run_ids, pass_run_ids",
+    (
+        ([7, 30040], False),
+        ([7, 30040], True),
+        ([30040, 1], True),
+    ),
+)
+def test_calibrate_config_run_ids(test_scenarios, run_ids, pass_run_ids):
+    scenarios = test_scenarios.filter(scenario=SCENARIOS)
+    res = _run_emulator(scenarios, run_ids=run_ids)
+    kwargs = {"run_ids": run_ids} if pass_run_ids else {}
+
+    calibrated = calibrate(scenarios, res, n_configs=len(CFGS), **kwargs)
+
+    _assert_recovered(calibrated)
+    report = accuracy_report(calibrated, scenarios, res, **kwargs)
+    assert (report["rmse"] < 1e-6).all()
+
+
+def test_calibrate_errors(test_scenarios):
+    scenarios = test_scenarios.filter(scenario=SCENARIOS)
+    res = openscm_runner.run.run(
+        climate_models_cfgs={"Emulator": CFGS},
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+    )
+
+    with pytest.raises(ValueError, match="Effective Radiative Forcing is not in"):
+        calibrate(scenarios, res, n_configs=len(CFGS))
+
+    other = res.copy()
+    other["climate_model"] = "Other"
+    with pytest.raises(ValueError, match="single climate model"):
+        calibrate(scenarios, run_append([res, other]), n_configs=len(CFGS))
+
+    res = _run_emulator(scenarios)
+    with pytest.raises(ValueError, match="run_ids must have 2 elements"):
+        calibrate(scenarios, res, n_configs=len(CFGS), run_ids=[0])
+
+    with pytest.raises(ValueError, match="more than 1 runs for a scenario"):
+        calibrate(scenarios, res, n_configs=1)
+
+
+@pytest.mark.skipif(fair is None, reason="fair not installed")
+def test_calibrate_to_fair(test_scenarios):
+    fair_cfgs = [{}, {"lambda_global": 0.9}, {"F2x": 3.9, "r0": 30.0}]
+    res = openscm_runner.run.run(
+        climate_models_cfgs={"FaIR": fair_cfgs},
+        scenarios=test_scenarios,
+        output_variables=(
+            "Surface Air Temperature Change",
+            "Effective Radiative Forcing",
+        ),
+    )
+
+    calibrated = calibrate(
+        test_scenarios.filter(scenario=SCENARIOS),
+        res.filter(scenario=SCENARIOS),
+        n_configs=len(fair_cfgs),
+    )
+    # the report includes scenarios which weren't used for calibration
+    report = accuracy_report(calibrated, test_scenarios, res)
+
+    assert report.loc[("Surface Air Temperature Change", "All"), "rmse"] < 0.1
+    assert report.loc[("Effective Radiative Forcing", "All"), "rmse"] < 0.2
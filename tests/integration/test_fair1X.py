@@ -1,24 +1,46 @@
 import numpy as np
 import numpy.testing as npt
+import pandas as pd
 import pytest
+import scmdata
 from scmdata import ScmRun
 
 import openscm_runner.run
 from openscm_runner.adapters import FAIR
+from openscm_runner.adapters.fair_adapter._batched import (
+    _find_shared_history,
+    _get_parameters,
+    fair_scm_batched,
+)
+from openscm_runner.adapters.fair_adapter._compat import HAS_NUMBA, fair_scm
+from openscm_runner.scenario_io import iter_scenarios_csv
 from openscm_runner.testing import _AdapterTester
 from openscm_runner.utils import calculate_quantiles
 
 
 class TestFairAdapter(_AdapterTester):
     @pytest.mark.parametrize("nworkers", (1, 4))
-    def test_run(
+    @pytest.mark.parametrize(
+        "engine",
+        (
+            "batched",
+            "fair_scm",
+            pytest.param(
+                "numba",
+                marks=pytest.mark.skipif(not HAS_NUMBA, reason="numba not installed"),
+            ),
+        ),
+    )
+    def test_run(  # noqa: PLR0913
         self,
         test_scenarios,
         monkeypatch,
         nworkers,
+        engine,
         num_regression,
     ):
         monkeypatch.setenv("FAIR_WORKER_NUMBER", f"{nworkers}")
+        monkeypatch.setenv("FAIR_ENGINE", engine)
         res = openscm_runner.run.run(
             climate_models_cfgs={
                 "FaIR": [
@@ -160,7 +182,12 @@ class TestFairAdapter(_AdapterTester):
             ]
         }
         output_dict = self._get_output_dict(res, outputs_to_get)
-        num_regression.check(output_dict, default_tolerance=dict(rtol=self._rtol))
+        # every engine is checked against the same expected output
+        num_regression.check(
+            output_dict,
+            basename=f"test_run_{nworkers}_",
+            default_tolerance=dict(rtol=self._rtol),
+        )
 
     def test_variable_naming(self, test_scenarios):
         missing_from_fair = (
@@ -515,3 +542,349 @@ def test_forcing_categories(test_scenarios):
         + forcing["Effective Radiative Forcing|Solar"],
         forcing["Effective Radiative Forcing"],
     )
+
+
+def test_run_quantiles(test_scenarios):
+    climate_models_cfgs = {
+        "FaIR": [
+            {},
+            {"q": np.array([0.3, 0.45]), "r0": 30.0, "lambda_global": 0.9},
+            {"q": np.array([0.35, 0.4]), "r0": 25.0, "lambda_global": 1.1},
+        ],
+    }
+    scenarios = test_scenarios.filter(scenario=["ssp126", "ssp245", "ssp370"])
+    output_variables = ("Surface Air Temperature Change",)
+    quantiles = [0.05, 0.5, 0.95]
+
+    res = openscm_runner.run.run(
+        climate_models_cfgs=climate_models_cfgs,
+        scenarios=scenarios,
+        output_variables=output_variables,
+        quantiles=quantiles,
+        scenario_batch_size=1,
+    )
+
+    full = openscm_runner.run.run(
+        climate_models_cfgs=climate_models_cfgs,
+        scenarios=scenarios,
+        output_variables=output_variables,
+    )
+    exp = calculate_quantiles(full, quantiles, process_over_columns=("run_id",))
+
+    assert "run_id" not in res.meta
+    for quantile in quantiles:
+        npt.assert_allclose(
+            res.filter(quantile=quantile).timeseries().sort_index().values,
+            exp.filter(quantile=quantile).timeseries().sort_index().values,
+        )
+
+
+def test_run_scenario_batches_run_ids(test_scenarios):
+    climate_models_cfgs = {"FaIR": [{}, {"r0": 30.0}]}
+    scenarios = test_scenarios.filter(scenario=["ssp126", "ssp245", "ssp370"])
+
+    batched = openscm_runner.run.run(
+        climate_models_cfgs=climate_models_cfgs,
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+        scenario_batch_size=2,
+    )
+    full = openscm_runner.run.run(
+        climate_models_cfgs=climate_models_cfgs,
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+    )
+
+    pd.testing.assert_frame_equal(
+        batched.timeseries().sort_index(), full.timeseries().sort_index()
+    )
+
+
+def test_run_out_store(test_scenarios, tmp_path):
+    climate_models_cfgs = {"FaIR": [{}, {"r0": 30.0}]}
+    scenarios = test_scenarios.filter(scenario=["ssp126", "ssp245"])
+    output_variables = ("Surface Air Temperature Change", "Heat Uptake")
+
+    store = openscm_runner.run.run(
+        climate_models_cfgs=climate_models_cfgs,
+        scenarios=scenarios,
+        output_variables=output_variables,
+        scenario_batch_size=1,
+        out_store=tmp_path / "results",
+    )
+    full = openscm_runner.run.run(
+        climate_models_cfgs=climate_models_cfgs,
+        scenarios=scenarios,
+        output_variables=output_variables,
+    )
+
+    res = store.read(scenario="ssp245", variable="Heat Uptake", year=range(2000, 2101))
+    exp = full.filter(scenario="ssp245", variable="Heat Uptake", year=range(2000, 2101))
+    pd.testing.assert_frame_equal(
+        res.timeseries().sort_index(), exp.timeseries().sort_index(), check_like=True
+    )
+
+
+def test_run_preview(test_scenarios):
+    climate_models_cfgs = {
+        "FaIR": [{"r0": r0, "lambda_global": 1.0 + r0 / 100} for r0 in range(25, 35)]
+    }
+    scenarios = test_scenarios.filter(scenario=["ssp126", "ssp370"])
+    output_variables = ("Surface Air Temperature Change",)
+    quantiles = [0.05, 0.5, 0.95]
+
+    previews = []
+    res = openscm_runner.run.run(
+        climate_models_cfgs=climate_models_cfgs,
+        scenarios=scenarios,
+        output_variables=output_variables,
+        quantiles=quantiles,
+        preview_members=4,
+        preview_callback=previews.append,
+    )
+
+    # 4 preview members, then 4 and 2 more
+    assert len(previews) == 3
+    assert previews[-1] is res
+
+    full = openscm_runner.run.run(
+        climate_models_cfgs=climate_models_cfgs,
+        scenarios=scenarios,
+        output_variables=output_variables,
+    )
+    exp = calculate_quantiles(full, quantiles, process_over_columns=("run_id",))
+    pd.testing.assert_frame_equal(
+        res.timeseries().sort_index(), exp.timeseries().sort_index(), check_like=True
+    )
+
+    # run IDs are the same as for a full run
+    res_iter = scmdata.run_append(
+        list(
+            openscm_runner.run.run_iter(
+                climate_models_cfgs=climate_models_cfgs,
+                scenarios=scenarios,
+                output_variables=output_variables,
+                preview_members=4,
+            )
+        )
+    )
+    pd.testing.assert_frame_equal(
+        res_iter.timeseries().sort_index(), full.timeseries().sort_index()
+    )
+
+
+def test_run_streamed_scenarios(test_scenarios, tmp_path):
+    climate_models_cfgs = {"FaIR": [{}, {"r0": 30.0}]}
+    scenarios = test_scenarios.filter(scenario=["ssp126", "ssp245", "ssp370"])
+    scenarios_file = tmp_path / "scenarios.csv"
+    # write in the order in which the adapters group scenarios so that the
+    # run IDs match those of an unstreamed run
+    scenarios.timeseries(time_axis="year").sort_index(
+        level=["scenario", "model"]
+    ).to_csv(scenarios_file)
+
+    streamed = openscm_runner.run.run(
+        climate_models_cfgs=climate_models_cfgs,
+        scenarios=iter_scenarios_csv(scenarios_file, scenarios_per_chunk=2),
+        output_variables=("Surface Air Temperature Change",),
+    )
+    full = openscm_runner.run.run(
+        climate_models_cfgs=climate_models_cfgs,
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+    )
+
+    pd.testing.assert_frame_equal(
+        streamed.timeseries().sort_index(), full.timeseries().sort_index()
+    )
+
+
+def test_run_config_table(test_scenarios):
+    scenarios = test_scenarios.filter(scenario=["ssp126", "ssp245"])
+    cfgs = [
+        {},
+        {"q": np.array([0.3, 0.45]), "r0": 30.0, "lambda_global": 0.9},
+        {"r0": 25.0},
+    ]
+
+    res_table = openscm_runner.run.run(
+        climate_models_cfgs={"FaIR": pd.DataFrame(cfgs)},
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+        preview_members=2,
+    )
+    res_generator = openscm_runner.run.run(
+        climate_models_cfgs={"FaIR": (cfg for cfg in cfgs)},
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+    )
+    res_list = openscm_runner.run.run(
+        climate_models_cfgs={"FaIR": cfgs},
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+    )
+
+    exp = res_list.timeseries().sort_index()
+    pd.testing.assert_frame_equal(res_table.timeseries().sort_index(), exp)
+    pd.testing.assert_frame_equal(res_generator.timeseries().sort_index(), exp)
+
+
+def test_run_deduplicate(test_scenarios, caplog):
+    scenarios = test_scenarios.filter(scenario=["ssp126", "ssp245"])
+    duplicate = test_scenarios.filter(scenario="ssp126").copy()
+    duplicate["model"] = "other"
+    duplicate["scenario"] = "ssp126-rerun"
+    scenarios = scmdata.run_append([scenarios, duplicate])
+
+    cfgs = [{}, {"r0": 30.0}, {}, {"r0": 30.0, "lambda_global": 0.9}]
+    kwargs = dict(
+        climate_models_cfgs={"FaIR": cfgs},
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+        scenario_batch_size=2,
+    )
+
+    with caplog.at_level("INFO", logger="openscm_runner.run"):
+        res = openscm_runner.run.run(**kwargs)
+
+    assert "Running 1 unique scenarios and 3 unique configs (of 2 and 4)" in caplog.text
+    assert res["run_id"].nunique() == 12
+
+    exp = openscm_runner.run.run(**kwargs, deduplicate=False)
+    pd.testing.assert_frame_equal(
+        res.timeseries().sort_index(), exp.timeseries().sort_index()
+    )
+
+
+@pytest.mark.parametrize("batch_size", ("1", "3", "250"))
+def test_batched_engine_matches_fair_scm(test_scenarios, monkeypatch, batch_size):
+    scenarios = test_scenarios.filter(scenario=["ssp126", "ssp585"])
+    cfgs = [
+        {},
+        {"q": np.array([0.3, 0.45]), "r0": 30.0, "lambda_global": 0.9},
+        {"ghg_forcing": "Meinshausen", "fossilCH4_frac": 0.2, "aviNOx_frac": 0.1},
+        {
+            "scale": np.linspace(0.9, 1.1, 45),
+            "F2x": 3.9,
+            "ocean_heat_capacity": [7.5, 100.0],
+        },
+        # not supported by the batched engine, run with fair_scm instead
+        {"ghg_forcing": "Myhre"},
+    ]
+    kwargs = dict(
+        climate_models_cfgs={"FaIR": cfgs},
+        scenarios=scenarios,
+        output_variables=(
+            "Surface Air Temperature Change",
+            "Effective Radiative Forcing",
+            "Effective Radiative Forcing|Aerosols",
+            "Effective Radiative Forcing|Ozone",
+            "Atmospheric Concentrations|CH4",
+            "Heat Uptake|Ocean",
+            "Atmospheric Concentrations|CO2",
+        ),
+    )
+    monkeypatch.setenv("FAIR_BATCH_SIZE", batch_size)
+
+    monkeypatch.setenv("FAIR_ENGINE", "fair_scm")
+    exp = openscm_runner.run.run(**kwargs).timeseries().sort_index()
+
+    monkeypatch.setenv("FAIR_ENGINE", "batched")
+    res = openscm_runner.run.run(**kwargs).timeseries().sort_index()
+
+    assert res.index.equals(exp.index)
+    npt.assert_allclose(res.to_numpy(), exp.to_numpy(), rtol=1e-7, atol=1e-10)
+
+
+def test_fair_engine_error(test_scenarios, monkeypatch):
+    monkeypatch.setenv("FAIR_ENGINE", "junk")
+
+    with pytest.raises(ValueError, match="FAIR_ENGINE must be 'auto', 'numba'"):
+        openscm_runner.run.run(
+            climate_models_cfgs={"FaIR": [{}]},
+            scenarios=test_scenarios.filter(scenario="ssp126"),
+            output_variables=("Surface Air Temperature Change",),
+        )
+
+
+@pytest.mark.skipif(HAS_NUMBA, reason="numba installed")
+def test_numba_engine_not_installed_error(test_scenarios, monkeypatch):
+    monkeypatch.setenv("FAIR_ENGINE", "numba")
+
+    with pytest.raises(ImportError, match="numba is not installed"):
+        openscm_runner.run.run(
+            climate_models_cfgs={"FaIR": [{}]},
+            scenarios=test_scenarios.filter(scenario="ssp126"),
+            output_variables=("Surface Air Temperature Change",),
+        )
+
+
+@pytest.mark.parametrize(
+    "cfg",
+    (
+        {},
+        {"ghg_forcing": "Meinshausen", "r0": 30.0, "F2x": 3.9},
+        {
+            "tropO3_forcing": "thornhill-skeie",
+            "b_tro3": np.array([2.3e-4, 1.5e-4, -6.5e-4, 3.9e-4, 8.3e-4, 3.3e-4]),
+            "scale": np.linspace(0.9, 1.1, 45),
+            "scale_F2x": False,
+        },
+    ),
+)
+def test_compiled_kernel_matches_fair_scm(cfg):
+    # without numba the kernel runs as plain Python, which still checks it
+    fair_kwargs = _get_batched_fair_kwargs(cfg)
+
+    exp = fair_scm(**fair_kwargs)
+    res = fair_scm_batched([fair_kwargs, fair_kwargs], compiled=True)
+
+    for res_values, exp_values in zip(res, exp):
+        for run_values in res_values:
+            npt.assert_allclose(run_values, exp_values, rtol=1e-7, atol=1e-10)
+
+
+@pytest.mark.parametrize("compiled", (False, True))
+def test_warm_start(compiled):
+    base = _get_batched_fair_kwargs({})
+    # two scenarios which share 250 years of history, each run with two configs
+    emissions_high = base["emissions"].copy()
+    emissions_high[250:, 1] *= 1.5
+    fair_kwargs_list = [
+        {**base, **cfg, "emissions": emissions}
+        for emissions in (base["emissions"], emissions_high)
+        for cfg in ({}, {"r0": 30.0, "ocean_heat_capacity": np.array([7.5, 100])})
+    ]
+
+    representatives, inverse, start = _find_shared_history(
+        _get_parameters(fair_kwargs_list, emissions_high.shape[0]),
+        len(fair_kwargs_list),
+    )
+    npt.assert_array_equal(representatives, [0, 1])
+    npt.assert_array_equal(inverse, [0, 1, 0, 1])
+    assert start == 250
+
+    res = fair_scm_batched(fair_kwargs_list, compiled=compiled, warm_start=True)
+    exp = fair_scm_batched(fair_kwargs_list, compiled=compiled, warm_start=False)
+    for res_values, exp_values in zip(res, exp):
+        npt.assert_array_equal(res_values, exp_values)
+
+
+def _get_batched_fair_kwargs(cfg):
+    rcps = pytest.importorskip("fair.RCPs")
+
+    return {
+        "emissions": rcps.rcp45.Emissions.emissions,
+        "diagnostics": "AR6",
+        "gir_carbon_cycle": True,
+        "temperature_function": "Geoffroy",
+        "aerosol_forcing": "aerocom+ghan2",
+        "fixPre1850RCP": False,
+        "tropO3_forcing": "cmip6",
+        "b_tro3": np.array(
+            [1.77871043e-04, 5.80173377e-05, 1.94458719e-04, 2.09151270e-03]
+        ),
+        "b_aero": np.array([-0.00503, 0.0, 0.0, 0.0, 0.0385, -0.0104, 0.0]),
+        "ghan_params": np.array([1.232, 73.9, 63.0]),
+        **cfg,
+    }
@@ -0,0 +1,119 @@
+import inspect
+import struct
+import sys
+
+import numpy as np
+import pytest
+
+from openscm_runner.adapters.magicc7._compat import pymagicc
+
+
+def _write_binout(filepath, years, columns, legacy=False):
+    """
+    Write a MAGICC binary output file
+
+    ``columns`` is a list of (variable, region, unit, values). In the legacy
+    format, the columns must be the global values followed by the four boxes.
+    """
+
+    def record(data):
+        size = struct.pack("i", len(data))
+        return size + data + size
+
+    def values(data):
+        return np.asarray(data, dtype=np.float64).tobytes()
+
+    out = b""
+    if not legacy:
+        out += record(b"magicc") + record(struct.pack("h", 2))
+
+    for value in (len(columns), years[0], years[-1], 1):
+        out += record(struct.pack("I", value))
+
+    if legacy:
+        out += record(values(columns[0][3]))
+        if len(columns) > 1:
+            out += record(values(np.concatenate([c[3] for c in columns[1:]])))
+    else:
+        for variable, region, unit, data in columns:
+            out += record(variable.encode()) + record(region.encode())
+            out += record(unit.encode()) + record(values(data))
+
+    with open(filepath, "wb") as file_handle:
+        file_handle.write(out)
+
+
+FAKE_MAGICC_RUN = """
+cfg = f90nml.read("MAGTUNE_PYMAGICC.CFG")["nml_allcfgs"]
+nml_years = f90nml.read("MAGCFG_NMLYEARS.CFG")["nml_years"]
+years = np.arange(nml_years["startyear"], nml_years["endyear"] + 1)
+out_vars = cfg["out_dynamic_vars"]
+if isinstance(out_vars, str):
+    out_vars = [out_vars]
+
+for i, variable in enumerate(out_vars):
+    data = np.sin(years / (i + 1)) + cfg["run_id"]
+    if variable == "DAT_SURFACE_TEMP":
+        regions = ["GLOBAL", "NHOCEAN", "NHLAND", "SHOCEAN", "SHLAND"]
+    else:
+        regions = ["GLOBAL"]
+
+    columns = [
+        (variable, region, "W/m^2", data * (j + 1)) for j, region in enumerate(regions)
+    ]
+    _write_binout(
+        f"../out/{variable}.BINOUT", years, columns, legacy=variable.endswith("_CONC")
+    )
+
+f90nml.write(
+    {"nml_years": nml_years, "nml_allcfgs": cfg, "nml_outputcfgs": {"out_zero": 0}},
+    "../out/PARAMETERS.OUT",
+    force=True,
+)
+"""
+
+
+@pytest.fixture
+def write_binout():
+    return _write_binout
+
+
+@pytest.fixture
+def fake_magicc(tmp_path, monkeypatch):
+    """
+    A MAGICC distribution whose executable writes binary output
+
+    The output of ``DAT_SURFACE_TEMP`` has four boxes. Concentrations are
+    written in the legacy format.
+    """
+    for directory in ("bin", "run"):
+        (tmp_path / "magicc" / directory).mkdir(parents=True)
+
+    executable = tmp_path / "magicc" / "bin" / "magicc"
+    executable.write_text(
+        "\n".join(
+            [
+                f"#!{sys.executable}",
+                "import struct",
+                "import f90nml",
+                "import numpy as np",
+                inspect.getsource(_write_binout),
+                FAKE_MAGICC_RUN,
+            ]
+        )
+    )
+    executable.chmod(0o755)
+    run_dir = tmp_path / "magicc" / "run"
+    (run_dir / "MAGCFG_USER.CFG").write_text("&nml_allcfgs\n/\n")
+    (run_dir / "HISTORICAL.IN").write_text("data\n")
+    (run_dir / "subdir").mkdir()
+    (run_dir / "subdir" / "OTHER.IN").write_text("other data\n")
+    (run_dir / "openscm-runner").mkdir()
+    (run_dir / "openscm-runner" / "SCENARIO.SCEN7").write_text("emissions\n")
+
+    monkeypatch.setenv("MAGICC_EXECUTABLE_7", str(executable))
+    if pymagicc is not None:
+        # as set by _MagiccInstances
+        pymagicc.config.config["EXECUTABLE_7"] = str(executable)
+
+    return executable
@@ -1,3 +1,7 @@
+import subprocess
+import sys
+from unittest.mock import patch
+
 import pytest
 
 from openscm_runner.adapters import (
@@ -84,3 +88,44 @@ def test_get_adapter(custom_adapters):
     adapter = get_adapter("custom")
 
     assert isinstance(adapter, CustomAdapter)
+
+
+def test_adapters_imported_lazily():
+    code = (
+        "import sys; "
+        "import openscm_runner.run; "
+        "from openscm_runner.adapters import get_adapter; "
+        "get_adapter('fair'); "
+        "print(sorted("
+        "m for m in ('fair', 'pymagicc', 'ciceroscm') if m in sys.modules"
+        "))"
+    )
+    res = subprocess.run(
+        [sys.executable, "-c", code],  # noqa: S603
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    assert res.stdout.strip() == "['fair']"
+
+
+def test_get_adapter_builtin(custom_adapters):
+    _registered_adapters.clear()
+
+    adapter = get_adapter("magicc7")
+
+    assert isinstance(adapter, MAGICC7)
+    assert _registered_adapters == [MAGICC7]
+
+
+def test_magicc_version_cached(monkeypatch, tmp_path):
+    monkeypatch.setenv("MAGICC_EXECUTABLE_7", str(tmp_path / "magicc"))
+    with patch(
+        "openscm_runner.adapters.magicc7.magicc7.check_output",
+        return_value=b"v7.5.3\n",
+    ) as mock_check_output:
+        assert MAGICC7.get_version() == "v7.5.3"
+        assert MAGICC7.get_version() == "v7.5.3"
+
+    mock_check_output.assert_called_once_with([str(tmp_path / "magicc"), "--version"])
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from openscm_runner.adapters.utils._config_table import (
+    ConfigTable,
+    ScenarioConfigProduct,
+    as_config_sequence,
+    take_configs,
+)
+
+
+@pytest.fixture()
+def parameters():
+    return pd.DataFrame(
+        {
+            "r0": [30.0, np.nan, 25.0],
+            "q": [np.array([0.3, 0.45]), None, np.array([0.35, 0.4])],
+            "nyears": [10, 20, 30],
+        }
+    )
+
+
+def test_config_table(parameters):
+    table = ConfigTable(parameters)
+
+    assert len(table) == 3
+    assert table[1] == {"nyears": 20}
+    assert isinstance(table[1]["nyears"], int)
+
+    last = table[-1]
+    assert last["r0"] == 25.0
+    np.testing.assert_equal(last["q"], np.array([0.35, 0.4]))
+
+    with pytest.raises(IndexError):
+        table[3]
+
+    subset = table[np.array([0, 2])]
+    assert isinstance(subset, ConfigTable)
+    assert [cfg["nyears"] for cfg in subset] == [10, 30]
+
+
+def test_as_config_sequence(parameters):
+    cfgs = [{"a": 1}]
+    assert as_config_sequence(cfgs) is cfgs
+    assert as_config_sequence({"a": i} for i in range(2)) == [{"a": 0}, {"a": 1}]
+    assert isinstance(as_config_sequence(parameters), ConfigTable)
+
+
+def test_take_configs(parameters):
+    assert take_configs([{"a": 0}, {"a": 1}, {"a": 2}], np.array([2, 0])) == [
+        {"a": 2},
+        {"a": 0},
+    ]
+    assert len(take_configs(ConfigTable(parameters), np.array([1]))) == 1
+
+
+def test_scenario_config_product():
+    product = ScenarioConfigProduct(
+        [{"scenario": "a", "x": 1}, {"scenario": "b", "x": 2}],
+        [{"y": 10}, {"y": 20, "z": 5}, {"x": 3}],
+        defaults={"z": 0},
+        overrides={"w": "fixed"},
+    )
+
+    assert len(product) == 6
+    assert product[4] == {
+        "scenario": "b",
+        "x": 2,
+        "run_id": 4,
+        "z": 5,
+        "y": 20,
+        "w": "fixed",
+    }
+    assert product[2]["x"] == 3
+    assert [cfg["run_id"] for cfg in product] == list(range(6))
+    assert product[-1]["run_id"] == 5
+
+    # items are new dicts each time so can be modified safely
+    product[0].pop("scenario")
+    assert product[0]["scenario"] == "a"
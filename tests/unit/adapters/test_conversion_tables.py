@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from openscm_runner.adapters.utils._conversion_tables import (
+    convert_timeseries_units,
+    get_conversion_factor,
+    translate,
+)
+
+
+@pytest.mark.parametrize(
+    "from_unit,to_unit,context,exp",
+    (
+        ("Mt CO2/yr", "Mt CO2/yr", None, 1.0),
+        ("Mt CO2/yr", "Gt C/yr", None, 12.0 / 44.0 / 1000),
+        ("Mt NO2/yr", "Mt N/yr", "NOx_conversions", 14.0 / 46.0),
+    ),
+)
+def test_get_conversion_factor(from_unit, to_unit, context, exp):
+    np.testing.assert_allclose(
+        get_conversion_factor(from_unit, to_unit, context), exp, rtol=1e-3
+    )
+
+
+def test_get_conversion_factor_offset_error():
+    with pytest.raises(ValueError, match="not a simple scaling"):
+        get_conversion_factor("degC", "K")
+
+
+@pytest.fixture()
+def timeseries():
+    return pd.DataFrame(
+        [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]],
+        index=pd.MultiIndex.from_tuples(
+            [
+                ("Emissions|CO2", "Mt CO2/yr", "a"),
+                ("Emissions|NOx", "Mt NO2/yr", "a"),
+                ("Emissions|CO2", "Mt CO2/yr", "b"),
+            ],
+            names=["variable", "unit", "scenario"],
+        ),
+        columns=[2015, 2020],
+    )
+
+
+def test_convert_timeseries_units(timeseries):
+    res = convert_timeseries_units(
+        timeseries,
+        {
+            "Emissions|CO2": ("Gt CO2/yr", None),
+            "Emissions|NOx": ("Mt N/yr", "NOx_conversions"),
+        },
+    )
+
+    assert res.index.names == timeseries.index.names
+    assert res.index.get_level_values("unit").tolist() == [
+        "Gt CO2/yr",
+        "Mt N/yr",
+        "Gt CO2/yr",
+    ]
+    np.testing.assert_allclose(res.iloc[[0, 2]], timeseries.iloc[[0, 2]] / 1000)
+    np.testing.assert_allclose(res.iloc[1], timeseries.iloc[1] * 14 / 46, rtol=1e-3)
+
+
+def test_convert_timeseries_units_no_change(timeseries):
+    res = convert_timeseries_units(
+        timeseries,
+        {
+            "Emissions|CO2": ("Mt CO2/yr", None),
+            "Emissions|NOx": ("Mt NO2/yr", None),
+        },
+    )
+
+    assert res is timeseries
+
+
+def test_convert_timeseries_units_missing_variable(timeseries):
+    with pytest.raises(KeyError, match="Emissions|NOx"):
+        convert_timeseries_units(timeseries, {"Emissions|CO2": ("Gt C/yr", None)})
+
+
+def test_translate():
+    calls = []
+
+    def _upper(value):
+        calls.append(value)
+        return value.upper()
+
+    res = translate(["a", "b", "a", "a"], _upper)
+
+    assert res.tolist() == ["A", "B", "A", "A"]
+    assert calls == ["a", "b"]
+    assert translate(["a", "b"], {"a": "c"}).tolist() == ["c", "b"]
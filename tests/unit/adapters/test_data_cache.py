@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from openscm_runner.adapters.utils import _data_cache
+from openscm_runner.adapters.utils._data_cache import (
+    arrays_to_frame,
+    frame_to_arrays,
+    load_compiled,
+)
+
+
+@pytest.fixture()
+def cache_dir(tmp_path, monkeypatch):
+    out = tmp_path / "cache"
+    monkeypatch.setenv("OPENSCM_RUNNER_CACHE_DIR", str(out))
+    monkeypatch.setattr(_data_cache, "_LOADED", {})
+
+    return out
+
+
+@pytest.fixture()
+def source(tmp_path):
+    out = tmp_path / "source.txt"
+    out.write_text("1 2 3")
+
+    return str(out)
+
+
+def _compile_counting(source, calls):
+    def _compile():
+        calls.append(source)
+        with open(source) as file_handle:
+            return {"values": np.array(file_handle.read().split(), dtype=float)}
+
+    return _compile
+
+
+def test_load_compiled(cache_dir, source):
+    calls = []
+
+    res = load_compiled("test", [source], _compile_counting(source, calls))
+    np.testing.assert_equal(res["values"], [1.0, 2.0, 3.0])
+    assert isinstance(res["values"].base, np.memmap)
+    assert len(calls) == 1
+    assert len(list(cache_dir.iterdir())) == 1
+
+    # a new process loads from the cache
+    _data_cache._LOADED.clear()
+    res = load_compiled("test", [source], _compile_counting(source, calls))
+    np.testing.assert_equal(res["values"], [1.0, 2.0, 3.0])
+    assert len(calls) == 1
+
+    with pytest.raises(ValueError, match="read-only"):
+        res["values"][0] = 4
+
+
+def test_load_compiled_source_changed(cache_dir, source):
+    calls = []
+    load_compiled("test", [source], _compile_counting(source, calls))
+
+    with open(source, "w") as file_handle:
+        file_handle.write("4 5")
+
+    _data_cache._LOADED.clear()
+    res = load_compiled("test", [source], _compile_counting(source, calls))
+    np.testing.assert_equal(res["values"], [4.0, 5.0])
+    assert len(calls) == 2
+
+
+def test_load_compiled_openscm_units_changed(cache_dir, source, monkeypatch):
+    calls = []
+    load_compiled("test", [source], _compile_counting(source, calls))
+
+    # unit conversions can change between versions of openscm-units
+    monkeypatch.setattr(_data_cache.openscm_units, "__version__", "0.0.1")
+    _data_cache._LOADED.clear()
+    load_compiled("test", [source], _compile_counting(source, calls))
+    assert len(calls) == 2
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_load_compiled_unwritable_cache(cache_dir, source):
+    cache_dir.write_text("not a directory")
+
+    res = load_compiled("test", [source], _compile_counting(source, []))
+
+    np.testing.assert_equal(res["values"], [1.0, 2.0, 3.0])
+    assert not res["values"].flags.writeable
+
+
+def test_frame_round_trip(cache_dir, source):
+    frame = pd.DataFrame(
+        {"unit": ["Pg_C", "Tg"], "tau": [150.0, 9.6], "nat": [0, 275]},
+        index=pd.Index(["CO2", "CH4"], name="GAS "),
+    )
+
+    res = arrays_to_frame(
+        load_compiled("frame", [source], lambda: frame_to_arrays(frame))
+    )
+
+    pd.testing.assert_frame_equal(res, frame)
@@ -0,0 +1,111 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from openscm_runner.adapters.magicc7._binary_output import (
+    binary_outputs_to_scmrun,
+    read_binary_output,
+)
+from openscm_runner.adapters.magicc7._compat import pymagicc
+from openscm_runner.adapters.magicc7._run_magicc_parallel import run_magicc_parallel
+
+pytestmark = pytest.mark.skipif(pymagicc is None, reason="pymagicc not installed")
+
+YEARS = np.arange(1765, 1801)
+BOXES = ("GLOBAL", "NHOCEAN", "NHLAND", "SHOCEAN", "SHLAND")
+
+
+@pytest.mark.parametrize("legacy", (False, True))
+@pytest.mark.parametrize("regions", (BOXES[:1], BOXES))
+def test_read_binary_output(tmp_path, write_binout, legacy, regions):
+    columns = [
+        ("DAT_SURFACE_TEMP", region, "K", np.linspace(0, i + 1, YEARS.size))
+        for i, region in enumerate(regions)
+    ]
+    write_binout(tmp_path / "DAT_SURFACE_TEMP.BINOUT", YEARS, columns, legacy)
+
+    res = read_binary_output(tmp_path, ["DAT_SURFACE_TEMP", "DAT_CO2_CONC"])
+    exp = pymagicc.io.MAGICCData(str(tmp_path / "DAT_SURFACE_TEMP.BINOUT"))
+
+    npt.assert_array_equal(res.years, exp["year"].unique())
+    exp_ts = exp.timeseries(["variable", "region", "unit"])
+    npt.assert_array_equal(res.values, exp_ts.to_numpy())
+    assert list(zip(*res.columns.values())) == exp_ts.index.tolist()
+
+
+def test_read_binary_output_errors(tmp_path, write_binout):
+    with pytest.raises(ValueError, match="No output found"):
+        read_binary_output(tmp_path, ["DAT_SURFACE_TEMP"])
+
+    write_binout(
+        tmp_path / "DAT_SURFACE_TEMP.BINOUT",
+        YEARS,
+        [("DAT_SURFACE_TEMP", "GLOBAL", "K", np.zeros(YEARS.size))],
+    )
+    (tmp_path / "DAT_CO2_CONC.BINOUT").write_bytes(
+        (tmp_path / "DAT_SURFACE_TEMP.BINOUT").read_bytes()[:-3]
+    )
+    with pytest.raises(ValueError, match="corrupt record"):
+        read_binary_output(tmp_path, ["DAT_SURFACE_TEMP", "DAT_CO2_CONC"])
+
+
+def test_binary_outputs_to_scmrun_different_years(tmp_path, write_binout):
+    outputs = []
+    for i, years in enumerate((YEARS, YEARS[5:])):
+        write_binout(
+            tmp_path / "DAT_SURFACE_TEMP.BINOUT",
+            years,
+            [("DAT_SURFACE_TEMP", "GLOBAL", "K", np.ones(years.size))],
+        )
+        outputs.append(
+            (
+                {"scenario": "ssp126", "model": "model", "run_id": i},
+                read_binary_output(tmp_path, ["DAT_SURFACE_TEMP"]),
+            )
+        )
+
+    res = binary_outputs_to_scmrun(outputs)
+
+    npt.assert_array_equal(res["year"].unique(), YEARS)
+    npt.assert_array_equal(
+        res.filter(run_id=1, year=YEARS[:5]).values, np.full((1, 5), np.nan)
+    )
+    npt.assert_array_equal(res.filter(run_id=1, year=YEARS[5:]).values, 1)
+
+
+def test_run_magicc_parallel_binary_output(fake_magicc, tmp_path, monkeypatch):
+    monkeypatch.setenv("MAGICC_WORKER_NUMBER", "2")
+    monkeypatch.setenv("MAGICC_WORKER_ROOT_DIR", str(tmp_path))
+    cfgs = [
+        {"scenario": scenario, "model": "model", "run_id": i, "core_delq2xco2": 3.5}
+        for i, scenario in enumerate(["ssp126"] * 3 + ["ssp585"] * 3)
+    ]
+    output_vars = [
+        "Surface Air Temperature Change",
+        "Effective Radiative Forcing",
+        "Atmospheric Concentrations|CO2",
+    ]
+
+    # pymagicc also reads the binary output
+    res_ascii = run_magicc_parallel(
+        cfgs, output_vars, ["core_delq2xco2"], magicc_version="v7.5.3"
+    )
+    monkeypatch.setenv("MAGICC_OUTPUT_FORMAT", "binary")
+    res_binary = run_magicc_parallel(
+        cfgs, output_vars, ["core_delq2xco2"], magicc_version="v7.5.3"
+    )
+
+    assert set(res_binary.get_unique_meta("variable")) == set(output_vars)
+    assert res_binary.meta_attributes == res_ascii.meta_attributes
+
+    res_ts = res_binary.timeseries().sort_index()
+    exp_ts = res_ascii.timeseries().sort_index()
+    assert res_ts.index.equals(exp_ts.index)
+    assert res_ts.columns.equals(exp_ts.columns)
+    npt.assert_allclose(res_ts.to_numpy(), exp_ts.to_numpy())
+
+
+def test_run_magicc_parallel_output_format_error(monkeypatch):
+    monkeypatch.setenv("MAGICC_OUTPUT_FORMAT", "junk")
+    with pytest.raises(ValueError, match="must be 'ascii' or 'binary'"):
+        run_magicc_parallel([], ["Surface Air Temperature Change"], None)
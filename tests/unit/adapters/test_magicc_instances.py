@@ -0,0 +1,174 @@
+import os
+
+import pytest
+
+from openscm_runner.adapters import MAGICC7
+from openscm_runner.adapters.magicc7._compat import pymagicc
+from openscm_runner.adapters.magicc7._magicc_instances import (
+    _INSTANCE_MARKER,
+    _MagiccInstances,
+    get_persistent_instances,
+)
+from openscm_runner.adapters.magicc7._provision import create_worker_copy
+from openscm_runner.adapters.magicc7._run_magicc_parallel import (
+    _WORKER_STATE,
+    _init_magicc_worker,
+    _setup_func,
+)
+
+pytestmark = pytest.mark.skipif(pymagicc is None, reason="pymagicc not installed")
+
+
+def _get_instance(persistent):
+    instances = _MagiccInstances(persistent=persistent)
+
+    return instances, instances.get(init_callback=_setup_func)
+
+
+def test_persistent_instances_reused(fake_magicc, tmp_path):
+    persistent = get_persistent_instances(tmp_path / "workers", fake_magicc, "v7.5.3")
+
+    instances, magicc = _get_instance(persistent)
+    root_dir = magicc.root_dir
+    assert os.path.isfile(os.path.join(magicc.run_dir, "HISTORICAL.IN"))
+    assert os.path.isfile(os.path.join(root_dir, _INSTANCE_MARKER))
+
+    # claimed instances aren't shared
+    other_instances, other_magicc = _get_instance(persistent)
+    assert other_magicc.root_dir != root_dir
+
+    for claimed in (magicc, other_magicc):
+        with open(os.path.join(claimed.out_dir, "DAT_SURFACE_TEMP.OUT"), "w") as fh:
+            fh.write("old output")
+
+    instances.cleanup()
+    other_instances.cleanup()
+    assert os.path.isdir(root_dir)
+
+    reused = [_get_instance(persistent) for _ in range(2)]
+    assert {magicc.root_dir for _, magicc in reused} == {
+        root_dir,
+        other_magicc.root_dir,
+    }
+    for instances, magicc in reused:
+        assert os.listdir(magicc.out_dir) == []
+        instances.cleanup()
+
+
+def test_persistent_instances_invalidated(fake_magicc, tmp_path):
+    root_dir = tmp_path / "workers"
+    persistent = get_persistent_instances(root_dir, fake_magicc, "v7.5.3")
+    instances, magicc = _get_instance(persistent)
+    old_root_dir = magicc.root_dir
+    instances.cleanup()
+
+    assert get_persistent_instances(root_dir, fake_magicc, "v7.6.0") != persistent
+    # files written by the adapter into the run directory don't count
+    scen_dir = fake_magicc.parent.parent / "run" / "openscm-runner"
+    (scen_dir / "SCENARIO_2.SCEN7").write_text("emissions\n")
+    assert get_persistent_instances(root_dir, fake_magicc, "v7.5.3") == persistent
+
+    (fake_magicc.parent.parent / "run" / "HISTORICAL.IN").write_text("new data\n")
+    new_persistent = get_persistent_instances(root_dir, fake_magicc, "v7.5.3")
+    assert new_persistent[0] != persistent[0]
+    # unused instances of the old run directory are removed
+    assert not os.path.exists(old_root_dir)
+    assert not os.path.exists(persistent[0])
+
+    instances, magicc = _get_instance(new_persistent)
+    new_root_dir = magicc.root_dir
+    instances.cleanup()
+
+    # instances whose setup didn't finish aren't used
+    os.remove(os.path.join(new_root_dir, _INSTANCE_MARKER))
+    instances, magicc = _get_instance(new_persistent)
+    assert magicc.root_dir != new_root_dir
+    assert not os.path.exists(new_root_dir)
+    instances.cleanup()
+
+
+def test_worker_instances_cleaned_up(fake_magicc, tmp_path):
+    _init_magicc_worker(cfgs=[], cfg_extra={}, root_dir=str(tmp_path))
+    try:
+        magicc = _WORKER_STATE["instances"].get(
+            root_dir=str(tmp_path), init_callback=_setup_func
+        )
+        assert os.path.isdir(magicc.run_dir)
+        # the same instance is used for every run in a worker
+        assert _WORKER_STATE["instances"].get(root_dir=str(tmp_path)) is magicc
+
+        _WORKER_STATE["cleanup"]()
+        assert not os.path.exists(magicc.root_dir)
+    finally:
+        _WORKER_STATE.clear()
+
+
+def _read_files(root_dir):
+    return {
+        os.path.relpath(os.path.join(dirpath, filename), root_dir): open(
+            os.path.join(dirpath, filename)
+        ).read()
+        for dirpath, _, filenames in os.walk(root_dir)
+        for filename in filenames
+    }
+
+
+def test_linked_copy(fake_magicc, tmp_path, monkeypatch):
+    monkeypatch.setenv("MAGICC_WORKER_PROVISIONING", "copy")
+    copied = pymagicc.MAGICC7(strict=False, root_dir=str(tmp_path / "copied"))
+    create_worker_copy(copied)
+
+    monkeypatch.setenv("MAGICC_WORKER_PROVISIONING", "link")
+    linked = pymagicc.MAGICC7(strict=False, root_dir=str(tmp_path / "linked"))
+    create_worker_copy(linked)
+
+    linked_files = _read_files(linked.root_dir)
+    assert linked_files == {
+        name: contents
+        for name, contents in _read_files(copied.root_dir).items()
+        if not name.startswith(os.path.join("run", "openscm-runner"))
+    }
+    assert os.listdir(linked.out_dir) == []
+
+    original_run_dir = fake_magicc.parent.parent / "run"
+    for name in (os.path.join("subdir", "OTHER.IN"), "HISTORICAL.IN"):
+        assert os.path.samefile(
+            os.path.join(linked.run_dir, name), original_run_dir / name
+        )
+
+    assert not os.path.samefile(
+        os.path.join(linked.run_dir, "MAGCFG_USER.CFG"),
+        original_run_dir / "MAGCFG_USER.CFG",
+    )
+    assert (original_run_dir / "MAGCFG_USER.CFG").read_text() == "&nml_allcfgs\n/\n"
+
+
+def test_linked_copy_falls_back_to_symlinks(fake_magicc, tmp_path, monkeypatch):
+    def no_hardlinks(*args, **kwargs):
+        raise OSError
+
+    monkeypatch.setattr(os, "link", no_hardlinks)
+    linked = pymagicc.MAGICC7(strict=False, root_dir=str(tmp_path / "linked"))
+    create_worker_copy(linked)
+
+    assert os.path.islink(os.path.join(linked.run_dir, "HISTORICAL.IN"))
+    assert not os.path.islink(os.path.join(linked.run_dir, "MAGCFG_USER.CFG"))
+    # the executable is copied
+    executable = os.path.join(linked.root_dir, "bin", "magicc")
+    assert not os.path.islink(executable)
+    assert os.access(executable, os.X_OK)
+
+
+def test_worker_provisioning_error(fake_magicc, tmp_path, monkeypatch):
+    monkeypatch.setenv("MAGICC_WORKER_PROVISIONING", "junk")
+    magicc = pymagicc.MAGICC7(strict=False, root_dir=str(tmp_path / "worker"))
+    with pytest.raises(ValueError, match="must be 'link' or 'copy'"):
+        create_worker_copy(magicc)
+
+
+def test_scratch_disk_per_worker(monkeypatch):
+    monkeypatch.setenv("MAGICC_WORKER_PROVISIONING", "copy")
+    copied = MAGICC7().scratch_disk_per_worker
+
+    monkeypatch.setenv("MAGICC_WORKER_PROVISIONING", "link")
+    assert MAGICC7().scratch_disk_per_worker < copied
@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+import scmdata
+
+from openscm_runner.adapters.base import _Adapter
+from openscm_runner.adapters.utils._scenario_bundle import ScenarioBundle
+
+
+@pytest.fixture(scope="module")
+def scenarios(test_scenarios):
+    return test_scenarios.filter(scenario=["ssp126", "ssp245", "ssp585"])
+
+
+def test_from_scenarios(scenarios):
+    bundle = ScenarioBundle.from_scenarios(scenarios)
+
+    assert len(bundle) == 3
+    assert [key for key, _ in bundle.groups] == [
+        ("ssp126", "IMAGE"),
+        ("ssp245", "MESSAGE-GLOBIOM"),
+        ("ssp585", "REMIND-MAGPIE"),
+    ]
+    assert bundle.years[0] == 2015
+    assert set(bundle.units["variable"]) == set(scenarios.get_unique_meta("variable"))
+
+    exp = scenarios.timeseries(time_axis="year")
+    pd.testing.assert_frame_equal(
+        bundle.timeseries.sort_index(), exp.sort_index(), check_like=True
+    )
+
+    # already a bundle so nothing to do
+    assert ScenarioBundle.from_scenarios(bundle) is bundle
+
+
+def test_from_scenarios_duplicate_years(scenarios):
+    sub_annual = scmdata.ScmRun(
+        [[1.0], [2.0]],
+        index=[pd.Timestamp("2015-01-01"), pd.Timestamp("2015-07-01")],
+        columns={
+            "model": "a",
+            "scenario": "b",
+            "region": "World",
+            "variable": "Emissions|CO2",
+            "unit": "GtC / yr",
+        },
+    )
+
+    with pytest.raises(ValueError):
+        ScenarioBundle.from_scenarios(sub_annual)
+
+
+def test_batches(scenarios):
+    bundle = ScenarioBundle.from_scenarios(scenarios)
+
+    batches = list(bundle.batches(2))
+
+    assert [start for start, _ in batches] == [0, 2]
+    assert [len(batch) for _, batch in batches] == [2, 1]
+    pd.testing.assert_frame_equal(
+        pd.concat([batch.timeseries for _, batch in batches]), bundle.timeseries
+    )
+
+
+class RecordingAdapter(_Adapter):
+    model_name = "Recording"
+
+    def _init_model(self, *args, **kwargs):
+        pass
+
+    def _run(self, scenarios, cfgs, output_variables, output_config):
+        return scenarios
+
+
+class RecordingBundleAdapter(RecordingAdapter):
+    accepts_scenario_bundle = True
+
+
+def test_adapter_scenario_types(scenarios):
+    bundle = ScenarioBundle.from_scenarios(scenarios)
+
+    assert RecordingAdapter().run(scenarios, [{}], (), None) is scenarios
+
+    res = RecordingAdapter().run(bundle, [{}], (), None)
+    assert isinstance(res, scmdata.ScmRun)
+    assert res is bundle.to_scmrun()
+
+    assert RecordingBundleAdapter().run(bundle, [{}], (), None) is bundle
+    res = RecordingBundleAdapter().run(scenarios, [{}], (), None)
+    assert isinstance(res, ScenarioBundle)
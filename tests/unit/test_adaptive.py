@@ -0,0 +1,203 @@
+from typing import ClassVar
+
+import numpy as np
+import pytest
+import scmdata
+
+import openscm_runner.run
+from openscm_runner.adapters import _registered_adapters, register_adapter_class
+from openscm_runner.adapters.base import _Adapter
+from openscm_runner.adaptive import ConvergenceCriterion
+
+VARIABLE = "Surface Air Temperature Change"
+
+
+class SpreadToyAdapter(_Adapter):
+    """
+    Adapter whose output spread is set by the scenario's first value
+    """
+
+    model_name = "SpreadToy"
+    accepts_scenario_bundle = True
+    positional_run_ids = True
+    calls: ClassVar[list] = []
+
+    def _init_model(self, *args, **kwargs):
+        pass
+
+    def _run(self, scenarios, cfgs, output_variables, output_config):
+        self.calls.append(([key for key, _ in scenarios.groups], len(cfgs)))
+
+        x = np.array([cfg["x"] for cfg in cfgs])
+        out = []
+        for scenario_idx, ((scenario, model), timeseries) in enumerate(
+            scenarios.groups
+        ):
+            values = timeseries.to_numpy()[0]
+            out.append(
+                scmdata.ScmRun(
+                    values[:, np.newaxis] + values[0] * x[np.newaxis, :],
+                    index=timeseries.columns,
+                    columns={
+                        "climate_model": self.model_name,
+                        "model": model,
+                        "scenario": scenario,
+                        "region": "World",
+                        "variable": VARIABLE,
+                        "unit": "K",
+                        "run_id": self._get_run_ids(scenario_idx, cfgs),
+                    },
+                )
+            )
+
+        return scmdata.run_append(out)
+
+    @staticmethod
+    def _get_run_ids(scenario_idx, cfgs):
+        return scenario_idx * len(cfgs) + np.arange(len(cfgs))
+
+
+class IndexSpreadToyAdapter(SpreadToyAdapter):
+    """
+    Adapter which uses the ``Index`` of each config as its run ID
+    """
+
+    model_name = "IndexSpreadToy"
+    positional_run_ids = False
+
+    @staticmethod
+    def _get_run_ids(scenario_idx, cfgs):
+        return [cfg["Index"] for cfg in cfgs]
+
+
+@pytest.fixture()
+def toy_adapter():
+    existing_adapters = _registered_adapters.copy()
+    for adapter_cls in (SpreadToyAdapter, IndexSpreadToyAdapter):
+        adapter_cls.calls = []
+        register_adapter_class(adapter_cls)
+
+    yield
+
+    _registered_adapters.clear()
+    _registered_adapters.extend(existing_adapters)
+
+
+@pytest.fixture()
+def scenarios():
+    # scenario "narrow" has almost no spread so converges quickly
+    return scmdata.ScmRun(
+        np.array([[100.0, 0.001], [110.0, 0.002]]),
+        index=[2015, 2020],
+        columns={
+            "model": "iam",
+            "scenario": ["wide", "narrow"],
+            "region": "World",
+            "variable": "Emissions|CO2",
+            "unit": "Gt C / yr",
+        },
+    )
+
+
+CFGS = [{"x": x} for x in np.random.default_rng(0).normal(size=400)]
+
+
+def _run(scenarios, **kwargs):
+    return openscm_runner.run.run(
+        climate_models_cfgs={"SpreadToy": CFGS},
+        scenarios=scenarios,
+        output_variables=(VARIABLE,),
+        **kwargs,
+    )
+
+
+def test_get_config_stages():
+    criterion = ConvergenceCriterion(VARIABLE, min_members=10, batch_size=4)
+
+    res = criterion.get_config_stages(20)
+
+    assert [stage.size for stage in res] == [10, 4, 4, 2]
+    np.testing.assert_equal(np.sort(np.concatenate(res)), np.arange(20))
+    assert not np.array_equal(res[0], np.arange(10))
+
+
+@pytest.mark.parametrize("deduplicate", (True, False))
+def test_run_convergence(toy_adapter, scenarios, deduplicate):
+    res = _run(
+        scenarios,
+        deduplicate=deduplicate,
+        convergence=ConvergenceCriterion(
+            VARIABLE, tolerance=0.01, min_members=50, batch_size=50
+        ),
+    )
+
+    # the narrow scenario stops after the second batch, the wide one runs all
+    # the configs
+    n_runs = res.timeseries().groupby("scenario").size()
+    assert n_runs["narrow"] == 100
+    assert n_runs["wide"] == len(CFGS)
+    assert SpreadToyAdapter.calls[2] == ([("wide", "iam")], 50)
+
+    # the run IDs and output are the same as in a full run
+    full = _run(scenarios)
+    meta = ["scenario", "run_id"]
+    res_ts = res.timeseries(meta=meta).sort_index()
+    full_ts = full.timeseries(meta=meta).loc[res_ts.index]
+    np.testing.assert_allclose(res_ts.to_numpy(), full_ts.to_numpy())
+
+
+def test_run_convergence_non_positional_run_ids(toy_adapter, scenarios, caplog):
+    cfgs = [{**cfg, "Index": 1000 + 3 * i} for i, cfg in enumerate(CFGS)]
+    res = openscm_runner.run.run(
+        climate_models_cfgs={"IndexSpreadToy": cfgs},
+        scenarios=scenarios,
+        output_variables=(VARIABLE,),
+        convergence=ConvergenceCriterion(
+            VARIABLE, tolerance=0.01, min_members=50, batch_size=50
+        ),
+    )
+
+    assert "`convergence` is ignored" in caplog.text
+    assert IndexSpreadToyAdapter.calls == [([("narrow", "iam"), ("wide", "iam")], 400)]
+    for scenario in ("narrow", "wide"):
+        run_ids = res.filter(scenario=scenario)["run_id"].astype(int)
+        assert sorted(run_ids) == [cfg["Index"] for cfg in cfgs]
+
+
+def test_run_convergence_years(toy_adapter, scenarios):
+    # in 2020 the wide scenario has no spread either
+    scenarios = scenarios.timeseries()
+    scenarios[2020] = [0.0, 0.0]
+    scenarios = scmdata.ScmRun(scenarios)
+
+    res = _run(
+        scenarios,
+        convergence=ConvergenceCriterion(
+            VARIABLE, years=[2020], min_members=50, batch_size=50
+        ),
+    )
+
+    assert res.timeseries().groupby("scenario").size().tolist() == [100, 100]
+
+
+def test_run_convergence_preview_members_error(toy_adapter, scenarios):
+    with pytest.raises(ValueError, match="`preview_members` cannot be used"):
+        _run(
+            scenarios,
+            preview_members=10,
+            convergence=ConvergenceCriterion(VARIABLE),
+        )
+
+
+def test_run_convergence_variable_error(toy_adapter, scenarios):
+    with pytest.raises(ValueError, match="must be one of the output variables"):
+        _run(scenarios, convergence=ConvergenceCriterion("Effective Radiative Forcing"))
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    ({"quantiles": [1.5]}, {"min_members": 0}, {"batch_size": 0}),
+)
+def test_convergence_criterion_errors(kwargs):
+    with pytest.raises(ValueError):
+        ConvergenceCriterion(VARIABLE, **kwargs)
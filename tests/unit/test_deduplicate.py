@@ -0,0 +1,104 @@
+import numpy as np
+import scmdata
+
+from openscm_runner._deduplicate import (
+    DeduplicationPlan,
+    get_config_codes,
+    get_scenario_codes,
+)
+from openscm_runner.adapters.utils._scenario_bundle import ScenarioBundle
+
+
+def test_get_config_codes():
+    cfgs = [
+        {"a": 1, "b": np.array([1.0, 2.0])},
+        {"b": np.array([1.0, 2.0]), "a": 1},
+        {"a": 1, "b": np.array([1.0, 2.5])},
+        {"a": 1, "b": np.array([1.0, 2.0]), "c": {"x": 1, "y": [1, 2]}},
+        {"a": 1, "b": np.array([1.0, 2.0]), "c": {"y": [1, 2], "x": 1}},
+    ]
+
+    np.testing.assert_equal(get_config_codes(cfgs), [0, 0, 1, 2, 2])
+
+
+def _get_bundle(test_scenarios):
+    scenarios = test_scenarios.filter(scenario=["ssp126", "ssp245"])
+    duplicate = test_scenarios.filter(scenario="ssp245").copy()
+    duplicate["scenario"] = "ssp245-copy"
+    changed = test_scenarios.filter(scenario="ssp245").copy()
+    changed["scenario"] = "ssp245-changed"
+    changed = changed.timeseries()
+    changed.iloc[0, 0] += 1
+    changed = scmdata.ScmRun(changed)
+
+    return ScenarioBundle.from_scenarios(
+        scmdata.run_append([scenarios, duplicate, changed])
+    )
+
+
+def test_get_scenario_codes(test_scenarios):
+    bundle = _get_bundle(test_scenarios)
+
+    assert [key[0] for key, _ in bundle.groups] == [
+        "ssp126",
+        "ssp245",
+        "ssp245-changed",
+        "ssp245-copy",
+    ]
+    np.testing.assert_equal(get_scenario_codes(bundle), [0, 1, 2, 1])
+
+
+def _fake_output(plan, run_ids, scenarios=None):
+    if scenarios is None:
+        scenario_names = [key[0] for key, _ in plan.scenarios.groups]
+        scenarios = [scenario_names[r // len(plan.cfgs)] for r in run_ids]
+
+    return scmdata.ScmRun(
+        np.arange(len(run_ids) * 2, dtype=float).reshape(2, -1),
+        index=[2015, 2016],
+        columns={
+            "model": "unused",
+            "scenario": scenarios,
+            "region": "World",
+            "variable": "Surface Air Temperature Change",
+            "unit": "K",
+            "run_id": run_ids,
+        },
+    )
+
+
+def test_fan_out(test_scenarios):
+    bundle = _get_bundle(test_scenarios)
+    cfgs = [{"a": 1}, {"a": 2}, {"a": 1}]
+    plan = DeduplicationPlan(
+        bundle, get_scenario_codes(bundle), cfgs, get_config_codes(cfgs)
+    )
+
+    assert not plan.is_trivial
+    assert len(plan.scenarios) == 3
+    assert plan.cfgs == [{"a": 1}, {"a": 2}]
+
+    res = plan.fan_out(_fake_output(plan, list(range(6))))
+
+    assert sorted(res["run_id"]) == list(range(12))
+    ts = res.timeseries(time_axis="year").reset_index(
+        ["model", "region", "variable", "unit"], drop=True
+    )
+    # ssp245-copy, config 2 is a copy of ssp245, config 0 (unique run 2)
+    np.testing.assert_equal(ts.loc[(11, "ssp245-copy")].values, [2.0, 8.0])
+    assert set(res.filter(scenario="ssp245-copy")["model"]) == {"MESSAGE-GLOBIOM"}
+
+
+def test_fan_out_not_positional(test_scenarios):
+    bundle = _get_bundle(test_scenarios)
+    cfgs = [{"a": 1}, {"a": 1}]
+    plan = DeduplicationPlan(
+        bundle, get_scenario_codes(bundle), cfgs, get_config_codes(cfgs)
+    )
+
+    # run IDs which are repeated for each scenario can't be fanned out
+    model_res = _fake_output(
+        plan, [0, 0, 0], scenarios=[key[0] for key, _ in plan.scenarios.groups]
+    )
+
+    assert plan.fan_out(model_res) is None
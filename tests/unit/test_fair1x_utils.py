@@ -1,6 +1,18 @@
+import datetime as dt
+import logging
+
+import numpy as np
 import numpy.testing as npt
+from scmdata import ScmRun
 
-from openscm_runner.adapters.fair_adapter._scmdf_to_emissions import scmdf_to_emissions
+from openscm_runner.adapters.fair_adapter._run_fair import (
+    _evaluate_output,
+    _resolve_output_variables,
+)
+from openscm_runner.adapters.fair_adapter._scmdf_to_emissions import (
+    scmdf_to_emissions,
+    timeseries_to_emissions,
+)
 
 
 # All emissions that are not covered by FaIR (see
@@ -15,3 +27,71 @@ def test_emissions_to_ignore(test_scenario_ssp370_world):
         rtol=1e-5,
     )
     assert emissions.shape[1] == 40
+
+
+def test_timeseries_to_emissions(test_scenarios):
+    # drop some values so that they have to be interpolated and extrapolated
+    timeseries = test_scenarios.timeseries(time_axis="year").copy()
+    timeseries.iloc[::3, 1] = np.nan
+    timeseries.iloc[::5, -1] = np.nan
+    scenarios = ScmRun(timeseries.copy())
+
+    scenario_keys, emissions = timeseries_to_emissions(timeseries)
+
+    assert emissions.shape == (len(scenario_keys), 2100 - 1750 + 1, 40)
+    assert scenario_keys == sorted(set(zip(scenarios["scenario"], scenarios["model"])))
+    for (scenario, model), scenario_emissions in zip(scenario_keys, emissions):
+        scenario_run = scenarios.filter(scenario=scenario, model=model)
+        exp = scmdf_to_emissions(
+            ScmRun(
+                scenario_run.interpolate(
+                    [dt.datetime(year, 1, 1) for year in range(2015, 2101)]
+                )
+            )
+        )
+
+        npt.assert_allclose(scenario_emissions, exp, rtol=1e-10, atol=1e-10)
+
+
+def test_evaluate_output(caplog):
+    rng = np.random.default_rng(0)
+    n_runs, nt = 2, 5
+    concentrations = rng.random((n_runs, nt, 31))
+    forcing = rng.random((n_runs, nt, 45))
+    temperature, lambda_eff, ohc, heatflux, airborne = rng.random((5, n_runs, nt))
+    metas = [
+        {"gmst_factor": 0.9, "ohu_factor": 0.8},
+        {"gmst_factor": 1.1, "ohu_factor": 0.7},
+    ]
+
+    with caplog.at_level(logging.WARNING):
+        output_vars = _resolve_output_variables(
+            [
+                "Atmospheric Concentrations|N2O",
+                "Effective Radiative Forcing|F-Gases",
+                "Surface Air Ocean Blended Temperature Change",
+                "Heat Uptake|Ocean",
+                "Atmospheric Concentrations|N2O",
+                "Emissions|CO2",
+            ]
+        )
+
+    assert "Emissions|CO2 not available from FaIR" in caplog.text
+    assert [(variable, unit) for variable, *_, unit in output_vars] == [
+        ("Atmospheric Concentrations|N2O", "ppb"),
+        ("Effective Radiative Forcing|F-Gases", "W/m**2"),
+        ("Surface Air Ocean Blended Temperature Change", "K"),
+        ("Heat Uptake|Ocean", "W/m**2"),
+    ]
+
+    res = _evaluate_output(
+        (concentrations, forcing, temperature, lambda_eff, ohc, heatflux, airborne),
+        output_vars,
+        metas,
+    )
+
+    assert res.shape == (n_runs, 4, nt)
+    npt.assert_array_equal(res[:, 0], concentrations[:, :, 2])
+    npt.assert_allclose(res[:, 1], forcing[:, :, 3:15].sum(axis=2))
+    npt.assert_allclose(res[:, 2], temperature * np.array([[0.9], [1.1]]))
+    npt.assert_allclose(res[:, 3], heatflux * np.array([[0.8], [0.7]]))
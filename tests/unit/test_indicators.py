@@ -0,0 +1,91 @@
+import warnings
+
+import numpy as np
+import numpy.testing as npt
+import pytest
+import scmdata
+
+from openscm_runner.indicators import (
+    calculate_exceedance_probabilities,
+    calculate_indicators,
+)
+
+
+@pytest.fixture()
+def warming_ensemble():
+    years = np.arange(1850, 2101)
+    # linear warming from 0 in 1850-1900 to the peak in 2050, then a decline
+    trend = np.interp(years, [1850, 1900, 2050, 2100], [0, 0, 1, 0.8])
+    peaks = np.array([1.0, 1.8, 2.5, 3.0])
+
+    return scmdata.ScmRun(
+        np.outer(trend, peaks) + 0.3,
+        index=years,
+        columns={
+            "climate_model": "model_a",
+            "model": "iam",
+            "scenario": ["scen_a", "scen_a", "scen_b", "scen_b"],
+            "region": "World",
+            "variable": "Surface Air Temperature Change",
+            "unit": "K",
+            "run_id": [0, 1, 0, 1],
+        },
+    )
+
+
+def test_calculate_indicators(warming_ensemble):
+    res = calculate_indicators(warming_ensemble)
+
+    npt.assert_allclose(res["peak_warming"], [1.0, 1.8, 2.5, 3.0])
+    npt.assert_equal(res["peak_warming_year"].to_numpy(), [2050] * 4)
+    npt.assert_allclose(res["warming_2100"], [0.8, 1.44, 2.0, 2.4])
+    npt.assert_equal(res["exceedance_year_1.5"].to_numpy(), [np.nan, 2026, 1991, 1976])
+    npt.assert_equal(
+        res["exceedance_year_2.0"].to_numpy(), [np.nan, np.nan, 2021, 2001]
+    )
+    assert "variable" not in res.index.names
+    assert "run_id" in res.index.names
+
+
+def test_calculate_indicators_all_nan(warming_ensemble):
+    timeseries = warming_ensemble.timeseries()
+    timeseries.iloc[1, :] = np.nan
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        res = calculate_indicators(scmdata.ScmRun(timeseries))
+
+    assert res.iloc[1].isna().all()
+    npt.assert_allclose(res["peak_warming"].iloc[[0, 2, 3]], [1.0, 2.5, 3.0])
+    npt.assert_equal(res["peak_warming_year"].iloc[[0, 2, 3]].to_numpy(), [2050] * 3)
+
+
+def test_calculate_indicators_no_rebase(warming_ensemble):
+    res = calculate_indicators(warming_ensemble, reference_period=None)
+
+    npt.assert_allclose(res["peak_warming"], [1.3, 2.1, 2.8, 3.3])
+
+
+def test_calculate_indicators_unit_conversion(warming_ensemble):
+    res = calculate_indicators(warming_ensemble, unit="mK", thresholds=())
+
+    npt.assert_allclose(res["peak_warming"], [1000, 1800, 2500, 3000])
+
+
+def test_calculate_indicators_no_reference_data(warming_ensemble):
+    with pytest.raises(ValueError, match="No data in reference period"):
+        calculate_indicators(warming_ensemble, reference_period=(1750, 1800))
+
+
+def test_calculate_indicators_no_variable(warming_ensemble):
+    with pytest.raises(ValueError, match="No data for Heat Uptake"):
+        calculate_indicators(warming_ensemble, variable="Heat Uptake")
+
+
+def test_calculate_exceedance_probabilities(warming_ensemble):
+    indicators = calculate_indicators(warming_ensemble)
+
+    res = calculate_exceedance_probabilities(indicators)
+
+    npt.assert_allclose(res.loc[("model_a", "iam", "scen_a")].to_numpy(), [0.5, 0.0])
+    npt.assert_allclose(res.loc[("model_a", "iam", "scen_b")].to_numpy(), [1.0, 1.0])
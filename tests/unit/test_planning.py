@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+import scmdata
+
+import openscm_runner.run
+from openscm_runner.adapters import _registered_adapters, register_adapter_class
+from openscm_runner.adapters.base import _Adapter
+from openscm_runner.planning import ESTIMATE_COLUMNS, estimate_run
+
+
+class CountingToyAdapter(_Adapter):
+    """
+    Adapter whose output is the scenario's emissions plus a config value
+    """
+
+    model_name = "CountingToy"
+    accepts_scenario_bundle = True
+    positional_run_ids = True
+    worker_number_setting = "COUNTING_TOY_WORKER_NUMBER"
+    scratch_disk_per_worker = 100
+    n_runs = 0
+
+    def _init_model(self, *args, **kwargs):
+        pass
+
+    def _run(self, scenarios, cfgs, output_variables, output_config):
+        out = []
+        for scenario_idx, ((scenario, model), timeseries) in enumerate(
+            scenarios.groups
+        ):
+            type(self).n_runs += len(cfgs)
+            out.append(
+                scmdata.ScmRun(
+                    timeseries.to_numpy()[0][:, np.newaxis]
+                    + np.array([cfg["x"] for cfg in cfgs])[np.newaxis, :],
+                    index=timeseries.columns,
+                    columns={
+                        "climate_model": self.model_name,
+                        "model": model,
+                        "scenario": scenario,
+                        "region": "World",
+                        "variable": "Surface Air Temperature Change",
+                        "unit": "K",
+                        "run_id": scenario_idx * len(cfgs) + np.arange(len(cfgs)),
+                    },
+                )
+            )
+
+        return scmdata.run_append(out)
+
+
+@pytest.fixture()
+def toy_adapter(monkeypatch):
+    monkeypatch.setenv("COUNTING_TOY_WORKER_NUMBER", "2")
+    existing_adapters = _registered_adapters.copy()
+    CountingToyAdapter.n_runs = 0
+    register_adapter_class(CountingToyAdapter)
+
+    yield
+
+    _registered_adapters.clear()
+    _registered_adapters.extend(existing_adapters)
+
+
+@pytest.fixture()
+def scenarios():
+    return scmdata.ScmRun(
+        np.array([[1.0, 2.0, 2.0], [1.0, 3.0, 3.0]]),
+        index=[2015, 2020],
+        columns={
+            "model": "iam",
+            "scenario": ["a", "b", "c"],
+            "region": "World",
+            "variable": "Emissions|CO2",
+            "unit": "Gt C / yr",
+        },
+    )
+
+
+CFGS = [{"x": 0.1}, {"x": 0.2}, {"x": 0.2}, {"x": 0.3}, {"x": 0.4}, {"x": 0.5}]
+
+
+@pytest.mark.parametrize("deduplicate", (True, False))
+def test_estimate_run(toy_adapter, scenarios, deduplicate):
+    res = estimate_run(
+        {"CountingToy": CFGS},
+        scenarios,
+        output_variables=("Surface Air Temperature Change",),
+        deduplicate=deduplicate,
+        calibration_configs=3,
+    )
+
+    assert res.columns.tolist() == list(ESTIMATE_COLUMNS)
+    assert res.index.tolist() == ["CountingToy", "Total"]
+
+    toy = res.loc["CountingToy"]
+    assert toy["n_scenarios"] == 3
+    assert toy["n_configs"] == len(CFGS)
+    assert toy["n_runs"] == 3 * len(CFGS)
+    # scenarios b and c are the same, as are the second and third configs
+    assert toy["n_unique_runs"] == (2 * 5 if deduplicate else 3 * len(CFGS))
+    assert toy["n_workers"] == 2
+    assert toy["scratch_disk"] == 200
+    assert toy["seconds_per_run"] > 0
+    np.testing.assert_allclose(
+        toy["wall_time"], toy["n_unique_runs"] * toy["seconds_per_run"]
+    )
+    assert toy["result_size"] > 0
+    assert toy["peak_memory"] >= toy["result_size"]
+
+    # only the calibration sample (one scenario) was run
+    assert CountingToyAdapter.n_runs == 3
+
+
+def test_estimate_run_no_calibration(toy_adapter, scenarios):
+    res = estimate_run({"CountingToy": CFGS}, scenarios, calibration_configs=0)
+
+    assert CountingToyAdapter.n_runs == 0
+    assert res.loc["CountingToy", "n_runs"] == 3 * len(CFGS)
+    assert np.isnan(res.loc["CountingToy", "wall_time"])
+
+
+def test_estimate_run_streamed_scenarios_error(toy_adapter, scenarios):
+    with pytest.raises(ValueError, match="streamed scenarios"):
+        estimate_run({"CountingToy": CFGS}, [scenarios])
+
+
+def test_run_dry_run(toy_adapter, scenarios):
+    res = openscm_runner.run.run(
+        climate_models_cfgs={"CountingToy": CFGS},
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+        quantiles=(0.5,),
+        dry_run=True,
+    )
+
+    assert res.loc["CountingToy", "n_runs"] == 3 * len(CFGS)
+    # quantiles are returned so the ensemble isn't kept in memory
+    assert res.loc["Total", "peak_memory"] < res.loc["Total", "result_size"]
+    assert CountingToyAdapter.n_runs == 4
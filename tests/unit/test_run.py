@@ -30,3 +30,36 @@ def test_run_out_config_type_error():
             scenarios="not used",
             out_config={"model_a": "hi"},
         )
+
+
+@pytest.mark.parametrize(
+    "n_cfgs, preview_members, exp",
+    (
+        (5, None, [[0, 1, 2, 3, 4]]),
+        (5, 10, [[0, 1, 2, 3, 4]]),
+        (10, 3, [[0, 4, 9], [1, 2, 3], [5, 6, 7], [8]]),
+        (4, 1, [[0], [1], [2], [3]]),
+    ),
+)
+def test_get_config_stages(n_cfgs, preview_members, exp):
+    res = openscm_runner.run._get_config_stages(n_cfgs, preview_members)
+
+    assert [r.tolist() for r in res] == exp
+
+
+def test_run_preview_callback_requires_quantiles():
+    with pytest.raises(ValueError, match="`preview_callback` requires `quantiles`"):
+        openscm_runner.run.run(
+            climate_models_cfgs={"model_a": ["config list"]},
+            scenarios="not used",
+            preview_callback=print,
+        )
+
+
+def test_run_preview_streamed_scenarios_error():
+    with pytest.raises(ValueError, match="cannot be used with streamed scenarios"):
+        openscm_runner.run.run(
+            climate_models_cfgs={"FaIR": [{}, {}]},
+            scenarios=iter([]),
+            preview_members=1,
+        )
@@ -0,0 +1,247 @@
+import logging
+import threading
+from typing import ClassVar
+
+import numpy as np
+import pytest
+import scmdata
+
+import openscm_runner.run
+from openscm_runner.adapters import _registered_adapters, register_adapter_class
+from openscm_runner.adapters.base import _Adapter
+
+
+class ToyAdapter(_Adapter):
+    """
+    Adapter whose output is the scenario's emissions plus a config value
+    """
+
+    model_name = "Toy"
+    accepts_scenario_bundle = True
+    positional_run_ids = True
+    calls: ClassVar[list] = []
+
+    def _init_model(self, *args, **kwargs):
+        pass
+
+    def _run(self, scenarios, cfgs, output_variables, output_config):
+        self.calls.append([key for key, _ in scenarios.groups])
+
+        return scmdata.run_append(list(self._iter_outputs(scenarios, cfgs)))
+
+    def _iter_outputs(self, scenarios, cfgs):
+        for scenario_idx, ((scenario, model), timeseries) in enumerate(
+            scenarios.groups
+        ):
+            yield scmdata.ScmRun(
+                timeseries.to_numpy()[0][:, np.newaxis]
+                + np.array([cfg["x"] for cfg in cfgs])[np.newaxis, :],
+                index=timeseries.columns,
+                columns={
+                    "climate_model": self.model_name,
+                    "model": model,
+                    "scenario": scenario,
+                    "region": "World",
+                    "variable": "Surface Air Temperature Change",
+                    "unit": "K",
+                    "run_id": self._get_run_ids(scenario_idx, cfgs),
+                },
+            )
+
+    @staticmethod
+    def _get_run_ids(scenario_idx, cfgs):
+        return scenario_idx * len(cfgs) + np.arange(len(cfgs))
+
+
+class IndexToyAdapter(ToyAdapter):
+    """
+    Adapter which uses the ``Index`` of each config as its run ID
+    """
+
+    model_name = "IndexToy"
+    positional_run_ids = False
+
+    @staticmethod
+    def _get_run_ids(scenario_idx, cfgs):
+        return [cfg["Index"] for cfg in cfgs]
+
+
+class SerialToyAdapter(ToyAdapter):
+    model_name = "SerialToy"
+    vectorised = False
+
+
+class ThreadSafeToyAdapter(ToyAdapter):
+    model_name = "ThreadSafeToy"
+    vectorised = False
+    thread_safe = True
+    worker_number_setting = "THREAD_SAFE_TOY_WORKER_NUMBER"
+    barrier = None
+
+    def _run(self, scenarios, cfgs, output_variables, output_config):
+        # fails unless all the batches are run at the same time
+        self.barrier.wait()
+
+        return super()._run(scenarios, cfgs, output_variables, output_config)
+
+
+class ScratchToyAdapter(ToyAdapter):
+    model_name = "ScratchToy"
+    scratch_disk_per_worker = 10**18
+
+
+@pytest.fixture()
+def toy_adapters():
+    existing_adapters = _registered_adapters.copy()
+    for adapter_cls in (
+        ToyAdapter,
+        IndexToyAdapter,
+        SerialToyAdapter,
+        ThreadSafeToyAdapter,
+        ScratchToyAdapter,
+    ):
+        adapter_cls.calls = []
+        register_adapter_class(adapter_cls)
+
+    yield
+
+    _registered_adapters.clear()
+    _registered_adapters.extend(existing_adapters)
+
+
+@pytest.fixture()
+def scenarios():
+    return scmdata.ScmRun(
+        np.array([[1.0, 2.0, 3.0], [1.0, 2.0, 3.0]]),
+        index=[2015, 2020],
+        columns={
+            "model": "iam",
+            "scenario": ["a", "b", "c"],
+            "region": "World",
+            "variable": "Emissions|CO2",
+            "unit": "Gt C / yr",
+        },
+    )
+
+
+CFGS = [{"x": 0.1}, {"x": 0.2}]
+
+
+def _run(climate_model, scenarios, **kwargs):
+    return openscm_runner.run.run(
+        climate_models_cfgs={climate_model: CFGS},
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+        **kwargs,
+    )
+
+
+def _assert_same_output(res, exp):
+    res_ts = res.timeseries(meta=["model", "scenario", "run_id"]).sort_index()
+    exp_ts = exp.timeseries(meta=["model", "scenario", "run_id"]).sort_index()
+
+    np.testing.assert_allclose(res_ts.to_numpy(), exp_ts.to_numpy())
+    assert res_ts.index.equals(exp_ts.index)
+
+
+def test_vectorised_adapter_single_call(toy_adapters, scenarios):
+    _run("Toy", scenarios)
+
+    assert ToyAdapter.calls == [[("a", "iam"), ("b", "iam"), ("c", "iam")]]
+
+
+def test_serial_adapter_one_scenario_per_call(toy_adapters, scenarios):
+    res = _run("SerialToy", scenarios)
+
+    assert SerialToyAdapter.calls == [[("a", "iam")], [("b", "iam")], [("c", "iam")]]
+    _assert_same_output(res, _run("Toy", scenarios))
+
+
+def test_scenario_batch_size_overrides_capabilities(toy_adapters, scenarios):
+    _run("SerialToy", scenarios, scenario_batch_size=2)
+
+    assert SerialToyAdapter.calls == [[("a", "iam"), ("b", "iam")], [("c", "iam")]]
+
+
+def test_thread_safe_adapter_concurrent(toy_adapters, scenarios, monkeypatch):
+    monkeypatch.setenv("THREAD_SAFE_TOY_WORKER_NUMBER", "3")
+    ThreadSafeToyAdapter.barrier = threading.Barrier(3, timeout=10)
+
+    res = _run("ThreadSafeToy", scenarios)
+
+    assert len(ThreadSafeToyAdapter.calls) == 3
+    _assert_same_output(res, _run("Toy", scenarios))
+
+
+def test_scratch_disk_warning(toy_adapters, scenarios, caplog):
+    with caplog.at_level(logging.WARNING, logger="openscm_runner.run"):
+        _run("ScratchToy", scenarios)
+
+    assert "ScratchToy needs about" in caplog.text
+
+
+INDEX_CFGS = [
+    {"x": 0.1, "Index": 30040},
+    {"x": 0.2, "Index": 1},
+    {"x": 0.3, "Index": 7},
+]
+
+
+def _assert_index_run_ids(res):
+    for scenario in res.get_unique_meta("scenario"):
+        run_ids = res.filter(scenario=scenario)["run_id"]
+        assert sorted(run_ids.astype(int)) == [1, 7, 30040]
+
+
+def test_preview_keeps_non_positional_run_ids(toy_adapters, scenarios):
+    res = openscm_runner.run.run(
+        climate_models_cfgs={"IndexToy": INDEX_CFGS},
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+        preview_members=1,
+    )
+
+    _assert_index_run_ids(res)
+
+
+def test_batches_keep_non_positional_run_ids(toy_adapters, scenarios):
+    res = openscm_runner.run.run(
+        climate_models_cfgs={"IndexToy": INDEX_CFGS},
+        scenarios=scenarios,
+        output_variables=("Surface Air Temperature Change",),
+        scenario_batch_size=1,
+    )
+
+    assert len(IndexToyAdapter.calls) == 3
+    _assert_index_run_ids(res)
+
+
+def test_streamed_scenarios_keep_non_positional_run_ids(toy_adapters, scenarios):
+    res = openscm_runner.run.run(
+        climate_models_cfgs={"IndexToy": INDEX_CFGS},
+        scenarios=[
+            scenarios.filter(scenario="a"),
+            scenarios.filter(scenario="a", keep=False),
+        ],
+        output_variables=("Surface Air Temperature Change",),
+    )
+
+    assert len(IndexToyAdapter.calls) == 2
+    _assert_index_run_ids(res)
+
+
+def test_non_positional_adapter_not_deduplicated(toy_adapters, scenarios, caplog):
+    duplicates = scmdata.run_append(
+        [scenarios, scenarios.filter(scenario="a").set_meta("scenario", "d")]
+    )
+    with caplog.at_level(logging.INFO, logger="openscm_runner.run"):
+        res = openscm_runner.run.run(
+            climate_models_cfgs={"IndexToy": INDEX_CFGS},
+            scenarios=duplicates,
+            output_variables=("Surface Air Temperature Change",),
+        )
+
+    assert "Not deduplicating IndexToy" in caplog.text
+    assert "re-running" not in caplog.text
+    assert IndexToyAdapter.calls == [[(s, "iam") for s in ("a", "b", "c", "d")]]
+    _assert_index_run_ids(res)
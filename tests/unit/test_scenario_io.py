@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from openscm_runner.scenario_io import iter_scenarios_csv
+
+
+@pytest.fixture()
+def scenarios_file(test_scenarios, tmp_path):
+    out = tmp_path / "scenarios.csv"
+    test_scenarios.timeseries(time_axis="year").to_csv(out)
+
+    return out
+
+
+@pytest.mark.parametrize("read_chunksize", (7, 100_000))
+@pytest.mark.parametrize("scenarios_per_chunk", (1, 3, 100))
+def test_iter_scenarios_csv(
+    test_scenarios, scenarios_file, scenarios_per_chunk, read_chunksize
+):
+    chunks = list(
+        iter_scenarios_csv(
+            scenarios_file,
+            scenarios_per_chunk=scenarios_per_chunk,
+            read_chunksize=read_chunksize,
+        )
+    )
+
+    n_pairs = [
+        chunk.meta[["model", "scenario"]].drop_duplicates().shape[0] for chunk in chunks
+    ]
+    exp_n_pairs = test_scenarios.meta[["model", "scenario"]].drop_duplicates().shape[0]
+    assert sum(n_pairs) == exp_n_pairs
+    assert all(n == scenarios_per_chunk for n in n_pairs[:-1])
+    assert n_pairs[-1] <= scenarios_per_chunk
+
+    res = pd.concat([chunk.timeseries(time_axis="year") for chunk in chunks])
+    exp = test_scenarios.timeseries(time_axis="year")
+    pd.testing.assert_frame_equal(res.sort_index(), exp.sort_index(), check_like=True)
+
+
+def test_iter_scenarios_csv_not_contiguous(test_scenarios, tmp_path):
+    scenarios_file = tmp_path / "scenarios.csv"
+    timeseries = test_scenarios.timeseries(time_axis="year")
+    timeseries.sort_index(level="variable").to_csv(scenarios_file)
+
+    with pytest.raises(ValueError, match="are not next to each other"):
+        list(iter_scenarios_csv(scenarios_file))
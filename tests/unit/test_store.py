@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scmdata
+
+from openscm_runner.store import ResultStore
+
+
+def _get_results(scenarios, run_ids):
+    years = np.arange(1995, 2101)
+    n_ts = 2 * len(scenarios) * len(run_ids)
+    rng = np.random.default_rng(len(run_ids))
+
+    return scmdata.ScmRun(
+        rng.normal(size=(years.size, n_ts)),
+        index=years,
+        columns={
+            "climate_model": "model_a",
+            "model": "iam",
+            "scenario": np.repeat(scenarios, 2 * len(run_ids)).tolist(),
+            "region": "World",
+            "variable": np.tile(
+                np.repeat(
+                    ["Surface Air Temperature Change", "Heat Uptake"], len(run_ids)
+                ),
+                len(scenarios),
+            ).tolist(),
+            "unit": "K",
+            "run_id": np.tile(run_ids, 2 * len(scenarios)).tolist(),
+        },
+    )
+
+
+def _assert_same(res, exp):
+    pd.testing.assert_frame_equal(
+        res.timeseries().sort_index(),
+        exp.timeseries().sort_index(),
+        check_like=True,
+    )
+
+
+def test_store_roundtrip(tmp_path):
+    first = _get_results(["ssp126", "ssp245"], [0, 1, 2])
+    second = _get_results(["ssp370"], [0, 1, 2])
+
+    store = ResultStore(tmp_path)
+    store.write(first)
+    store.write(second)
+
+    assert store.index.shape[0] == 6
+    _assert_same(store.read(), scmdata.run_append([first, second]))
+
+    # the index is persisted so a new store can be opened from the directory
+    reopened = ResultStore(tmp_path)
+    _assert_same(
+        reopened.read(scenario="ssp370", variable="Heat Uptake"),
+        second.filter(variable="Heat Uptake"),
+    )
+
+
+def test_store_filtered_read(tmp_path):
+    results = _get_results(["ssp126", "ssp245", "ssp370"], [0, 1, 2, 3])
+    store = ResultStore(tmp_path)
+    store.write(results)
+
+    res = store.read(
+        scenario=["ssp1*", "ssp370"],
+        variable="Surface Air Temperature Change",
+        run_id=[1, 3],
+        year=range(2000, 2051),
+    )
+
+    _assert_same(
+        res,
+        results.filter(
+            scenario=["ssp126", "ssp370"],
+            variable="Surface Air Temperature Change",
+            run_id=[1, 3],
+            year=range(2000, 2051),
+        ),
+    )
+
+
+def test_store_no_match(tmp_path):
+    store = ResultStore(tmp_path)
+    store.write(_get_results(["ssp126"], [0]))
+
+    with pytest.raises(ValueError, match="No results match the filters"):
+        store.read(scenario="ssp585")
+
+
+def test_store_missing_index_columns(tmp_path):
+    store = ResultStore(tmp_path)
+
+    with pytest.raises(KeyError, match="missing index columns"):
+        store.write(_get_results(["ssp126"], [0]).drop_meta("climate_model"))
+
+
+def test_store_meta_dtypes(tmp_path):
+    results = _get_results(["ssp126"], [0, 1])
+    results = scmdata.ScmRun(
+        results.timeseries()
+        .reset_index()
+        .assign(
+            ensemble_member=["001", "002"] * 2,
+            pathway=["a", np.nan] * 2,
+        )
+    )
+    store = ResultStore(tmp_path)
+    store.write(results)
+
+    res = store.read()
+    assert sorted(res.get_unique_meta("ensemble_member")) == ["001", "002"]
+    _assert_same(res, results)
+
+
+def test_store_nan_index_meta(tmp_path):
+    results = _get_results(["ssp126", "ssp245"], [0, 1])
+    results = scmdata.ScmRun(
+        results.timeseries()
+        .reset_index()
+        .assign(climate_model=["model_a"] * 4 + [np.nan] * 4)
+    )
+    store = ResultStore(tmp_path)
+    store.write(results)
+
+    assert store.index.shape[0] == 4
+    _assert_same(store.read(), results)
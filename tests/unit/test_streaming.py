@@ -0,0 +1,125 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+from scmdata import ScmRun
+
+from openscm_runner.streaming import QuantileAccumulator, _QuantileSketch
+from openscm_runner.utils import calculate_quantiles
+
+
+def _get_ensemble(n_members, seed=0, **extra_columns):
+    rng = np.random.default_rng(seed)
+    years = np.arange(2000, 2011)
+
+    return ScmRun(
+        rng.normal(size=(years.size, 2 * n_members)),
+        index=years,
+        columns={
+            "climate_model": "model_a",
+            "model": "iam",
+            "scenario": ["scen_a"] * n_members + ["scen_b"] * n_members,
+            "region": "World",
+            "variable": "Surface Air Temperature Change",
+            "unit": "K",
+            "run_id": [*range(n_members), *range(n_members)],
+            **extra_columns,
+        },
+    )
+
+
+def _check_against_calculate_quantiles(res, ensemble, quantiles):
+    exp = calculate_quantiles(ensemble, quantiles, process_over_columns=("run_id",))
+    for quantile in quantiles:
+        for scenario in ("scen_a", "scen_b"):
+            npt.assert_allclose(
+                res.filter(quantile=quantile, scenario=scenario).values,
+                exp.filter(quantile=quantile, scenario=scenario).values,
+                atol=1e-12,
+            )
+
+
+def test_accumulator_exact_matches_calculate_quantiles():
+    quantiles = [0, 0.05, 0.5, 0.95, 1]
+    ensemble = _get_ensemble(50)
+
+    accumulator = QuantileAccumulator(quantiles)
+    # add members in chunks to check updating works
+    for start in range(0, 50, 7):
+        accumulator.update(ensemble.filter(run_id=range(start, start + 7)))
+
+    assert accumulator.is_exact
+    assert (accumulator.counts() == 50).all()
+
+    res = accumulator.to_scmrun()
+    assert "run_id" not in res.meta
+    _check_against_calculate_quantiles(res, ensemble, quantiles)
+
+
+def test_accumulator_merge():
+    quantiles = [0.17, 0.5, 0.83]
+    ensemble = _get_ensemble(40)
+
+    first = QuantileAccumulator(quantiles)
+    first.update(ensemble.filter(run_id=range(20)))
+    second = QuantileAccumulator(quantiles)
+    second.update(ensemble.filter(run_id=range(20, 40)))
+
+    first.merge(second)
+
+    _check_against_calculate_quantiles(first.to_scmrun(), ensemble, quantiles)
+
+
+def test_accumulator_nan_meta():
+    quantiles = [0, 0.5, 1]
+    ensemble = _get_ensemble(10, pathway=["a"] * 10 + [np.nan] * 10)
+
+    accumulator = QuantileAccumulator(quantiles)
+    for start in range(0, 10, 3):
+        accumulator.update(ensemble.filter(run_id=range(start, start + 3)))
+
+    assert len(accumulator.counts()) == 2
+    assert (accumulator.counts() == 10).all()
+
+    res = accumulator.to_scmrun()
+    assert res.meta["pathway"].isna().sum() == len(quantiles)
+    _check_against_calculate_quantiles(res, ensemble, quantiles)
+
+
+def test_accumulator_sketch():
+    quantiles = [0.05, 0.5, 0.95]
+    ensemble = _get_ensemble(3000)
+
+    accumulator = QuantileAccumulator(quantiles, max_exact=100)
+    for start in range(0, 3000, 250):
+        accumulator.update(ensemble.filter(run_id=range(start, start + 250)))
+
+    assert not accumulator.is_exact
+    assert (accumulator.counts() == 3000).all()
+
+    res = accumulator.to_scmrun()
+    exp = calculate_quantiles(ensemble, quantiles, process_over_columns=("run_id",))
+    for quantile in quantiles:
+        npt.assert_allclose(
+            res.filter(quantile=quantile, scenario="scen_a").values,
+            exp.filter(quantile=quantile, scenario="scen_a").values,
+            atol=0.1,
+        )
+
+
+def test_sketch_memory_bounded():
+    sketch = _QuantileSketch(n_times=3, capacity=50)
+    for _ in range(100):
+        sketch.update(np.random.default_rng(1).uniform(size=(100, 3)))
+
+    assert sketch.count == 10000
+    assert all(level.shape[0] <= 50 for level in sketch.levels)
+
+
+def test_accumulator_invalid_quantiles():
+    with pytest.raises(ValueError, match="quantiles must be in"):
+        QuantileAccumulator([0.5, 1.5])
+
+
+def test_accumulator_no_data():
+    with pytest.raises(ValueError, match="No data has been added"):
+        QuantileAccumulator([0.5]).to_scmrun()
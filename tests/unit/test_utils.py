@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scmdata
+
+from openscm_runner.utils import calculate_quantiles
+
+
+def _calculate_quantiles_process_over(scmdf, quantiles, process_over_columns):
+    out = []
+    for quant in quantiles:
+        quantile_df = scmdf.process_over(process_over_columns, "quantile", q=quant)
+        quantile_df["quantile"] = quant
+
+        out.append(quantile_df)
+
+    return scmdata.run_append([scmdata.ScmRun(o) for o in out])
+
+
+@pytest.mark.parametrize(
+    "process_over_columns",
+    (
+        ("run_id", "ensemble_member", "climate_model"),
+        ("run_id",),
+    ),
+)
+def test_calculate_quantiles(process_over_columns):
+    rng = np.random.default_rng(0)
+    n_members = 25
+    values = rng.normal(size=(5, 4 * n_members))
+    values[2, 3] = np.nan
+    values[:, 7] = np.nan
+
+    scmdf = scmdata.ScmRun(
+        values,
+        index=np.arange(2000, 2005),
+        columns={
+            "climate_model": "model_a",
+            "model": "iam",
+            "scenario": ["scen_b"] * 2 * n_members + ["scen_a"] * 2 * n_members,
+            "region": "World",
+            "variable": (["T"] * n_members + ["ERF"] * n_members) * 2,
+            "unit": "K",
+            "run_id": list(range(n_members)) * 4,
+        },
+    )
+    quantiles = [0, 0.05, 0.17, 0.5, 0.83, 0.95, 1]
+
+    res = calculate_quantiles(scmdf, quantiles, process_over_columns)
+    exp = _calculate_quantiles_process_over(scmdf, quantiles, process_over_columns)
+
+    assert sorted(res.meta.columns) == sorted(exp.meta.columns)
+    pd.testing.assert_frame_equal(
+        res.timeseries().sort_index(),
+        exp.timeseries().sort_index(),
+        check_exact=True,
+    )
+
+
+def test_calculate_quantiles_nan_meta():
+    scmdf = scmdata.ScmRun(
+        np.arange(12, dtype=float).reshape(3, 4),
+        index=np.arange(2000, 2003),
+        columns={
+            "climate_model": "model_a",
+            "model": "iam",
+            "scenario": "scen_a",
+            "region": "World",
+            "variable": "T",
+            "unit": "K",
+            "run_id": [0, 1, 2, 3],
+            "pathway": ["a", "a", np.nan, np.nan],
+        },
+    )
+
+    res = calculate_quantiles(scmdf, [0, 1])
+
+    assert res.shape[0] == 4
+    nan_pathway = res.filter(pathway="a", keep=False).timeseries()
+    np.testing.assert_equal(nan_pathway.values, [[2, 6, 10], [3, 7, 11]])
+    np.testing.assert_equal(
+        res.filter(pathway="a").timeseries().values, [[0, 4, 8], [1, 5, 9]]
+    )